@@ -1,5 +1,10 @@
 #pragma once
 #include <Arduino.h>
 
+#define SYNC_BYTE 0xA5     // Début d'une trame binaire (voir raspberry/lcr_protocol.py)
+#define MAX_CHANNELS 16
+
 extern bool TEST_MODE;
-String getCommand();
\ No newline at end of file
+extern bool BINARY_MODE;
+String getCommand();
+int getFrame(uint8_t* values);
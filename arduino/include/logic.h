@@ -1,4 +1,5 @@
 #pragma once
 #include <Arduino.h>
 
-void parseAndApply(String msg);
\ No newline at end of file
+void parseAndApply(String msg);
+void applyFrame(const uint8_t* values, int count);
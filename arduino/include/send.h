@@ -2,4 +2,5 @@
 
 void setupPins();
 void stopAll();
-void applyIntensity(int leftVal, int centerVal, int rightVal);
\ No newline at end of file
+void applyIntensity(int leftVal, int centerVal, int rightVal);
+void applyIntensities(const int* values, int count);
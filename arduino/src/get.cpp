@@ -2,6 +2,47 @@
 #include <Arduino.h>
 
 bool TEST_MODE = false;
+bool BINARY_MODE = false;
+
+// Trame binaire : SYNC_BYTE, numéro de séquence, nombre de canaux, intensités, CRC-8
+static uint8_t frame[MAX_CHANNELS + 4];
+static uint8_t frameLength = 0;
+
+// Ligne de texte reçue en mode binaire (demande de protocole)
+static char line[24];
+static uint8_t lineLength = 0;
+
+// CRC-8 (polynôme 0x07, valeur initiale 0), identique à crc8() côté Raspberry
+static uint8_t crc8(const uint8_t* data, uint8_t length) {
+    uint8_t crc = 0;
+    for (uint8_t i = 0; i < length; i++) {
+        crc ^= data[i];
+        for (uint8_t bit = 0; bit < 8; bit++) {
+            crc = (crc & 0x80) ? (crc << 1) ^ 0x07 : crc << 1;
+        }
+    }
+    return crc;
+}
+
+// "?PROTO binary" / "?PROTO ascii" : change de mode et répond "PROTO <mode>"
+static bool handleProtocolRequest(const char* cmd) {
+    if (strncmp(cmd, "?PROTO ", 7) != 0) {
+        return false;
+    }
+
+    const char* mode = cmd + 7;
+    if (strcmp(mode, "binary") == 0) {
+        BINARY_MODE = true;
+    } else if (strcmp(mode, "ascii") == 0) {
+        BINARY_MODE = false;
+    } else {
+        return true;  // Mode inconnu : pas de réponse, le Raspberry reste en ASCII
+    }
+
+    Serial.print("PROTO ");
+    Serial.println(mode);
+    return true;
+}
 
 String getCommand() {
     if (TEST_MODE) {
@@ -13,10 +54,57 @@ String getCommand() {
     while (Serial.available()) {
         String cmd = Serial.readStringUntil('\n');
         cmd.trim();
+        if (handleProtocolRequest(cmd.c_str())) {
+            if (BINARY_MODE) {
+                break;  // La suite est lue par getFrame
+            }
+            continue;
+        }
         if (cmd.length() > 0) {
             lastCmd = cmd;
         }
     }
 
     return lastCmd;
-}
\ No newline at end of file
+}
+
+int getFrame(uint8_t* values) {
+    int count = 0;
+
+    while (Serial.available()) {
+        uint8_t byte = Serial.read();
+
+        if (frameLength == 0) {
+            if (byte == SYNC_BYTE) {
+                frame[frameLength++] = byte;
+            } else if (byte == '\n') {
+                if (lineLength > 0 && line[lineLength - 1] == '\r') {
+                    lineLength--;
+                }
+                line[lineLength] = '\0';
+                lineLength = 0;
+                handleProtocolRequest(line);
+                if (!BINARY_MODE) {
+                    return count;  // La suite est lue par getCommand
+                }
+            } else if (lineLength < sizeof(line) - 1) {
+                line[lineLength++] = byte;
+            }
+            continue;
+        }
+
+        frame[frameLength++] = byte;
+        if (frameLength == 3 && (frame[2] == 0 || frame[2] > MAX_CHANNELS)) {
+            frameLength = 0;  // Pas un début de trame
+        } else if (frameLength > 3 && frameLength == frame[2] + 4) {
+            // Trame complète : seule la dernière trame valide est gardée
+            if (crc8(frame + 1, frame[2] + 2) == frame[frameLength - 1]) {
+                count = frame[2];
+                memcpy(values, frame + 3, count);
+            }
+            frameLength = 0;
+        }
+    }
+
+    return count;
+}
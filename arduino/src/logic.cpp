@@ -1,5 +1,6 @@
 #include "logic.h"
 #include "send.h"
+#include "get.h"
 #include <Arduino.h>
 
 void parseAndApply(String msg) {
@@ -27,4 +28,15 @@ void parseAndApply(String msg) {
 
     // Application immédiate → remplace toute ancienne commande
     applyIntensity(pwmL, pwmC, pwmR);
-}
\ No newline at end of file
+}
+
+void applyFrame(const uint8_t* values, int count) {
+    int pwm[MAX_CHANNELS];
+
+    // Saturation (valeurs 0–100 max) et conversion 0–100 → 0–255
+    for (int i = 0; i < count; i++) {
+        pwm[i] = map(constrain((int) values[i], 0, 100), 0, 100, 0, 255);
+    }
+
+    applyIntensities(pwm, count);
+}
@@ -9,11 +9,21 @@ void setup() {
 }
 
 void loop() {
-    // Lire la dernière commande envoyée par le Raspberry
-    String cmd = getCommand();
+    if (BINARY_MODE) {
+        // Dernière trame binaire valide reçue (voir get.cpp)
+        uint8_t values[MAX_CHANNELS];
+        int count = getFrame(values);
 
-    if (cmd.length() > 0) {
-        parseAndApply(cmd);   // traite immédiatement et écrase l’ancienne
+        if (count > 0) {
+            applyFrame(values, count);   // traite immédiatement et écrase l’ancienne
+        }
+    } else {
+        // Lire la dernière commande envoyée par le Raspberry
+        String cmd = getCommand();
+
+        if (cmd.length() > 0) {
+            parseAndApply(cmd);   // traite immédiatement et écrase l’ancienne
+        }
     }
 
     delay(10); // avoid to saturate the serial buffer
@@ -39,18 +39,25 @@ void stopAll() {
 }
 
 void applyIntensity(int leftVal, int centerVal, int rightVal) {
+    int values[] = {leftVal, centerVal, rightVal};
+    applyIntensities(values, 3);
+}
+
+void applyIntensities(const int* values, int count) {
+    static const char* LABELS[NUM_LEDS] = {"L:", " C:", " R:"};  // Gauche, Centre, Droite
 
-    leds[0] = getColorFromIntensity(leftVal);   // Gauche
-    leds[1] = getColorFromIntensity(centerVal); // Centre
-    leds[2] = getColorFromIntensity(rightVal);  // Droite
+    // Canaux au-delà de NUM_LEDS ignorés, LEDs sans canal à 0
+    for (int i = 0; i < NUM_LEDS; i++) {
+        leds[i] = getColorFromIntensity(i < count ? values[i] : 0);
+    }
 
     FastLED.show();
     
     // Debug : affiche les valeurs appliquées
-    Serial.print("[LED] L:");
-    Serial.print(leftVal);
-    Serial.print(" C:");
-    Serial.print(centerVal);
-    Serial.print(" R:");
-    Serial.println(rightVal);
-}
\ No newline at end of file
+    Serial.print("[LED] ");
+    for (int i = 0; i < NUM_LEDS; i++) {
+        Serial.print(LABELS[i]);
+        Serial.print(i < count ? values[i] : 0);
+    }
+    Serial.println();
+}
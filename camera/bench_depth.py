@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the depth zone statistics backends.
+
+Compares the original float32 path (one np.median per zone, `float_medians`) with the
+'sort' and 'histogram' backends of ZoneStatistics on synthetic z16 frames or a
+recorded depth session, and checks that all of them return the same zone medians.
+
+On a recorded session, the coarse-to-fine mode is also checked against full
+resolution: the coarse median error must stay below its margin, so that the
+alert/attention decisions do not change.
+
+Usage (from the repository root):
+    uv run python -m camera.bench_depth
+    uv run python -m camera.bench_depth --session path/to/session
+"""
+
+import argparse
+import time
+import numpy as np
+from camera.zone_stats import ZoneStatistics, CoarseToFine, BACKENDS
+from camera.recording import ReplaySource
+
+DEPTH_SCALE = 0.0010000000474974513  # D435 default (1 mm per unit)
+RESOLUTIONS = [(640, 480), (848, 480)]
+REPEAT = 200
+
+# Coarse-to-fine configuration (see camera/camera.py)
+THRESHOLDS = (1.0, 2.0)
+COARSE_STRIDE = 4
+COARSE_MARGIN = 0.25
+
+
+def synthetic_frame(w, h, rng):
+    """
+    Generate a z16 frame with a floor gradient, an obstacle and ~20% invalid pixels
+    """
+    rows = np.linspace(4000, 800, h)[:, None]
+    frame = np.repeat(rows, w, axis=1) + rng.normal(0, 30, (h, w))
+    frame[h//3:2*h//3, w//2:w//2 + w//6] = 700
+    frame[rng.random((h, w)) < 0.2] = 0
+    return frame.astype(np.uint16)
+
+
+def float_medians(depth, zones, depth_scale=DEPTH_SCALE):
+    """
+    Reference path: float32 meters, zero filtering and np.median per zone
+
+    This is the per-zone computation of camera.py before ZoneStatistics.
+    """
+    y1, y2, x1, x2, _, zone_w = zones.roi_bounds(depth.shape)
+    medians = []
+    for i in range(zones.cols):
+        zone = depth[y1:y2, x1 + i*zone_w : x1 + (i+1)*zone_w]
+        array = zone.astype(np.float32) * depth_scale
+        valid_array = array[array > 0]
+        medians.append(float(np.median(valid_array)) if valid_array.size else np.nan)
+    return np.array(medians)
+
+
+def decisions(medians):
+    """
+    Threshold class of every zone (0: alert, 1: attention, 2: safe or no data)
+    """
+    return np.where(np.isnan(medians), len(THRESHOLDS), np.digitize(np.nan_to_num(medians), THRESHOLDS))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = fn(*args)
+    return (time.perf_counter() - start) / REPEAT * 1000, result
+
+
+def bench_synthetic():
+    rng = np.random.default_rng(0)
+
+    for w, h in RESOLUTIONS:
+        depth = synthetic_frame(w, h, rng)
+        engines = {backend: ZoneStatistics(backend=backend) for backend in BACKENDS}
+
+        ref_ms, reference = timed(float_medians, depth, engines['sort'])
+        print(f"\n{w}x{h} ({REPEAT} runs)")
+        print(f"   float32 reference: {ref_ms:.3f} ms/frame")
+
+        for backend, engine in engines.items():
+            ms, stats = timed(engine.compute, depth, DEPTH_SCALE)
+            identical = np.array_equal(stats['median'].ravel(), reference)
+            print(f"   {backend:>9} backend: {ms:.3f} ms/frame (x{ref_ms / ms:.1f}), identical medians: {identical}")
+
+        coarse = CoarseToFine(engines['histogram'], COARSE_STRIDE, THRESHOLDS, COARSE_MARGIN)
+        ms, _ = timed(coarse.compute, depth, DEPTH_SCALE)
+        print(f"   coarse-to-fine (stride {COARSE_STRIDE}): {ms:.3f} ms/frame (x{ref_ms / ms:.1f})")
+
+
+def bench_session(path):
+    """
+    Run every backend over all the frames of a recorded depth session
+    """
+    replay = ReplaySource(path, realtime=False)
+    engines = {backend: ZoneStatistics(backend=backend) for backend in BACKENDS}
+    elapsed = {'float32': 0.0, **{backend: 0.0 for backend in BACKENDS}}
+    mismatches = {backend: 0 for backend in BACKENDS}
+
+    for frame, _ in replay:
+        start = time.perf_counter()
+        reference = float_medians(frame, engines['sort'], replay.depth_scale)
+        elapsed['float32'] += time.perf_counter() - start
+
+        for backend, engine in engines.items():
+            start = time.perf_counter()
+            stats = engine.compute(frame, replay.depth_scale)
+            elapsed[backend] += time.perf_counter() - start
+            if not np.array_equal(stats['median'].ravel(), reference, equal_nan=True):
+                mismatches[backend] += 1
+
+    print(f"\nSession {path}: {len(replay)} frames {replay.width}x{replay.height}")
+    print(f"   float32 reference: {elapsed['float32'] / len(replay) * 1000:.3f} ms/frame")
+    for backend in BACKENDS:
+        print(f"   {backend:>9} backend: {elapsed[backend] / len(replay) * 1000:.3f} ms/frame, "
+              f"{mismatches[backend]} frames with different medians")
+
+    check_coarse_to_fine(replay, engines['histogram'])
+
+
+def check_coarse_to_fine(replay, engine):
+    """
+    Check the coarse-to-fine error bound and decisions against full resolution
+    """
+    coarse = CoarseToFine(engine, COARSE_STRIDE, THRESHOLDS, COARSE_MARGIN)
+    replay.rewind()
+    full_time = coarse_time = 0.0
+    max_error = 0.0
+    refined = changed = 0
+
+    for frame, _ in replay:
+        start = time.perf_counter()
+        full = engine.compute(frame, replay.depth_scale)['median']
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = coarse.compute(frame, replay.depth_scale)
+        coarse_time += time.perf_counter() - start
+
+        sampled = engine.compute(frame, replay.depth_scale, stride=COARSE_STRIDE)['median']
+        both = ~np.isnan(full) & ~np.isnan(sampled)
+        if both.any():
+            max_error = max(max_error, float(np.abs(full - sampled)[both].max()))
+
+        refined += int(stats['refined'].sum())
+        changed += int(np.any(decisions(stats['median']) != decisions(full)))
+
+    zones = len(replay) * engine.zone_count
+    print(f"   coarse-to-fine (stride {COARSE_STRIDE}): {coarse_time / len(replay) * 1000:.3f} ms/frame "
+          f"vs {full_time / len(replay) * 1000:.3f} ms/frame at full resolution, {refined / zones * 100:.1f}% zones refined")
+    print(f"   max coarse median error: {max_error:.3f} m (bound {COARSE_MARGIN} m: "
+          f"{'OK' if max_error < COARSE_MARGIN else 'EXCEEDED'}), {changed} frames with different decisions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the depth zone statistics backends.")
+    parser.add_argument('--session', help="Recorded depth session to benchmark instead of synthetic frames")
+    args = parser.parse_args()
+
+    if args.session:
+        bench_session(args.session)
+    else:
+        bench_synthetic()
+
+
+if __name__ == "__main__":
+    main()
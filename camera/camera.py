@@ -1,9 +1,19 @@
 import pyrealsense2 as rs  # type: ignore
 import numpy as np 
 import cv2  # Used for OpenCV operations (if visualization is needed in future)
+import os
 import time
-from collections import deque
+import threading
 from queue_manager import queue_manager
+from camera.zone_stats import ZoneStatistics, CoarseToFine, DepthProfile, ZONE_NAMES, zone_distances
+from camera.smoothing import RollingSmoother
+from camera.frame_ring import FrameRing
+from camera.recording import DepthRecorder, ReplaySource, FRAMES_FILE
+from camera.depth_worker import DepthProcessPool
+from camera.frame_gate import FrameGate, gating_summary
+from camera.floor_mask import FloorFilter, floor_table_from_geometry, calibrate_floor_table, cached_floor_table
+from stage_stats import StageStats
+from raspberry.sensor_data import VideoData
 import traceback
 
 
@@ -12,15 +22,49 @@ DISTANCE_AREA_ATTENTION = 2.0
 DISTANCE_AREA_ALERT = 1.0
 
 FRAMES_HISTORY = 5
+SMOOTHING_METHOD = "median"  # "median", "mean" or "ema", see camera/smoothing.py
 
 RECT_MARGIN_Y = 0.10
 RECT_MARGIN_X = 0.10
 
+# Zone grid over the ROI (columns are grouped into gauche/centre/droite)
+ZONE_ROWS = 1
+ZONE_COLS = 3
+ZONE_BACKEND = "histogram"  # "sort" or "histogram", see camera/zone_stats.py
+
+# Depth profile: robust nearest depth of every column bin, published next to the zone distances
+PROFILE_BINS = 16
+PROFILE_PERCENTILE = 10
+PROFILE_STRIDE = 2
+
+# Coarse-to-fine analysis: zones are refined at full resolution only near the alert/attention distances
+COARSE_TO_FINE = True
+COARSE_STRIDE = 4  # Coarse pass keeps 1 pixel out of COARSE_STRIDE**2
+COARSE_MARGIN = 0.25  # Error bound (m) of the coarse medians, check it with camera/bench_depth.py --session
+
+# Floor removal: pixels at the expected floor depth of their row are ignored by the zone statistics
+FLOOR_REMOVAL = True
+CAMERA_HEIGHT = 0.80  # Camera height above the floor (m)
+CAMERA_PITCH = 20.0  # Downward tilt of the camera (degrees)
+FLOOR_TOLERANCE = 0.10  # Half-width (m) of the floor depth band of a row
+FLOOR_SESSION = None  # Recorded session of an empty floor, calibrates the floor table instead of the pose
+FLOOR_TABLE_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "floor_table.npz")  # Next to this module, whatever the working directory
+DEPTH_VFOV = 58.0  # Vertical field of view (degrees) of the D435 depth stream, used without intrinsics
+
+# Frame-difference gating: reuse the previous zone statistics while the scene does not change
+FRAME_GATING = True
+GATE_MAX_SKIPS = 4  # Maximum consecutive frames reusing previous statistics
+
 W = 640
 H = 480
 
 FPS = 15
 
+FRAME_SLOTS = 4  # Preallocated depth frame slots, bounds the memory used by frames
+DEPTH_EXECUTION = "thread"  # "thread" or "process" (depth analysis in a worker process)
+DEPTH_WORKERS = 1  # Number of worker processes in "process" mode
+SIMULATED_DEPTH_SCALE = 0.001  # Depth scale of simulated frames (1 mm per unit)
+
 # Global Variables
 CAMERA_RUNNING = False  # Flag to indicate if the camera is running
 
@@ -29,6 +73,16 @@ DEPTH_SCALE = None
 
 USE_SIMULATION = True  # Flag to simulate RealSense data when camera is not available
 
+DEPTH_PROFILE = DepthProfile(PROFILE_BINS, PROFILE_PERCENTILE, PROFILE_STRIDE, RECT_MARGIN_X, RECT_MARGIN_Y)
+ZONE_STATS = ZoneStatistics(ZONE_ROWS, ZONE_COLS, RECT_MARGIN_X, RECT_MARGIN_Y, backend=ZONE_BACKEND,
+                            profile=DEPTH_PROFILE)
+ZONE_ANALYZER = CoarseToFine(ZONE_STATS, COARSE_STRIDE, (DISTANCE_AREA_ALERT, DISTANCE_AREA_ATTENTION),
+                             COARSE_MARGIN) if COARSE_TO_FINE else ZONE_STATS
+FLOOR_FILTER = FloorFilter(ZONE_ANALYZER, FLOOR_TOLERANCE) if FLOOR_REMOVAL else ZONE_ANALYZER
+DEPTH_ANALYZER = FrameGate(FLOOR_FILTER, max_skips=GATE_MAX_SKIPS) if FRAME_GATING else FLOOR_FILTER
+FRAME_RING = FrameRing(FRAME_SLOTS, H, W)
+STAGE_STATS = StageStats()
+
 def check_realsense_available(pyrealsense=True):
     """
     Check if RealSense camera is available
@@ -92,29 +146,69 @@ def simulate_realsense_data():
         'timestamp': time.time()
     }
 
-def median_calculator(zone_pixels): 
+def simulate_depth_frame(out):
     """
-    Compute the median distance from depth pixels in a specified zone.
+    Fill a depth frame with simulated data for testing purposes.
 
     Parameters
     ----------
-    zone_pixels : np.ndarray
-        Array of depth pixel values for the zone.
+    out : np.ndarray
+        Writable uint16 frame to fill, e.g. a FRAME_RING slot.
 
     Returns
     -------
     float
-        The median distance in meters for the zone. Returns NaN if no valid pixels are found.
+        Timestamp of the simulated frame.
+
+    Notes
+    -----
+    Each group of zone columns is filled with the matching distance from simulate_realsense_data,
+    so simulated frames go through the same zone statistics as real frames.
     """
-    if USE_SIMULATION:
-        return np.random.uniform(1.0, 4.0)  # Simulated distance 
-        
-    array = zone_pixels.astype(np.float32) * DEPTH_SCALE 
-    valid_array = array[array > 0] 
-    if valid_array.size == 0: 
-        return np.nan 
+    sim_data = simulate_realsense_data()
+    _, _, x1, _, _, zone_w = ZONE_STATS.roi_bounds(out.shape)
+    
+    out.fill(0)
+    for name, cols in zip(ZONE_NAMES, np.array_split(np.arange(ZONE_COLS), len(ZONE_NAMES))):
+        out[:, x1 + cols[0]*zone_w : x1 + (cols[-1]+1)*zone_w] = round(sim_data['distances'][name] / DEPTH_SCALE)
+    
+    return sim_data['timestamp']
+
+def load_floor_table(height, fy=None, cy=None):
+    """
+    Load the expected floor depth of every row, from the disk cache when possible.
+
+    Parameters
+    ----------
+    height : int
+        Frame height in pixels.
+    fy : float or None
+        Vertical focal length in pixels. If None, derived from DEPTH_VFOV.
+    cy : float or None
+        Principal point row in pixels. If None, the frame center.
+
+    Returns
+    -------
+    np.ndarray
+        Floor depth (meters) of every row, NaN for rows without floor.
+
+    Notes
+    -----
+    The table is calibrated on FLOOR_SESSION if set, otherwise computed from CAMERA_HEIGHT and CAMERA_PITCH.
+    It is cached in FLOOR_TABLE_CACHE and only rebuilt when these parameters change.
+    """
+    if FLOOR_SESSION:
+        session = ReplaySource(FLOOR_SESSION, realtime=False)
+        key = {'session': os.path.abspath(FLOOR_SESSION), 'frames': len(session),
+               'mtime': os.path.getmtime(os.path.join(FLOOR_SESSION, FRAMES_FILE))}
+        return cached_floor_table(FLOOR_TABLE_CACHE, key,
+                                  lambda: calibrate_floor_table(session.frames, session.depth_scale))
     
-    return float(np.median(valid_array))
+    fy = fy if fy is not None else height / 2 / np.tan(np.radians(DEPTH_VFOV / 2))
+    cy = cy if cy is not None else (height - 1) / 2
+    key = {'height': height, 'fy': fy, 'cy': cy, 'camera_height': CAMERA_HEIGHT, 'pitch': CAMERA_PITCH}
+    return cached_floor_table(FLOOR_TABLE_CACHE, key,
+                              lambda: floor_table_from_geometry(height, fy, cy, CAMERA_HEIGHT, CAMERA_PITCH))
 
 def Danger_zone(distance):
     """
@@ -129,61 +223,161 @@ def Danger_zone(distance):
     
     return "paisible"
 
-def process_frame(depth_frame):
+def capture_frame(depth_frame, timeout=0.0, capture_time=None):
     """
-    Process a single depth frame from the RealSense camera or simulate data.
+    Copy a depth frame into a FRAME_RING slot, or fill a slot with simulated data.
 
     Parameters
     ----------
-    depth_frame : rs.depth_frame or None
-        The depth frame from the RealSense camera. If None, simulation mode is used.
+    depth_frame : rs.depth_frame, np.ndarray or None
+        The depth frame from the RealSense camera, or a raw uint16 frame from a ReplaySource.
+        If None, simulation mode is used.
+    timeout : float
+        Time to wait for a frame slot to be released if every slot is in use.
+    capture_time : float or None
+        Capture time of the frame in the camera clock (seconds). If None, taken from the RealSense
+        frame metadata (get_timestamp), unknown for raw and simulated frames.
 
     Returns
     -------
-    dict
-        Processed frame data including raw depth array, distances for left, center, and right zones, 
-        zone pixel data, and a timestamp.
+    int or None
+        The FRAME_RING slot holding the frame, with a reference held for the caller.
+        None if every frame slot is still in use and the frame was dropped.
     """
     if USE_SIMULATION:
-        sim_data = simulate_realsense_data()
-        return {
-            'raw_depth': None,
-            'distances': sim_data['distances'],
-            'zones': None,
-            'timestamp': sim_data['timestamp']
-        }
-    
-    # Standard RealSense mode
-    depth = np.asanyarray(depth_frame.get_data()) 
-    h, w = depth.shape 
-    y1, y2 = int(RECT_MARGIN_Y*h), int((1-RECT_MARGIN_Y)*h)        
-    x1, x2 = int(RECT_MARGIN_X*w), int((1-RECT_MARGIN_X)*w)
-
-    third = (x2 - x1) // 3 
-    zone_left  = depth[y1:y2, x1 : x1+third]
-    zone_center= depth[y1:y2, x1+third : x1+2*third]
-    zone_right = depth[y1:y2, x1+2*third : x2]
+        slot = FRAME_RING.claim(timeout)
+        if slot is not None:
+            FRAME_RING.publish(slot, simulate_depth_frame(FRAME_RING.buffer(slot)))
+        return slot
     
-    distance_left   = median_calculator(zone_left)
-    distance_center = median_calculator(zone_center)
-    distance_right  = median_calculator(zone_right)
+    # Standard RealSense mode, or replayed raw frame
+    arrival_time = time.time()
+    if isinstance(depth_frame, np.ndarray):
+        depth = depth_frame
+    else:
+        depth = np.asanyarray(depth_frame.get_data())
+        if capture_time is None:
+            capture_time = depth_frame.get_timestamp() / 1000.0  # Milliseconds in the frame timestamp domain
+    return FRAME_RING.write(depth, arrival_time, timeout, np.nan if capture_time is None else capture_time)
+
+def analyze_frame(slot):
+    """
+    Compute the zone statistics of a captured frame.
+
+    Parameters
+    ----------
+    slot : int
+        The FRAME_RING slot holding the frame.
+
+    Returns
+    -------
+    dict
+        Processed frame data including the FRAME_RING slot and its read-only raw depth view, distances
+        for left, center, and right zones, per-zone statistics, a timestamp (arrival time, time.time())
+        and the capture time in the camera clock (None if unknown).
+
+    Notes
+    -----
+    All zone statistics are computed in a single pass over the raw uint16 frame by ZONE_STATS.
+    With COARSE_TO_FINE, only the zones near a distance threshold are computed at full resolution.
+    With FLOOR_REMOVAL, the pixels at the expected floor depth of their row are ignored.
+    With FRAME_GATING, the previous statistics are reused while the scene does not change.
+    """
+    depth = FRAME_RING.view(slot)
+    zone_stats = DEPTH_ANALYZER.compute(depth, DEPTH_SCALE)
+    capture_time = float(FRAME_RING.capture_times[slot])
     
     return {
+        'slot': slot,
         'raw_depth': depth,
-        'distances': {
-            'gauche': distance_left,
-            'centre': distance_center,
-            'droite': distance_right
-        },
-        'zones': {
-            'left': zone_left,
-            'center': zone_center,
-            'right': zone_right
-        },
-        'timestamp': time.time()
+        'distances': zone_distances(zone_stats['median']),
+        'zone_stats': zone_stats,
+        'timestamp': float(FRAME_RING.timestamps[slot]),
+        'capture_time': None if np.isnan(capture_time) else capture_time
     }
 
-def start_video_capture(debug=False):
+def process_frame(depth_frame):
+    """
+    Process a single depth frame from the RealSense camera, a replayed session, or simulate data.
+
+    Parameters
+    ----------
+    depth_frame : rs.depth_frame, np.ndarray or None
+        The depth frame from the RealSense camera, or a raw uint16 frame from a ReplaySource.
+        If None, simulation mode is used.
+
+    Returns
+    -------
+    dict or None
+        Processed frame data (see analyze_frame).
+        None if every frame slot is still in use and the frame was dropped.
+
+    Notes
+    -----
+    The frame is copied once into a FRAME_RING slot. The returned slot holds a reference for the caller,
+    which must call FRAME_RING.release(frame_data['slot']) once done with 'raw_depth'.
+    """
+    slot = capture_frame(depth_frame)
+    return analyze_frame(slot) if slot is not None else None
+
+def build_video_data(frame_data, frame_number, smoother):
+    """
+    Smooth the zone distances of a processed frame and detect obstacles.
+
+    Parameters
+    ----------
+    frame_data : dict
+        Processed frame data (see analyze_frame).
+    frame_number : int
+        Number of the frame since the capture started.
+    smoother : RollingSmoother
+        Smoother over the zone distances history.
+
+    Returns
+    -------
+    VideoData
+        The video data sent to the video queue.
+    """
+    distances_raw = tuple(frame_data['distances'][name] for name in ZONE_NAMES)
+    smooth = smoother.update(list(distances_raw))
+    distance_left_smooth, distance_center_smooth, distance_right_smooth = smooth.tolist()
+    
+    mode = Danger_zone(distance_center_smooth)
+    
+    obstacle = []
+    if distance_left_smooth <= DISTANCE_AREA_ALERT:
+        obstacle.append('Gauche')
+    if distance_center_smooth <= DISTANCE_AREA_ALERT:
+        obstacle.append('Centre')
+    if distance_right_smooth <= DISTANCE_AREA_ALERT:
+        obstacle.append('Droite')
+   
+    if len(obstacle) == 0:
+        obstacle_info = "Aucun"
+    elif len(obstacle) == 1:
+        obstacle_info = obstacle[0]
+    else:
+        obstacle_info = ' et '.join(obstacle)
+
+    # Zones without obstacle pixels (NaN) are clear, the farthest direction
+    avoid_danger = ('Gauche', 'Centre', 'Droite')[int(np.argmax(np.nan_to_num(smooth, nan=np.inf)))]
+    
+    # Minimize data sent to queue 
+    return VideoData(
+        frame_number=frame_number,
+        mode=mode,
+        obstacle_info=obstacle_info,
+        avoid_direction=avoid_danger,
+        distances_raw=distances_raw,
+        distances_smooth=(distance_left_smooth, distance_center_smooth, distance_right_smooth),
+        obstacles=tuple(obstacle),
+        depth_profile=frame_data['zone_stats'].get('profile'),
+        timestamp=frame_data['timestamp'],
+        capture_time=frame_data.get('capture_time'),
+        simulation_mode=USE_SIMULATION
+    )
+
+def start_video_capture(debug=False, replay_path=None, record_path=None, realtime=True, depth_execution=DEPTH_EXECUTION):
     """
     Start capturing video from the RealSense camera or simulate data if not available.
 
@@ -191,13 +385,23 @@ def start_video_capture(debug=False):
     ----------
     debug : bool
         If True, enables debug mode with verbose logging.
+    replay_path : str or None
+        If set, frames are replayed from this recorded depth session instead of the RealSense camera.
+    record_path : str or None
+        If set, the raw frames captured from the RealSense camera are recorded to this session directory.
+    realtime : bool
+        When replaying, if True frames are replayed at their capture pace, otherwise as fast as possible.
+    depth_execution : str
+        "thread" to analyze depth frames in the capture thread, or "process" to analyze them in
+        DEPTH_WORKERS worker processes reading the frames from shared memory.
 
     Notes
     -----
     This function initializes the RealSense camera and continuously captures depth frames. If the camera is not available, it switches to simulation mode, generating random depth data.
     The captured or simulated data is processed and sent to the video queue for further handling.
+    Recorded sessions use the format of camera/recording.py and are replayed without the camera attached.
     """
-    global CAMERA_RUNNING, PIPELINE, DEPTH_SCALE, USE_SIMULATION
+    global CAMERA_RUNNING, PIPELINE, DEPTH_SCALE, USE_SIMULATION, FRAME_RING
     
     if CAMERA_RUNNING:
         if debug:
@@ -206,47 +410,132 @@ def start_video_capture(debug=False):
     
     CAMERA_RUNNING = True
     
-    realsense_available = check_realsense_available()
+    replay = None
+    recorder = None
+    pool = None
+    frame_count = 0
     
-    if realsense_available:
+    if replay_path:
+        replay = ReplaySource(replay_path, realtime=realtime)
+        print(f"[REPLAY] Replaying depth session {replay_path} ({len(replay)} frames)")
+        USE_SIMULATION = False
+    elif check_realsense_available():
         print("Starting RealSense camera capture...")
         USE_SIMULATION = False
     else:
         print("[SIMULATION] RealSense not available - using simulation mode")
         USE_SIMULATION = True
     
-    print(f"   Resolution: {W}x{H}")
-    print(f"   FPS: {FPS}")
+    width, height, fps = (replay.width, replay.height, replay.fps) if replay else (W, H, FPS)
+    print(f"   Resolution: {width}x{height}")
+    print(f"   FPS: {fps}")
     print(f"   Using simulation: {USE_SIMULATION}")
 
     try:
-        if not USE_SIMULATION:
+        if replay:
+            DEPTH_SCALE = replay.depth_scale
+            if (replay.height, replay.width) != FRAME_RING.frames.shape[1:]:
+                FRAME_RING = FrameRing(FRAME_SLOTS, replay.height, replay.width)
+            
+            print(f"   Depth scale: {DEPTH_SCALE}")
+        elif not USE_SIMULATION:
             PIPELINE = rs.pipeline() 
             config = rs.config() 
             config.enable_stream(rs.stream.depth, W, H, rs.format.z16, FPS) 
             
             camera = PIPELINE.start(config) 
             DEPTH_SCALE = camera.get_device().first_depth_sensor().get_depth_scale()
+            intrinsics = camera.get_stream(rs.stream.depth).as_video_stream_profile().get_intrinsics()
 
             print(f"   Depth scale: {DEPTH_SCALE}")
+            
+            if record_path:
+                recorder = DepthRecorder(record_path, W, H, DEPTH_SCALE, FPS)
+                print(f"   Recording depth session to {record_path}")
         else:
-            # Simulation mode001
+            # Simulation mode
+            DEPTH_SCALE = SIMULATED_DEPTH_SCALE
             print("   Using simulated depth data")
         
-        history_center = deque(maxlen=FRAMES_HISTORY)  
-        history_left   = deque(maxlen=FRAMES_HISTORY) 
-        history_right  = deque(maxlen=FRAMES_HISTORY)
+        if FLOOR_REMOVAL:
+            if replay or USE_SIMULATION:
+                FLOOR_FILTER.set_table(load_floor_table(height))
+            else:
+                FLOOR_FILTER.set_table(load_floor_table(height, intrinsics.fy, intrinsics.ppy))
+            print(f"   Floor removal: {np.count_nonzero(~np.isnan(FLOOR_FILTER.table))} floor rows")
+        
+        if depth_execution == "process":
+            slots, ring_height, ring_width = FRAME_RING.frames.shape
+            pool = DepthProcessPool(slots, ring_height, ring_width, DEPTH_ANALYZER, DEPTH_SCALE,
+                                    stage_stats=STAGE_STATS, workers=DEPTH_WORKERS)
+            FRAME_RING = pool.ring
+            print(f"   Depth analysis: {DEPTH_WORKERS} worker process(es), frames in shared memory")
+        
+        smoother = RollingSmoother(FRAMES_HISTORY, len(ZONE_NAMES), method=SMOOTHING_METHOD)
+        
+        def publish(frame_data):
+            # Smooth, send to the video queue and free the frame slot of an analyzed frame
+            nonlocal frame_count
+            
+            if recorder:
+                capture_time = frame_data['capture_time']
+                recorder.write(frame_data['raw_depth'], frame_data['timestamp'] if capture_time is None else capture_time,
+                               frame_data['timestamp'])
+                
+            frame_count += 1
+            video_data = build_video_data(frame_data, frame_count, smoother)
+            
+            FRAME_RING.release(frame_data['slot'])
+            queue_manager.put_video_data(video_data)
+            STAGE_STATS.record('frame_latency', time.time() - frame_data['timestamp'])
+            
+            if debug:
+                sim_tag = "[SIM] " if USE_SIMULATION else ""
+                print(f"{sim_tag}Video frame #{frame_count}: {video_data.mode}, Obstacles: {video_data.obstacle_info}")
+            
+            # Periodic stats - Made with Cppilot
+            if debug:
+                elapsed = time.time() - start_time
+                if elapsed > 0 and frame_count % 100 == 0:
+                    fps = frame_count / elapsed
+                    sim_tag = "[SIMULATION] " if USE_SIMULATION else ""
+                    left, centre, right = video_data.distances_smooth
+                    print(f"{sim_tag}Video: {frame_count} frames in {elapsed:.1f}s ({fps:.1f} FPS)")
+                    ring = FRAME_RING.get_stats()
+                    print(f"     Frame ring: {ring['slots_in_use']}/{ring['slots']} slots in use, {ring['overruns']} overruns")
+                    print(f"     Current: {video_data.mode}, Distances: G={left:.2f}m C={centre:.2f}m D={right:.2f}m")
+                    STAGE_STATS.print_stats(f"Depth stages ({depth_execution} mode)")
+                    if FRAME_GATING:
+                        gating = gating_summary(STAGE_STATS)
+                        print(f"     Frame gating: {gating['skip_rate']:.1f}% frames skipped, {gating['cpu_saved_ms']:.0f}ms CPU saved")
+        
+        def collect_results():
+            # Publish the depth worker results as soon as they arrive
+            while CAMERA_RUNNING and (capturing or pool.in_flight):
+                for frame_data in pool.collect(timeout=0.1):
+                    publish(frame_data)
         
-        frame_count = 0
+        STAGE_STATS.reset()
         start_time = time.time()
         
         if debug:
             print("Camera capture started...")
         
+        capturing = True
+        if pool:
+            collector = threading.Thread(target=collect_results, daemon=True)
+            collector.start()
+        
         while CAMERA_RUNNING:
             if USE_SIMULATION:
-                frame_data = process_frame(None)
+                depth_frame = None
                 time.sleep(1.0/FPS)  # Respect the framerate
+            elif replay:
+                replayed = replay.next_frame()
+                if replayed is None:
+                    print("[REPLAY] End of depth session")
+                    break
+                depth_frame, recorded_time = replayed
             else:
                 frame = PIPELINE.wait_for_frames() 
                 depth_frame = frame.get_depth_frame() 
@@ -254,69 +543,28 @@ def start_video_capture(debug=False):
                     if debug:
                         print('[DEBUG] No depth frame received, skipping...')
                     continue
-                frame_data = process_frame(depth_frame)
-                
-            frame_count += 1
             
-            history_left.append(frame_data['distances']['gauche'])
-            history_center.append(frame_data['distances']['centre'])
-            history_right.append(frame_data['distances']['droite'])
+            # Replayed frames wait for a free slot, live frames are dropped
+            capture_start = time.perf_counter()
+            slot = capture_frame(depth_frame, timeout=1.0 if replay else 0.0, capture_time=recorded_time if replay else None)
+            if slot is None:
+                if debug:
+                    print('[DEBUG] No free frame slot, dropping frame...')
+                continue
+            STAGE_STATS.record('capture', time.perf_counter() - capture_start)
             
-            distance_left_smooth   = np.nanmedian(history_left) 
-            distance_center_smooth = np.nanmedian(history_center)
-            distance_right_smooth  = np.nanmedian(history_right)
-            
-            mode = Danger_zone(distance_center_smooth)
-            distance = {'Gauche': distance_left_smooth, 'Centre': distance_center_smooth, 'Droite': distance_right_smooth}
-            
-            obstacle = []
-            if distance_left_smooth <= DISTANCE_AREA_ALERT:
-                obstacle.append('Gauche')
-            if distance_center_smooth <= DISTANCE_AREA_ALERT:
-                obstacle.append('Centre')
-            if distance_right_smooth <= DISTANCE_AREA_ALERT:
-                obstacle.append('Droite')
-           
-            if len(obstacle) == 0:
-                obstacle_info = "Aucun"
-            elif len(obstacle) == 1:
-                obstacle_info = obstacle[0]
+            if pool:
+                pool.submit(slot)
             else:
-                obstacle_info = ' et '.join(obstacle)
-
-            avoid_danger = max(distance, key=lambda k: np.nan_to_num(distance[k], nan=-1.0))
-            
-            # Minimize data sent to queue 
-            video_data = {
-                'frame_number': frame_count,
-                'mode': mode,
-                'obstacle_info': obstacle_info,
-                'avoid_direction': avoid_danger,
-                'distances_raw': frame_data['distances'],
-                'distances_smooth': {
-                    'gauche': distance_left_smooth,
-                    'centre': distance_center_smooth,
-                    'droite': distance_right_smooth
-                },
-                'obstacles': obstacle,
-                'timestamp': frame_data['timestamp'],
-                'simulation_mode': USE_SIMULATION
-            }
-
-            queue_manager.put_video_data(video_data)
-            
-            if debug:
-                sim_tag = "[SIM] " if USE_SIMULATION else ""
-                print(f"{sim_tag}Video frame #{frame_count}: {mode}, Obstacles: {obstacle_info}")
-            
-            # Periodic stats - Made with Cppilot
-            if debug:
-                elapsed = time.time() - start_time
-                if elapsed > 0 and frame_count % 100 == 0:
-                    fps = frame_count / elapsed
-                    sim_tag = "[SIMULATION] " if USE_SIMULATION else ""
-                    print(f"{sim_tag}Video: {frame_count} frames in {elapsed:.1f}s ({fps:.1f} FPS)")
-                    print(f"     Current: {mode}, Distances: G={distance_left_smooth:.2f}m C={distance_center_smooth:.2f}m D={distance_right_smooth:.2f}m")
+                analysis_start = time.perf_counter()
+                frame_data = analyze_frame(slot)
+                stage = 'analysis_skipped' if frame_data['zone_stats'].get('reused') else 'analysis'
+                STAGE_STATS.record(stage, time.perf_counter() - analysis_start)
+                publish(frame_data)
+        
+        capturing = False
+        if pool:
+            collector.join()
         
     except KeyboardInterrupt:
         print("\nCamera capture stopped by user")
@@ -329,6 +577,12 @@ def start_video_capture(debug=False):
                 PIPELINE.stop()
             except Exception as e:
                 print(f"Warning: Error stopping pipeline: {e}")
+        if recorder:
+            recorder.close()
+            print(f"Recorded {recorder.frame_count} frames to {record_path}")
+        if pool:
+            FRAME_RING = FrameRing(*FRAME_RING.frames.shape)
+            pool.close()
         CAMERA_RUNNING = False
         if debug:
             sim_tag = "[SIMULATION] " if USE_SIMULATION else ""
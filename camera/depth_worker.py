@@ -0,0 +1,179 @@
+"""
+Depth analysis in a worker process.
+
+The frame ring lives in multiprocessing shared memory: the capture loop copies
+frames into it and only sends slot indices to the workers, which send back small
+zone statistics records. Depth analysis then runs outside the GIL of the main
+interpreter, next to the audio processing and fusion threads.
+"""
+
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from queue import Empty
+import numpy as np
+from camera.frame_ring import FrameRing
+from camera.zone_stats import zone_distances
+
+STARTUP_TIMEOUT = 30.0  # Seconds, spawning a worker is slow on a Raspberry Pi
+
+
+def _worker_main(shm_name, shape, zone_stats, depth_scale, tasks, results):
+    """
+    Worker process loop: analyze the frames of the shared ring until a None task arrives
+    """
+    shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    frames = np.ndarray(shape, dtype=np.uint16, buffer=shm.buf)
+    results.put(None)  # Ready
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+
+            sequence, slot, submitted = task
+            started = time.perf_counter()
+            stats = zone_stats.compute(frames[slot], depth_scale)
+            finished = time.perf_counter()
+            results.put((sequence, slot, stats, submitted, started, finished))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del frames
+        shm.close()
+
+
+class DepthProcessPool:
+    """
+    Pool of worker processes computing zone statistics on a shared-memory frame ring
+
+    Parameters
+    ----------
+    slots : int
+        Number of frame slots in the shared ring.
+    height : int
+        Frame height in pixels.
+    width : int
+        Frame width in pixels.
+    zone_stats : ZoneStatistics or FrameGate
+        Zone statistics engine, copied into every worker.
+    depth_scale : float
+        Meters per depth unit.
+    stage_stats : StageStats or None
+        If set, receives the 'queue_wait', 'analysis' (or 'analysis_skipped') and 'result_transfer'
+        stage timings.
+    workers : int
+        Number of worker processes.
+
+    Notes
+    -----
+    Frames are written into `ring` by the caller, which keeps the reference held on each
+    submitted slot until it releases the collected result. Results are returned in
+    submission order, even with several workers.
+    """
+
+    def __init__(self, slots, height, width, zone_stats, depth_scale, stage_stats=None, workers=1):
+        shape = (slots, height, width)
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 2)
+        self.ring = FrameRing(slots, height, width, buffer=self.shm.buf)
+        self.stage_stats = stage_stats
+
+        context = mp.get_context("spawn")
+        self.tasks = context.Queue()
+        self.results = context.Queue()
+        self.processes = [
+            context.Process(target=_worker_main, daemon=True,
+                            args=(self.shm.name, shape, zone_stats, depth_scale, self.tasks, self.results))
+            for _ in range(workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+        # Wait for the workers to be up, so startup time does not count as frame latency
+        for _ in self.processes:
+            self.results.get(timeout=STARTUP_TIMEOUT)
+
+        self._submitted = 0
+        self._next = 0
+        self._timestamps = {}
+        self._pending = {}
+
+    @property
+    def in_flight(self):
+        return self._submitted - self._next
+
+    def submit(self, slot):
+        """
+        Send a frame slot of the ring to the workers
+
+        Parameters
+        ----------
+        slot : int
+            Slot index holding the captured frame.
+        """
+        self._timestamps[self._submitted] = (float(self.ring.timestamps[slot]), float(self.ring.capture_times[slot]))
+        self.tasks.put((self._submitted, slot, time.perf_counter()))
+        self._submitted += 1
+
+    def collect(self, timeout=0.0):
+        """
+        Collect the analyzed frames, in submission order
+
+        Parameters
+        ----------
+        timeout : float
+            Time to wait for the next result if none is ready yet.
+
+        Returns
+        -------
+        list of dict
+            Frame data with the same keys as camera.process_frame.
+        """
+        try:
+            while True:
+                result = self.results.get(timeout=timeout) if timeout else self.results.get_nowait()
+                self._pending[result[0]] = result
+                timeout = 0.0
+        except Empty:
+            pass
+
+        ready = []
+        while self._next in self._pending:
+            sequence, slot, stats, submitted, started, finished = self._pending.pop(self._next)
+            self._next += 1
+
+            if self.stage_stats:
+                self.stage_stats.record('queue_wait', started - submitted)
+                self.stage_stats.record('analysis_skipped' if stats.get('reused') else 'analysis', finished - started)
+                self.stage_stats.record('result_transfer', time.perf_counter() - finished)
+
+            timestamp, capture_time = self._timestamps.pop(sequence)
+            ready.append({
+                'slot': slot,
+                'raw_depth': self.ring.view(slot),
+                'distances': zone_distances(stats['median']),
+                'zone_stats': stats,
+                'timestamp': timestamp,
+                'capture_time': None if np.isnan(capture_time) else capture_time
+            })
+
+        return ready
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory
+        """
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+
+        self.ring = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # Frame views still referenced, the mapping goes away with them
+        self.shm.unlink()
@@ -0,0 +1,249 @@
+"""
+Ground-plane removal for depth frames.
+
+With a cane-mounted camera, the lower rows of the ROI always see the floor,
+which pulls the zone medians toward false "attention" readings. Every image
+row has an expected floor depth, computed once from the camera pitch and
+height or calibrated from a recorded session of an empty floor. Pixels within
+a tolerance band of their row's floor depth are masked (set to 0, i.e. invalid)
+before the zone statistics run.
+
+Tables are cached on disk as .npz files, keyed by the parameters they were
+built from, so startup does not redo the calibration.
+"""
+
+import json
+import os
+import numpy as np
+
+
+def floor_table_from_geometry(height, fy, cy, camera_height, pitch, max_distance=6.0):
+    """
+    Expected floor depth of every image row, from the camera pose
+
+    Parameters
+    ----------
+    height : int
+        Frame height in pixels.
+    fy : float
+        Vertical focal length in pixels.
+    cy : float
+        Principal point row in pixels.
+    camera_height : float
+        Height of the camera above the floor in meters.
+    pitch : float
+        Downward tilt of the optical axis in degrees.
+    max_distance : float
+        Rows whose floor is farther than this (meters) are left out of the table.
+
+    Returns
+    -------
+    np.ndarray
+        float32 array of `height` depths in meters (along the optical axis), NaN for rows
+        that do not see the floor.
+    """
+    angle = np.arctan((np.arange(height) - cy) / fy)  # Angle of each row below the optical axis
+    elevation = np.radians(pitch) + angle  # Angle of each row below the horizon
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        depth = camera_height * np.cos(angle) / np.sin(elevation)
+    depth[(elevation <= 0) | (depth > max_distance)] = np.nan
+    return depth.astype(np.float32)
+
+
+def calibrate_floor_table(frames, depth_scale, max_frames=50, min_valid=0.5):
+    """
+    Expected floor depth of every image row, measured on frames of an empty floor
+
+    Parameters
+    ----------
+    frames : np.ndarray
+        Raw uint16 depth frames of shape (count, height, width), e.g. ReplaySource.frames.
+    depth_scale : float
+        Meters per depth unit.
+    max_frames : int
+        Maximum number of frames used, evenly spaced over the session.
+    min_valid : float
+        Minimum fraction of valid pixels for a row to get a floor depth.
+
+    Returns
+    -------
+    np.ndarray
+        float32 array of `height` median depths in meters, NaN for rows with too few
+        valid pixels.
+    """
+    picked = np.linspace(0, len(frames) - 1, min(max_frames, len(frames))).astype(np.intp)
+    sample = np.asarray(frames[np.unique(picked)], dtype=np.float32)
+    sample[sample == 0] = np.nan
+
+    rows = sample.transpose(1, 0, 2).reshape(sample.shape[1], -1)
+    valid = np.count_nonzero(~np.isnan(rows), axis=1)
+
+    table = np.full(len(rows), np.nan, dtype=np.float32)
+    enough = valid >= min_valid * rows.shape[1]
+    if enough.any():
+        table[enough] = np.nanmedian(rows[enough], axis=1) * depth_scale
+    return table
+
+
+def cached_floor_table(path, key, build):
+    """
+    Load a floor table from the disk cache, or build it and store it
+
+    Parameters
+    ----------
+    path : str
+        Cache file (.npz).
+    key : dict
+        JSON-serializable parameters the table is built from. A cached table built
+        from other parameters is rebuilt.
+    build : callable
+        Function without argument returning the table.
+
+    Returns
+    -------
+    np.ndarray
+        The float32 floor table.
+    """
+    key = json.dumps(key, sort_keys=True)
+    if os.path.exists(path):
+        try:
+            with np.load(path) as cached:
+                if str(cached['key']) == key:
+                    return cached['table']
+        except (OSError, KeyError, ValueError):
+            pass  # Unreadable cache, rebuilt below
+
+    table = np.asarray(build(), dtype=np.float32)
+    np.savez(path, table=table, key=np.array(key))
+    return table
+
+
+class FloorFilter:
+    """
+    Floor masking in front of a zone statistics engine
+
+    Parameters
+    ----------
+    zone_stats : ZoneStatistics or CoarseToFine
+        Engine computing the zone statistics of the masked frames.
+    tolerance : float
+        Half-width (meters) of the depth band around the floor depth of a row.
+    relative_tolerance : float
+        Additional half-width as a fraction of the floor depth, as depth noise grows
+        with the distance.
+
+    Notes
+    -----
+    A pixel is floor if its depth lies within the band of its row. Pixels closer than the
+    floor (obstacles) and farther than the floor (holes, steps down) are kept. The band test
+    is a single comparison per pixel: subtracting the lower bound in uint16 wraps pixels
+    below it to large values. Without a table (see `set_table`), frames are not masked.
+    The filter has the same `compute` method as ZoneStatistics, whose result gains a
+    'floor_pixels' count.
+    """
+
+    def __init__(self, zone_stats, tolerance=0.10, relative_tolerance=0.05):
+        self.zone_stats = zone_stats
+        self.tolerance = tolerance
+        self.relative_tolerance = relative_tolerance
+        self.table = None
+
+        self._scale = None
+        self._rows = None
+        self._lower = None
+        self._band = None
+        self._diff = None
+        self._mask = None
+        self._masked = None
+
+    def roi_bounds(self, shape):
+        return self.zone_stats.roi_bounds(shape)
+
+    def set_table(self, table):
+        """
+        Set the expected floor depth of every row
+
+        Parameters
+        ----------
+        table : np.ndarray or None
+            Floor depth (meters) of every image row, NaN for rows without floor.
+            None disables the masking.
+        """
+        self.table = None if table is None else np.asarray(table, dtype=np.float32)
+        self._scale = None
+
+    def _prepare(self, shape, depth_scale):
+        # Band bounds in raw depth units, for the table rows that see the floor
+        if len(self.table) != shape[0]:
+            raise ValueError(f"Floor table has {len(self.table)} rows, frames have {shape[0]}")
+
+        rows = np.flatnonzero(~np.isnan(self.table))
+        half = self.tolerance + self.relative_tolerance * self.table[rows]
+        lower = np.clip(np.round((self.table[rows] - half) / depth_scale), 1, 0xFFFF)
+        upper = np.clip(np.round((self.table[rows] + half) / depth_scale), 1, 0xFFFF)
+
+        self._rows = slice(rows[0], rows[-1] + 1) if rows.size else slice(0, 0)
+        span = self._rows.stop - self._rows.start
+        self._lower = np.zeros((span, 1), dtype=np.uint16)
+        self._band = np.zeros((span, 1), dtype=np.uint16)  # Rows without floor keep an empty band
+        self._lower[rows - self._rows.start, 0] = lower
+        self._band[rows - self._rows.start, 0] = upper - lower + 1
+
+        self._diff = np.empty((span, shape[1]), dtype=np.uint16)
+        self._mask = np.empty((span, shape[1]), dtype=bool)
+        self._masked = np.empty(shape, dtype=np.uint16)
+        self._scale = depth_scale
+
+    def mask(self, depth, depth_scale):
+        """
+        Mask the floor pixels of a frame
+
+        Parameters
+        ----------
+        depth : np.ndarray
+            Raw uint16 depth frame.
+        depth_scale : float
+            Meters per depth unit.
+
+        Returns
+        -------
+        tuple
+            (masked, floor_pixels): a frame buffer, reused by the next call, with the floor
+            pixels set to 0, and the number of masked pixels.
+        """
+        if self._scale != depth_scale or self._masked.shape != depth.shape:
+            self._prepare(depth.shape, depth_scale)
+
+        np.copyto(self._masked, depth)
+        rows = self._masked[self._rows]
+        np.subtract(rows, self._lower, out=self._diff)
+        np.less(self._diff, self._band, out=self._mask)
+        np.copyto(rows, 0, where=self._mask)
+        return self._masked, int(np.count_nonzero(self._mask))
+
+    def compute(self, depth, depth_scale):
+        """
+        Compute the zone statistics of a frame without its floor pixels
+
+        Parameters
+        ----------
+        depth : np.ndarray
+            Raw uint16 depth frame.
+        depth_scale : float
+            Meters per depth unit.
+
+        Returns
+        -------
+        dict
+            Zone statistics (see ZoneStatistics.compute) with a 'floor_pixels' count.
+        """
+        if self.table is None:
+            stats = self.zone_stats.compute(depth, depth_scale)
+            stats['floor_pixels'] = 0
+            return stats
+
+        masked, floor_pixels = self.mask(depth, depth_scale)
+        stats = self.zone_stats.compute(masked, depth_scale)
+        stats['floor_pixels'] = floor_pixels
+        return stats
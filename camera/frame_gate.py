@@ -0,0 +1,140 @@
+"""
+Frame-difference gating for depth analysis.
+
+When the user stands still, consecutive depth frames are almost identical. The
+gate compares a subsampled copy of the ROI with the last analyzed frame and
+reuses the previous zone statistics while the scene has not changed, up to a
+bounded number of consecutive frames.
+"""
+
+import numpy as np
+
+
+class FrameGate:
+    """
+    Change detector in front of a zone statistics engine
+
+    Parameters
+    ----------
+    zone_stats : ZoneStatistics
+        Engine computing the zone statistics of changed frames.
+    stride : int
+        Subsampling step of the ROI in both directions.
+    pixel_tolerance : float
+        Depth change (meters) above which a sampled pixel counts as changed.
+    max_changed_fraction : float
+        Fraction of changed sampled pixels above which the scene counts as changed.
+    max_skips : int
+        Maximum number of consecutive frames reusing the previous statistics.
+
+    Notes
+    -----
+    Frames are compared with the last analyzed frame rather than the previous one, so
+    a slow drift still triggers a new analysis once it exceeds the tolerance. The gate
+    has the same `compute` method as ZoneStatistics, whose result gains a 'reused' flag.
+    """
+
+    def __init__(self, zone_stats, stride=8, pixel_tolerance=0.05, max_changed_fraction=0.02, max_skips=4):
+        self.zone_stats = zone_stats
+        self.stride = stride
+        self.pixel_tolerance = pixel_tolerance
+        self.max_changed_fraction = max_changed_fraction
+        self.max_skips = max_skips
+
+        self._reference = None
+        self._diff = None
+        self._changed = None
+        self._last = None
+        self._skips = 0
+
+    def _sample(self, depth):
+        y1, y2, x1, x2, _, _ = self.zone_stats.roi_bounds(depth.shape)
+        return depth[y1:y2:self.stride, x1:x2:self.stride]
+
+    def changed(self, depth, depth_scale):
+        """
+        Check if a frame differs from the last analyzed frame
+
+        Parameters
+        ----------
+        depth : np.ndarray
+            Raw uint16 depth frame.
+        depth_scale : float
+            Meters per depth unit.
+
+        Returns
+        -------
+        bool
+            True if the fraction of sampled pixels that moved by more than the tolerance
+            exceeds max_changed_fraction, or if no frame was analyzed yet.
+        """
+        sample = self._sample(depth)
+        if self._reference is None or self._reference.shape != sample.shape:
+            return True
+
+        np.subtract(sample, self._reference, out=self._diff, dtype=np.int32)
+        np.abs(self._diff, out=self._diff)
+        np.greater(self._diff, self.pixel_tolerance / depth_scale, out=self._changed)
+        return np.count_nonzero(self._changed) > self.max_changed_fraction * self._changed.size
+
+    def compute(self, depth, depth_scale):
+        """
+        Compute the zone statistics of a frame, or reuse the previous ones if the scene did not change
+
+        Parameters
+        ----------
+        depth : np.ndarray
+            Raw uint16 depth frame.
+        depth_scale : float
+            Meters per depth unit.
+
+        Returns
+        -------
+        dict
+            Zone statistics (see ZoneStatistics.compute) with a 'reused' flag.
+        """
+        if self._skips < self.max_skips and not self.changed(depth, depth_scale):
+            self._skips += 1
+            return dict(self._last, reused=True)
+
+        stats = self.zone_stats.compute(depth, depth_scale)
+        stats['reused'] = False
+
+        sample = self._sample(depth)
+        if self._reference is None or self._reference.shape != sample.shape:
+            self._reference = np.empty(sample.shape, dtype=np.uint16)
+            self._diff = np.empty(sample.shape, dtype=np.int32)
+            self._changed = np.empty(sample.shape, dtype=bool)
+        np.copyto(self._reference, sample)
+
+        self._last = stats
+        self._skips = 0
+        return stats
+
+
+def gating_summary(stage_stats):
+    """
+    Summarize the gating from the 'analysis' and 'analysis_skipped' stage timings
+
+    Parameters
+    ----------
+    stage_stats : StageStats
+        Stage statistics of the depth pipeline.
+
+    Returns
+    -------
+    dict
+        Skip rate (%) and CPU time saved (ms) by the frames that reused previous statistics.
+    """
+    stats = stage_stats.get_stats()
+    analyzed = stats.get('analysis')
+    skipped = stats.get('analysis_skipped')
+    if not skipped:
+        return {'skip_rate': 0.0, 'cpu_saved_ms': 0.0}
+
+    total = skipped['count'] + (analyzed['count'] if analyzed else 0)
+    saved = (analyzed['mean_ms'] - skipped['mean_ms']) * skipped['count'] if analyzed else 0.0
+    return {
+        'skip_rate': skipped['count'] / total * 100,
+        'cpu_saved_ms': max(saved, 0.0)
+    }
@@ -0,0 +1,191 @@
+"""
+Preallocated ring buffer of depth frame slots.
+
+Captured frames are copied exactly once into a fixed set of uint16 slots.
+Readers get read-only views by slot index and hold a reference on the slot
+while they use it, so the writer never overwrites a frame that is still read.
+"""
+
+import numpy as np
+from threading import Condition, Lock
+
+
+class FrameRing:
+    """
+    Fixed pool of uint16 depth frame slots with reference counting
+
+    Parameters
+    ----------
+    slots : int
+        Number of frame slots, bounds the memory used by depth frames.
+    height : int
+        Frame height in pixels.
+    width : int
+        Frame width in pixels.
+    buffer : buffer or None
+        Memory holding the frames, e.g. a multiprocessing shared memory buffer.
+        If None, the frames are allocated in process memory.
+
+    Notes
+    -----
+    A slot returned by `claim` or `write` holds one reference for the caller, who must
+    `release` it when done. Every additional reader calls `acquire` before using the slot
+    and `release` afterwards. A slot is only reused once its reference count drops to zero.
+    """
+
+    def __init__(self, slots, height, width, buffer=None):
+        if slots < 1:
+            raise ValueError(f"Frame ring needs at least one slot, got {slots}")
+
+        self.lock = Lock()
+        self.slot_freed = Condition(self.lock)
+        if buffer is None:
+            self.frames = np.zeros((slots, height, width), dtype=np.uint16)
+        else:
+            self.frames = np.ndarray((slots, height, width), dtype=np.uint16, buffer=buffer)
+        self.timestamps = np.zeros(slots)
+        self.capture_times = np.full(slots, np.nan)  # Capture time in the camera clock, NaN if unknown
+        self.sequence = np.zeros(slots, dtype=np.int64)
+        self.refcount = np.zeros(slots, dtype=np.intp)
+
+        self._next = 0
+        self._views = [self._read_only(frame) for frame in self.frames]
+
+        # Monitoring
+        self.total_frames = 0
+        self.overrun_count = 0
+
+    @staticmethod
+    def _read_only(frame):
+        view = frame.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def slots(self):
+        return len(self.frames)
+
+    def claim(self, timeout=0.0):
+        """
+        Reserve the oldest free slot for writing
+
+        Parameters
+        ----------
+        timeout : float
+            Time to wait for a slot to be released if every slot is in use.
+
+        Returns
+        -------
+        int or None
+            Index of the claimed slot (holding one reference), or None if every slot
+            is still referenced.
+        """
+        with self.lock:
+            if not self.slot_freed.wait_for(lambda: not self.refcount.all(), timeout=timeout):
+                self.overrun_count += 1
+                return None
+
+            for offset in range(self.slots):
+                slot = (self._next + offset) % self.slots
+                if self.refcount[slot] == 0:
+                    self.refcount[slot] = 1
+                    self._next = (slot + 1) % self.slots
+                    return slot
+
+    def buffer(self, slot):
+        """
+        Writable array of a claimed slot, for producers filling the frame in place
+        """
+        return self.frames[slot]
+
+    def publish(self, slot, timestamp, capture_time=np.nan):
+        """
+        Record the metadata of a frame written into a claimed slot
+
+        Parameters
+        ----------
+        slot : int
+            Slot index returned by `claim`.
+        timestamp : float
+            Capture timestamp of the frame.
+        capture_time : float
+            Capture time of the frame in the camera clock (seconds), NaN if unknown.
+        """
+        with self.lock:
+            self.total_frames += 1
+            self.sequence[slot] = self.total_frames
+            self.timestamps[slot] = timestamp
+            self.capture_times[slot] = capture_time
+
+    def write(self, frame, timestamp, timeout=0.0, capture_time=np.nan):
+        """
+        Copy a frame into the next free slot
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            Depth frame of shape (height, width), e.g. the librealsense buffer.
+        timestamp : float
+            Capture timestamp of the frame.
+        timeout : float
+            Time to wait for a slot to be released if every slot is in use.
+        capture_time : float
+            Capture time of the frame in the camera clock (seconds), NaN if unknown.
+
+        Returns
+        -------
+        int or None
+            Index of the slot (holding one reference for the caller), or None if every
+            slot is still referenced and the frame was dropped.
+        """
+        slot = self.claim(timeout)
+        if slot is None:
+            return None
+
+        np.copyto(self.frames[slot], frame)
+        self.publish(slot, timestamp, capture_time)
+        return slot
+
+    def view(self, slot):
+        """
+        Read-only view of a slot, valid while the caller holds a reference
+        """
+        return self._views[slot]
+
+    def acquire(self, slot):
+        """
+        Add a reference on a slot so it is not overwritten while being read
+        """
+        with self.lock:
+            if self.refcount[slot] == 0:
+                raise ValueError(f"Frame slot {slot} is not in use")
+            self.refcount[slot] += 1
+
+    def release(self, slot):
+        """
+        Drop a reference on a slot, the slot can be reused once no reference is left
+        """
+        with self.lock:
+            if self.refcount[slot] == 0:
+                raise ValueError(f"Frame slot {slot} released more times than acquired")
+            self.refcount[slot] -= 1
+            if self.refcount[slot] == 0:
+                self.slot_freed.notify()
+
+    def get_stats(self):
+        """
+        Get current statistics of the ring
+
+        Returns
+        -------
+        dict
+            Number of slots in use, total frames written and frames dropped because no
+            slot was free.
+        """
+        with self.lock:
+            return {
+                'slots': self.slots,
+                'slots_in_use': int(np.count_nonzero(self.refcount)),
+                'total_frames': self.total_frames,
+                'overruns': self.overrun_count
+            }
@@ -0,0 +1,201 @@
+"""
+Recorded depth sessions and memory-mapped replay.
+
+A session is a directory holding:
+    - frames.z16       raw uint16 depth frames, appended back to back
+    - timestamps.f64   capture timestamp of every frame in the camera clock (float64 seconds)
+    - arrivals.f64     host arrival time of every frame (float64 seconds, time.time())
+    - session.json     frame size, depth scale, fps and frame count
+
+Frames are written once with a single copy per frame and replayed through
+np.memmap, so replay never reads a file per frame.
+"""
+
+import json
+import os
+import time
+import numpy as np
+
+FORMAT_VERSION = 1
+
+FRAMES_FILE = "frames.z16"
+TIMESTAMPS_FILE = "timestamps.f64"
+ARRIVALS_FILE = "arrivals.f64"
+META_FILE = "session.json"
+
+
+class DepthRecorder:
+    """
+    Append raw z16 depth frames to a session directory
+
+    Parameters
+    ----------
+    path : str
+        Session directory, created if needed. An existing session is overwritten.
+    width : int
+        Frame width in pixels.
+    height : int
+        Frame height in pixels.
+    depth_scale : float
+        Meters per depth unit of the recorded frames.
+    fps : int
+        Nominal frame rate of the recording.
+    """
+
+    def __init__(self, path, width, height, depth_scale, fps):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.width = width
+        self.height = height
+        self.depth_scale = depth_scale
+        self.fps = fps
+        self.frame_count = 0
+
+        self._frames = open(os.path.join(path, FRAMES_FILE), "wb")
+        self._timestamps = open(os.path.join(path, TIMESTAMPS_FILE), "wb")
+        self._arrivals = open(os.path.join(path, ARRIVALS_FILE), "wb")
+        self._write_meta()
+
+    def write(self, frame, timestamp, arrival_time=None):
+        """
+        Append a frame to the session
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            uint16 depth frame of shape (height, width).
+        timestamp : float
+            Capture timestamp of the frame in the camera clock (seconds).
+        arrival_time : float or None
+            Host time (time.time()) the frame arrived at. If None, the time of the call.
+        """
+        if frame.shape != (self.height, self.width):
+            raise ValueError(f"Expected a {self.width}x{self.height} frame, got shape {frame.shape}")
+
+        np.ascontiguousarray(frame, dtype=np.uint16).tofile(self._frames)
+        np.float64(timestamp).tofile(self._timestamps)
+        np.float64(time.time() if arrival_time is None else arrival_time).tofile(self._arrivals)
+        self.frame_count += 1
+
+    def _write_meta(self):
+        meta = {
+            'version': FORMAT_VERSION,
+            'width': self.width,
+            'height': self.height,
+            'depth_scale': self.depth_scale,
+            'fps': self.fps,
+            'frame_count': self.frame_count
+        }
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def close(self):
+        """
+        Flush the frames and record the final frame count
+        """
+        self._frames.close()
+        self._timestamps.close()
+        self._arrivals.close()
+        self._write_meta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplaySource:
+    """
+    Memory-mapped replay of a recorded depth session
+
+    Parameters
+    ----------
+    path : str
+        Session directory written by DepthRecorder.
+    realtime : bool
+        If True, frames are returned at the pace they were captured. Otherwise they
+        are returned as fast as possible.
+    loop : bool
+        If True, the session restarts from the first frame once it is over.
+
+    Notes
+    -----
+    Frames are read-only views into the memory-mapped session file. `timestamps` holds the
+    capture timestamps, used to pace the replay and returned with the frames; `arrival_times`
+    the recorded host arrival times.
+    """
+
+    def __init__(self, path, realtime=True, loop=False):
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+
+        if meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported depth session version {meta.get('version')} in {path}")
+
+        self.path = path
+        self.width = meta['width']
+        self.height = meta['height']
+        self.depth_scale = meta['depth_scale']
+        self.fps = meta['fps']
+        self.realtime = realtime
+        self.loop = loop
+
+        # Count frames from the file sizes, so an interrupted recording stays readable: the frames
+        # and their timestamps are not flushed together, keep the frames present in every file
+        timestamps = np.fromfile(os.path.join(path, TIMESTAMPS_FILE), dtype=np.float64)
+        arrival_times = np.fromfile(os.path.join(path, ARRIVALS_FILE), dtype=np.float64)
+        frame_bytes = self.width * self.height * 2
+        frame_count = min(os.path.getsize(os.path.join(path, FRAMES_FILE)) // frame_bytes,
+                          len(timestamps), len(arrival_times))
+        if frame_count == 0:
+            raise ValueError(f"Depth session {path} holds no frame")
+
+        self.frames = np.memmap(os.path.join(path, FRAMES_FILE), dtype=np.uint16, mode='r',
+                                shape=(frame_count, self.height, self.width))
+        self.timestamps = timestamps[:frame_count]
+        self.arrival_times = arrival_times[:frame_count]
+
+        self._index = 0
+        self._start = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def rewind(self):
+        """
+        Restart the replay from the first frame
+        """
+        self._index = 0
+        self._start = None
+
+    def next_frame(self):
+        """
+        Get the next frame of the session
+
+        Returns
+        -------
+        tuple or None
+            (frame, capture_timestamp), or None once the session is over.
+        """
+        if self._index >= len(self.frames):
+            if not self.loop:
+                return None
+            self.rewind()
+
+        index = self._index
+        self._index += 1
+
+        if self.realtime:
+            offset = self.timestamps[index] - self.timestamps[0]
+            if self._start is None:
+                self._start = time.time() - offset
+            delay = self._start + offset - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        return self.frames[index], float(self.timestamps[index])
+
+    def __iter__(self):
+        while (item := self.next_frame()) is not None:
+            yield item
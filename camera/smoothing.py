@@ -0,0 +1,145 @@
+"""
+Streaming smoothers for per-zone distance vectors.
+
+All zones are smoothed together as one vector over a fixed-capacity window backed
+by preallocated arrays. Every method updates its state with the value leaving the
+window and the value entering it, instead of recomputing over the whole history:
+the mean and EMA cost O(zones) per frame, the median O(zones * log H) comparisons
+with H the window length (FRAMES_HISTORY), plus the shift of a sorted list.
+"""
+
+from bisect import bisect_left, insort
+import numpy as np
+
+METHODS = ('median', 'mean', 'ema')
+
+
+class RollingSmoother:
+    """
+    Fixed-capacity rolling window over vectors of zone values
+
+    Parameters
+    ----------
+    capacity : int
+        Number of frames kept in the window (FRAMES_HISTORY).
+    width : int
+        Number of values per frame (one per zone).
+    method : str
+        'median' (NaN-ignoring rolling median, same result as np.nanmedian over the window),
+        'mean' (NaN-ignoring rolling mean) or 'ema' (exponential moving average).
+    alpha : float
+        Weight of the newest value for the 'ema' method.
+
+    Notes
+    -----
+    NaN values (zones without valid pixels) are ignored. A zone whose window only holds
+    NaN values is smoothed to NaN.
+
+    The median method keeps the valid values of every zone in a sorted list: each frame
+    deletes the value leaving the window and inserts the new one by binary search, and
+    the median is read at the middle of the list.
+    """
+
+    def __init__(self, capacity, width, method='median', alpha=0.5):
+        if capacity < 1:
+            raise ValueError(f"Smoother capacity must be at least 1, got {capacity}")
+        if method not in METHODS:
+            raise ValueError(f"Unknown smoothing method '{method}', expected one of {METHODS}")
+
+        self.capacity = capacity
+        self.width = width
+        self.method = method
+        self.alpha = alpha
+
+        self._window = np.full((capacity, width), np.nan)
+        self._sorted = [[] for _ in range(width)]  # Valid values of every zone, sorted
+        self._index = 0
+
+        # Running state for the mean and EMA methods
+        self._sum = np.zeros(width)
+        self._count = np.zeros(width, dtype=np.intp)
+        self._ema = np.full(width, np.nan)
+
+        self._output = np.full(width, np.nan)
+
+    def reset(self):
+        """
+        Forget all the values in the window
+        """
+        self._window.fill(np.nan)
+        self._index = 0
+        for values in self._sorted:
+            values.clear()
+        self._sum.fill(0.0)
+        self._count.fill(0)
+        self._ema.fill(np.nan)
+        self._output.fill(np.nan)
+
+    def update(self, values):
+        """
+        Push a new vector of zone values and return the smoothed vector
+
+        Parameters
+        ----------
+        values : array_like
+            New value for every zone, NaN for missing values.
+
+        Returns
+        -------
+        np.ndarray
+            Smoothed value for every zone. The array is reused by the next call.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        slot = self._window[self._index]
+
+        # Incremental count of the valid values in the window
+        self._count -= ~np.isnan(slot)
+        self._count += ~np.isnan(values)
+        if self.method == 'mean':
+            self._sum -= np.nan_to_num(slot)
+            self._sum += np.nan_to_num(values)
+
+        if self.method == 'median':
+            self._update_median(slot.tolist(), values.tolist())
+
+        slot[:] = values
+        self._index = (self._index + 1) % self.capacity
+
+        if self.method == 'mean':
+            np.divide(self._sum, self._count, out=self._output, where=self._count > 0)
+            self._output[self._count == 0] = np.nan
+        elif self.method == 'ema':
+            self._update_ema(values)
+
+        return self._output
+
+    def _update_median(self, leaving, entering):
+        """
+        Rolling median of the valid values in the window
+
+        Parameters
+        ----------
+        leaving : list of float
+            Values of the oldest frame, replaced in the window.
+        entering : list of float
+            Values of the new frame.
+        """
+        for zone, (old, new) in enumerate(zip(leaving, entering)):
+            values = self._sorted[zone]
+            if old == old:  # Not NaN
+                del values[bisect_left(values, old)]
+            if new == new:
+                insort(values, new)
+
+            count = len(values)
+            self._output[zone] = (values[(count - 1) // 2] + values[count // 2]) / 2 if count else np.nan
+
+    def _update_ema(self, values):
+        """
+        Exponential moving average, NaN values keep the previous average
+        """
+        valid = ~np.isnan(values)
+        first = valid & np.isnan(self._ema)
+        self._ema[valid] += self.alpha * (values[valid] - self._ema[valid])
+        self._ema[first] = values[first]
+        np.copyto(self._output, self._ema)
@@ -0,0 +1,392 @@
+"""
+Zone statistics engine for raw z16 depth frames.
+
+The region of interest (ROI) of a depth frame is split into a grid of zones and all
+zone statistics (median, min, valid pixel count, percentiles) are computed in a single
+vectorized pass over the raw uint16 buffer. Depth values are only converted to meters
+once per statistic, never per pixel.
+"""
+
+import numpy as np
+
+# Names of the three zone groups used by the rest of the pipeline
+ZONE_NAMES = ('gauche', 'centre', 'droite')
+
+BACKENDS = ('sort', 'histogram')
+
+
+class ZoneStatistics:
+    """
+    Single-pass statistics over an N x M grid of zones in the depth ROI
+
+    Parameters
+    ----------
+    rows : int
+        Number of zone rows in the grid.
+    cols : int
+        Number of zone columns in the grid.
+    margin_x : float
+        Horizontal margin (fraction of the width) removed on each side of the frame.
+    margin_y : float
+        Vertical margin (fraction of the height) removed on each side of the frame.
+    percentiles : tuple of float
+        Percentiles (0-100) computed for every zone.
+    backend : str
+        'sort' to radix-sort every zone, or 'histogram' to rank pixels through a
+        cumulative histogram of the raw depth values. Both give identical results.
+    profile : DepthProfile or None
+        If set, full-grid results also hold the per-column depth profile of the frame.
+
+    Notes
+    -----
+    The ROI is cropped to a multiple of the grid size so every zone holds the same number
+    of pixels. The zones are copied once into a preallocated (zones, pixels) uint16 buffer.
+    Every statistic is then a lookup of the k-th smallest raw value of a zone, where
+    invalid (zero) pixels always hold the lowest ranks.
+    """
+
+    def __init__(self, rows=1, cols=3, margin_x=0.10, margin_y=0.10, percentiles=(10, 90), backend='sort', profile=None):
+        if rows < 1 or cols < 1:
+            raise ValueError(f"Zone grid must be at least 1x1, got {rows}x{cols}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown zone statistics backend '{backend}', expected one of {BACKENDS}")
+
+        self.rows = rows
+        self.cols = cols
+        self.margin_x = margin_x
+        self.margin_y = margin_y
+        self.percentiles = np.asarray(percentiles, dtype=np.float64)
+        self.backend = backend
+        self.profile = profile
+
+        self._shape = None
+        self._bounds = None
+        self._buffers = {}
+
+    @property
+    def zone_count(self):
+        return self.rows * self.cols
+
+    def roi_bounds(self, shape):
+        """
+        Compute the ROI bounds and zone size for a frame shape
+
+        Parameters
+        ----------
+        shape : tuple
+            Shape (height, width) of the depth frame.
+
+        Returns
+        -------
+        tuple
+            (y1, y2, x1, x2, zone_h, zone_w) with the ROI cropped to a multiple of the grid.
+        """
+        if shape != self._shape:
+            h, w = shape
+            y1, y2 = int(self.margin_y*h), int((1-self.margin_y)*h)
+            x1, x2 = int(self.margin_x*w), int((1-self.margin_x)*w)
+
+            zone_h = (y2 - y1) // self.rows
+            zone_w = (x2 - x1) // self.cols
+            if zone_h == 0 or zone_w == 0:
+                raise ValueError(f"Frame {w}x{h} too small for a {self.rows}x{self.cols} zone grid")
+
+            self._shape = shape
+            self._bounds = (y1, y1 + zone_h*self.rows, x1, x1 + zone_w*self.cols, zone_h, zone_w)
+            self._buffers = {}
+
+        return self._bounds
+
+    def zone_blocks(self, depth, stride=1, zones=None):
+        """
+        Copy the zones of a depth frame into a (zones, pixels) buffer
+
+        Parameters
+        ----------
+        depth : np.ndarray
+            Raw uint16 depth frame.
+        stride : int
+            Subsampling step inside each zone, in both directions.
+        zones : sequence of int or None
+            Flat (row-major) indices of the zones to copy. If None, all zones are copied.
+
+        Returns
+        -------
+        np.ndarray
+            Buffer of shape (zones, pixels), zones in row-major order.
+            The buffer is reused by the next call with the same stride and zone count.
+        """
+        y1, y2, x1, x2, zone_h, zone_w = self.roi_bounds(depth.shape)
+        roi = depth[y1:y2, x1:x2].reshape(self.rows, zone_h, self.cols, zone_w)[:, ::stride, :, ::stride]
+        rows, sample_h, cols, sample_w = roi.shape
+
+        count = self.zone_count if zones is None else len(zones)
+        blocks = self._buffers.get((stride, count))
+        if blocks is None:
+            blocks = self._buffers[(stride, count)] = np.empty((count, sample_h*sample_w), dtype=np.uint16)
+
+        if zones is None:
+            np.copyto(blocks.reshape(rows, cols, sample_h, sample_w), roi.transpose(0, 2, 1, 3))
+        else:
+            for i, zone in enumerate(zones):
+                row, col = divmod(zone, cols)
+                np.copyto(blocks[i].reshape(sample_h, sample_w), roi[row, :, col, :])
+        return blocks
+
+    def compute(self, depth, depth_scale, stride=1, zones=None):
+        """
+        Compute the zone statistics of a depth frame
+
+        Parameters
+        ----------
+        depth : np.ndarray
+            Raw uint16 depth frame.
+        depth_scale : float
+            Meters per depth unit.
+        stride : int
+            Subsampling step inside each zone, 1 for full resolution.
+        zones : sequence of int or None
+            Flat (row-major) indices of the zones to compute. If None, all zones are computed.
+
+        Returns
+        -------
+        dict
+            'median', 'min' (meters) and 'valid' (pixel count) arrays of shape (rows, cols),
+            and 'percentiles' of shape (len(percentiles), rows, cols). Zones without any
+            valid pixel are NaN. With `zones`, the arrays hold one entry per requested zone
+            instead of the (rows, cols) grid. Otherwise, with a `profile`, 'profile' holds
+            the per-column depth profile.
+        """
+        blocks = self.zone_blocks(depth, stride, zones)
+
+        if self.backend == 'histogram':
+            rank_values, valid = self._histogram_ranks(blocks)
+        else:
+            rank_values, valid = self._sorted_ranks(blocks)
+
+        grid = (self.rows, self.cols) if zones is None else (len(zones),)
+        stats = self._stats(rank_values, valid, blocks.shape[1], depth_scale, grid)
+
+        if self.profile is not None and zones is None:
+            stats['profile'] = self.profile.compute(depth, depth_scale)
+        return stats
+
+    @staticmethod
+    def _sorted_ranks(blocks):
+        """
+        Rank lookup backed by sorting every zone in place
+        """
+        blocks.sort(axis=1, kind='stable')  # radix sort for uint16
+        valid = np.count_nonzero(blocks, axis=1)
+
+        def rank_values(ranks):
+            return np.take_along_axis(blocks, ranks.T, axis=1).T
+
+        return rank_values, valid
+
+    @staticmethod
+    def _histogram_ranks(blocks):
+        """
+        Rank lookup backed by a cumulative histogram of the raw depth values of every zone
+
+        Notes
+        -----
+        Each histogram is bounded by the largest value of its zone. Zero pixels all land in
+        bin 0, so they are skipped without building a mask.
+        """
+        cumulative = [np.cumsum(np.bincount(zone)) for zone in blocks]
+        valid = np.array([blocks.shape[1] - cum[0] for cum in cumulative])
+
+        def rank_values(ranks):
+            values = np.empty(ranks.shape, dtype=np.intp)
+            for zone, cum in enumerate(cumulative):
+                values[:, zone] = np.searchsorted(cum, ranks[:, zone], side='right')
+            return values
+
+        return rank_values, valid
+
+    def _stats(self, rank_values, valid, pixels, depth_scale, grid):
+        """
+        Extract the statistics from a lookup of the k-th smallest raw value of every zone
+
+        Notes
+        -----
+        Ranks count the zero pixels, which always come first: the first valid pixel of a
+        zone has rank (pixels - valid).
+        """
+        first = pixels - valid
+        empty = valid == 0
+        last = np.maximum(valid - 1, 0)
+
+        # Linear interpolation between closest ranks (np.percentile default)
+        position = first + self.percentiles[:, None] / 100.0 * last
+        below = np.floor(position).astype(np.intp)
+        frac = position - below
+
+        ranks = np.vstack([first, first + last // 2, first + valid // 2, below, below + 1])
+        values = rank_values(np.minimum(ranks, pixels - 1))
+        minimum, mid_lo, mid_hi = values[:3]
+        p_lo, p_hi = np.split(values[3:].astype(np.float64), 2)
+
+        # Median of the valid pixels, computed exactly like np.median on float32 meters
+        scale = np.float32(depth_scale)
+        mid_lo = mid_lo.astype(np.float32) * scale
+        mid_hi = mid_hi.astype(np.float32) * scale
+        median = ((mid_lo + mid_hi) / np.float32(2)).astype(np.float64)
+
+        minimum = minimum.astype(np.float64) * depth_scale
+        percentiles = (p_lo + (p_hi - p_lo) * frac) * depth_scale
+
+        median[empty] = np.nan
+        minimum[empty] = np.nan
+        percentiles[:, empty] = np.nan
+
+        return {
+            'median': median.reshape(grid),
+            'min': minimum.reshape(grid),
+            'valid': valid.reshape(grid),
+            'percentiles': percentiles.reshape((len(self.percentiles),) + grid)
+        }
+
+
+class CoarseToFine:
+    """
+    Coarse-to-fine zone statistics around distance thresholds
+
+    Parameters
+    ----------
+    zone_stats : ZoneStatistics
+        Engine computing the statistics at both resolutions.
+    stride : int
+        Subsampling step of the coarse pass, 2 keeps 1/4 of the pixels and 4 keeps 1/16.
+    thresholds : tuple of float
+        Distances (meters) where a decision is taken, e.g. the alert and attention distances.
+    margin : float
+        Error bound (meters) of the coarse medians. Zones whose coarse median is within this
+        distance of a threshold are refined at full resolution.
+
+    Notes
+    -----
+    Zones far from every threshold keep their coarse statistics, so the threshold decisions
+    are unchanged as long as the coarse median error stays below `margin` (see
+    camera/bench_depth.py --session to check it on recorded data). Zones without a valid
+    coarse pixel are always refined. Coarse 'valid' counts are scaled to full resolution and
+    coarse 'min' values are the minimum of the sampled pixels. The result gains a 'refined'
+    mask of the zones computed at full resolution.
+    """
+
+    def __init__(self, zone_stats, stride=4, thresholds=(1.0, 2.0), margin=0.25):
+        self.zone_stats = zone_stats
+        self.stride = stride
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.margin = margin
+
+    def roi_bounds(self, shape):
+        return self.zone_stats.roi_bounds(shape)
+
+    def compute(self, depth, depth_scale):
+        """
+        Compute the zone statistics of a depth frame, refining the zones near a threshold
+
+        Parameters
+        ----------
+        depth : np.ndarray
+            Raw uint16 depth frame.
+        depth_scale : float
+            Meters per depth unit.
+
+        Returns
+        -------
+        dict
+            Zone statistics (see ZoneStatistics.compute) with a 'refined' mask.
+        """
+        stats = self.zone_stats.compute(depth, depth_scale, stride=self.stride)
+        stats['valid'] = stats['valid'] * self.stride**2
+
+        median = stats['median'].ravel()
+        near = np.isnan(median) | (np.abs(median[:, None] - self.thresholds) < self.margin).any(axis=1)
+        refine = np.flatnonzero(near)
+
+        if refine.size:
+            fine = self.zone_stats.compute(depth, depth_scale, zones=refine)
+            for key in ('median', 'min', 'valid'):
+                stats[key].reshape(-1)[refine] = fine[key]
+            stats['percentiles'].reshape(len(self.zone_stats.percentiles), -1)[:, refine] = fine['percentiles']
+
+        stats['refined'] = near.reshape(stats['median'].shape)
+        return stats
+
+
+class DepthProfile:
+    """
+    Per-column profile of the nearest robust depth across the ROI
+
+    Parameters
+    ----------
+    bins : int
+        Number of column bins across the ROI width.
+    percentile : float
+        Percentile (0-100) of the valid pixels of a bin used as its robust nearest depth.
+    stride : int
+        Subsampling step inside each bin, in both directions.
+    margin_x : float
+        Horizontal margin (fraction of the width) removed on each side of the frame.
+    margin_y : float
+        Vertical margin (fraction of the height) removed on each side of the frame.
+
+    Notes
+    -----
+    The profile is a 1 x bins zone grid: all bins are sorted in a single call, and a low
+    percentile ignores isolated noisy pixels that a plain minimum would pick.
+    """
+
+    def __init__(self, bins=16, percentile=10, stride=2, margin_x=0.10, margin_y=0.10):
+        self.bins = bins
+        self.stride = stride
+        self._zones = ZoneStatistics(1, bins, margin_x, margin_y, percentiles=(percentile,), backend='sort')
+
+    def compute(self, depth, depth_scale):
+        """
+        Compute the depth profile of a frame
+
+        Parameters
+        ----------
+        depth : np.ndarray
+            Raw uint16 depth frame.
+        depth_scale : float
+            Meters per depth unit.
+
+        Returns
+        -------
+        np.ndarray
+            float32 array of `bins` distances in meters, left to right, NaN for bins without
+            any valid pixel.
+        """
+        stats = self._zones.compute(depth, depth_scale, stride=self.stride)
+        return stats['percentiles'][0, 0].astype(np.float32)
+
+
+def zone_distances(medians):
+    """
+    Map a grid of zone medians to the named distances used downstream
+
+    Parameters
+    ----------
+    medians : np.ndarray
+        Zone medians of shape (rows, cols), with cols >= 3.
+
+    Returns
+    -------
+    dict
+        Distances in meters for 'gauche', 'centre' and 'droite'.
+
+    Notes
+    -----
+    Grid columns are split in three groups and each group keeps its nearest zone, so a
+    finer grid still reports the closest obstacle on each side.
+    """
+    groups = np.array_split(medians, len(ZONE_NAMES), axis=1)
+    if any(group.shape[1] == 0 for group in groups):
+        raise ValueError(f"At least {len(ZONE_NAMES)} zone columns are needed, got {medians.shape[1]}")
+
+    return {name: float(np.fmin.reduce(group, axis=None)) for name, group in zip(ZONE_NAMES, groups)}
@@ -0,0 +1,246 @@
+from collections import deque
+from queue import Empty
+from threading import Condition, Event
+from typing import Any, Generic, TypeVar
+import time
+
+T = TypeVar('T')
+
+# Backpressure policies, applied when an item is put into a full channel
+DROP_OLDEST = 'drop_oldest'  # The oldest item is overwritten: consumers always find the freshest values
+DROP_NEWEST = 'drop_newest'  # The new item is refused: waiting items are never lost
+BLOCK = 'block'              # The producer waits for room until its deadline, then the new item is refused
+COALESCE = 'coalesce'        # The new item replaces every waiting item: at most one item, the latest
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK, COALESCE)
+
+class Channel(Generic[T]):
+    """
+    Channel is a bounded FIFO between threads whose behaviour when full is set
+    by a backpressure policy, so that buffering can be tuned per stream for
+    latency or completeness.
+    """
+
+    def __init__(self, name: str, capacity: int = 1, policy: str = DROP_OLDEST, deadline: float = 0.01):
+        '''
+        Parameters
+        ----------
+        name : str
+            Name of the channel, used in statistics
+        capacity : int
+            Maximum number of waiting items
+        policy : str
+            One of POLICIES, applied when an item is put into a full channel
+        deadline : float
+            Maximum time (seconds) a producer waits for room with the BLOCK policy
+        '''
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r} for channel {name!r}, expected one of {POLICIES}")
+
+        self.name = name
+        self.capacity = 1 if policy == COALESCE else capacity
+        self.policy = policy
+        self.deadline = deadline
+        self.items = deque()
+        self.condition = Condition()
+        self.listeners = []  # Events of the selectors waiting on this channel
+
+        # Monitoring, updated under the lock so that they stay exact
+        self.total_count = 0
+        self.dropped_count = 0
+        self.received_count = 0
+        self.max_size = 0
+
+    def put(self, item: T) -> bool:
+        '''
+        Add an item, applying the policy if the channel is full
+
+        Parameters
+        ----------
+        item : T
+            The item to be added
+
+        Returns
+        -------
+        bool
+            False if an item was lost: the new one (DROP_NEWEST, BLOCK past the deadline)
+            or waiting ones (DROP_OLDEST, COALESCE)
+        '''
+        with self.condition:
+            self.total_count += 1
+            kept = True
+
+            if len(self.items) >= self.capacity:
+                if self.policy == BLOCK:
+                    end = time.monotonic() + self.deadline
+                    while len(self.items) >= self.capacity and (remaining := end - time.monotonic()) > 0:
+                        self.condition.wait(remaining)
+
+                if len(self.items) >= self.capacity:
+                    if self.policy in (DROP_NEWEST, BLOCK):
+                        self.dropped_count += 1
+                        return False
+                    dropped = len(self.items) - self.capacity + 1
+                    for _ in range(dropped):
+                        self.items.popleft()
+                    self.dropped_count += dropped
+                    kept = False
+
+            self.items.append(item)
+            self.max_size = max(self.max_size, len(self.items))
+            self.condition.notify_all()
+        for listener in self.listeners:
+            listener.set()
+        return kept
+
+    def get(self, timeout: float = None) -> T:
+        '''
+        Remove and return the oldest item
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Time to wait for an item before raising Empty exception, by default None (wait forever).
+            With 0, never waits.
+
+        Returns
+        -------
+        T
+            The oldest item
+        '''
+        with self.condition:
+            if not self.items and (timeout == 0 or not self.condition.wait_for(lambda: self.items, timeout)):
+                raise Empty
+            self.received_count += 1
+            item = self.items.popleft()
+            if self.policy == BLOCK:
+                self.condition.notify_all()
+            return item
+
+    def latest(self) -> Any:
+        '''
+        Return the newest item without removing it
+
+        Returns
+        -------
+        T or None
+            The newest item or None if the channel is empty
+
+        Note
+        ----
+        Takes no lock: reading the end of a deque is atomic.
+        '''
+        try:
+            return self.items[-1]
+        except IndexError:
+            return None
+
+    def drain(self, max_items: int = None) -> list:
+        '''
+        Remove and return the waiting items, oldest first
+
+        Parameters
+        ----------
+        max_items : int, optional
+            Maximum number of items returned, by default None (all of them)
+
+        Returns
+        -------
+        list
+            The removed items, possibly empty
+        '''
+        with self.condition:
+            if max_items is not None and max_items < len(self.items):
+                items = [self.items.popleft() for _ in range(max_items)]
+            else:
+                # Swapping the deque keeps the lock for a constant time whatever the number of items
+                items, self.items = self.items, deque()
+            self.received_count += len(items)
+            if self.policy == BLOCK:
+                self.condition.notify_all()
+        return list(items)
+
+    def qsize(self) -> int:
+        '''
+        Number of waiting items
+        '''
+        return len(self.items)
+
+    def empty(self) -> bool:
+        '''
+        True if no item is waiting
+        '''
+        return not self.items
+
+    def get_stats(self) -> dict:
+        '''
+        Get current statistics of the channel
+
+        Returns
+        -------
+        dict
+            Policy, capacity, waiting items, highest number of waiting items, and counts of
+            items put, dropped (by the policy) and received
+        '''
+        with self.condition:
+            return {
+                'policy': self.policy,
+                'capacity': self.capacity,
+                'size': len(self.items),
+                'max_size': self.max_size,
+                'total': self.total_count,
+                'dropped': self.dropped_count,
+                'received': self.received_count
+            }
+
+class Selector:
+    """
+    Selector waits on several channels at once, like select() on sockets: it
+    wakes up as soon as any of them receives an item, or at a deadline.
+    """
+
+    def __init__(self, channels):
+        '''
+        Parameters
+        ----------
+        channels : iterable of Channel
+            The channels to wait on. The selector stays registered on them, create it once per consumer.
+        '''
+        self.channels = list(channels)
+        self.event = Event()
+        for channel in self.channels:
+            channel.listeners.append(self.event)
+
+    def ready(self) -> list:
+        '''
+        Channels with waiting items, in the order given to the selector
+        '''
+        return [channel for channel in self.channels if channel.items]
+
+    def wait(self, timeout: float = None) -> list:
+        '''
+        Wait until a channel has waiting items
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time to wait in seconds, by default None (wait forever)
+
+        Returns
+        -------
+        list
+            The channels with waiting items, empty if the timeout expired first
+        '''
+        # Cleared before checking, so that an item put in between still wakes the wait
+        self.event.clear()
+        ready = self.ready()
+        if ready or (timeout is not None and timeout <= 0):
+            return ready
+        self.event.wait(timeout)
+        return self.ready()
+
+    def close(self):
+        '''
+        Unregister the selector from its channels
+        '''
+        for channel in self.channels:
+            channel.listeners.remove(self.event)
@@ -1,11 +1,12 @@
 import argparse
 import threading
 import time
-from micro.micro import start_audio_capture
+from micro.micro import start_audio_capture, ANALYSIS_HOP_SIZE
 from camera.camera import start_video_capture
 from raspberry.raspberry import start_processing
 
-def main(no_audio, no_video, debug, simulate):
+def main(no_audio, no_video, debug, simulate, replay=None, record=None, replay_fast=False, depth_process=False,
+         audio_stream=False, stereo=False):
     '''
     Main entry point for the Raspberry Pi system.
     This function starts separate threads for audio capture, video capture and processing.
@@ -18,6 +19,20 @@ def main(no_audio, no_video, debug, simulate):
         If True, video capture is disabled.
     debug : bool
         If True, enables debug mode with verbose logging.
+    simulate : bool
+        If True, uses FakeSerial instead of real serial communication.
+    replay : str or None
+        Recorded depth session replayed instead of the RealSense camera.
+    record : str or None
+        Session directory where the RealSense depth frames are recorded.
+    replay_fast : bool
+        If True, the depth session is replayed as fast as possible instead of real-time.
+    depth_process : bool
+        If True, depth analysis runs in a worker process instead of the capture thread.
+    audio_stream : bool
+        If True, audio is analyzed over a sliding window every STREAM_HOP_DURATION instead of in disjoint chunks.
+    stereo : bool
+        If True, audio is captured on two channels and the direction of sounds weights the left/right intensities.
 
     Notes
     -----
@@ -33,16 +48,22 @@ def main(no_audio, no_video, debug, simulate):
     # Producer thread audio
     if not no_audio:
         print("Starting audio producer...")
-        audio_thread = threading.Thread(target=start_audio_capture, args=(debug,), daemon=True)
+        audio_thread = threading.Thread(target=start_audio_capture, args=(debug, None, False, audio_stream, 2 if stereo else 1),
+                                        daemon=True)
     
     # Producer thread video  
     if not no_video:
         print("Starting video producer...")
-        video_thread = threading.Thread(target=start_video_capture, args=(debug,), daemon=True)
+        video_thread = threading.Thread(target=start_video_capture,
+                                        args=(debug, replay, record, not replay_fast, "process" if depth_process else "thread"),
+                                        daemon=True)
     
     # Consumer thread (processing)
     print("Starting processing threads...")
-    processing_thread = threading.Thread(target=start_processing, args=(no_audio, no_video, debug, simulate), daemon=True)
+    processing_thread = threading.Thread(target=start_processing,
+                                         args=(no_audio, no_video, debug, simulate, ANALYSIS_HOP_SIZE if audio_stream else None,
+                                               2 if stereo else 1),
+                                         daemon=True)
     
     print("Starting all threads...")
     
@@ -89,7 +110,14 @@ if __name__ == "__main__":
 
     parser.add_argument('--debug', action='store_true', help="Enable debug mode with verbose logging")
     parser.add_argument('--simulate', action='store_true', help="Simulate inputs for testing purposes")
+    parser.add_argument('--replay', metavar='SESSION', help="Replay a recorded depth session instead of the camera")
+    parser.add_argument('--replay-fast', action='store_true', help="Replay the depth session as fast as possible")
+    parser.add_argument('--record', metavar='SESSION', help="Record the camera depth frames to a session directory")
+    parser.add_argument('--depth-process', action='store_true', help="Run depth analysis in a worker process")
+    parser.add_argument('--audio-stream', action='store_true', help="Analyze audio over a sliding window every 10ms")
+    parser.add_argument('--stereo', action='store_true', help="Capture stereo audio and estimate the direction of sounds")
 
     args = parser.parse_args()
 
-    main(args.no_audio, args.no_video, args.debug, args.simulate)
+    main(args.no_audio, args.no_video, args.debug, args.simulate, args.replay, args.record, args.replay_fast, args.depth_process,
+         args.audio_stream, args.stereo)
@@ -0,0 +1,205 @@
+"""
+Preallocated ring buffer of audio samples.
+
+The PortAudio callback copies every input block once into a fixed float32
+ring, with at most two slice copies. Analysis windows of a fixed chunk size
+are cut from the ring every hop samples, again with a single copy, so the
+callback never allocates Python objects per sample. The mean square of a
+window comes from a running sum of squares instead of its samples.
+"""
+
+import numpy as np
+
+
+class AudioRing:
+    """
+    Fixed float32 ring of audio samples cut into overlapping or disjoint windows
+
+    Parameters
+    ----------
+    chunk_size : int
+        Number of samples of every window.
+    hop_size : int or None
+        Number of samples between the starts of two windows. If None, windows do not
+        overlap (hop_size = chunk_size).
+    capacity : int or None
+        Number of samples held by the ring. It must hold a window plus the largest
+        written block. If None, four windows.
+    channels : int
+        Number of interleaved channels of the input blocks.
+
+    Notes
+    -----
+    A running sum of squares is kept next to the samples, so the mean square of any window
+    still held by the ring is available without going over its samples again. Every time
+    the writes wrap around the ring, the running sum is re-based on the oldest sample still
+    held: it stays of the order of the energy of one ring of samples instead of growing with
+    the session, so the float64 difference of a quiet window keeps its precision after loud
+    input, however long the session.
+
+    The ring takes no lock: its producer and its window consumer run in the same thread
+    (e.g. the audio callback). Mono windows are 1-D arrays, multichannel
+    windows have shape (chunk_size, channels).
+    """
+
+    def __init__(self, chunk_size, hop_size=None, capacity=None, channels=1):
+        self.chunk_size = chunk_size
+        self.hop_size = hop_size or chunk_size
+        self.capacity = capacity or 4 * max(chunk_size, self.hop_size)
+        self.channels = channels
+
+        if self.capacity <= chunk_size:
+            raise ValueError(f"Audio ring of {self.capacity} samples cannot hold a {chunk_size} samples window")
+
+        self.samples = np.zeros((self.capacity, channels), dtype=np.float32)
+        self.energy = np.zeros(self.capacity)  # Running sum of squares up to every sample, minus rebased
+        self.rebased = 0.0  # Sum of squares subtracted from the running sum by the re-basing
+        self._squares = np.empty(self.capacity)
+        self.written = 0
+        self._next_end = chunk_size
+
+        # Monitoring
+        self.total_chunks = 0
+        self.overrun_count = 0
+
+    def write(self, block):
+        """
+        Copy a block of samples into the ring
+
+        Parameters
+        ----------
+        block : np.ndarray
+            Samples of shape (frames, channels), or (frames,) for mono input.
+        """
+        frames = len(block)
+        if frames > self.capacity - self.chunk_size:
+            raise ValueError(f"Audio block of {frames} samples does not fit in a {self.capacity} samples ring")
+
+        block = block.reshape(frames, self.channels)
+        start = self.written % self.capacity
+        first = min(frames, self.capacity - start)
+        self.samples[start:start + first] = block[:first]
+        self.samples[:frames - first] = block[first:]
+
+        squares = self._squares[:frames]
+        np.einsum('ij,ij->i', block, block, out=squares, dtype=np.float64, casting='unsafe')
+        squares /= self.channels
+        squares[0] += self.energy[(self.written - 1) % self.capacity] if self.written else 0.0
+        np.cumsum(squares, out=squares)
+        self.energy[start:start + first] = squares[:first]
+        self.energy[:frames - first] = squares[first:]
+        self.written += frames
+
+        if start + frames >= self.capacity:
+            # Wrapped: re-base the running sum on the oldest sample still held, the one about to be overwritten
+            base = self.energy[self.written % self.capacity]
+            self.energy -= base
+            self.rebased += base
+
+    def window(self, end, size, out=None):
+        """
+        Copy the `size` samples ending at sample `end` out of the ring
+
+        Parameters
+        ----------
+        end : int
+            Index (since the first written sample) of the sample following the window.
+        size : int
+            Number of samples of the window.
+        out : np.ndarray or None
+            Array of shape (size, channels) receiving the samples. If None, a new array.
+
+        Returns
+        -------
+        np.ndarray
+            The window, 1-D for mono input.
+        """
+        if out is None:
+            out = np.empty((size, self.channels), dtype=np.float32)
+
+        start = (end - size) % self.capacity
+        first = min(size, self.capacity - start)
+        out[:first] = self.samples[start:start + first]
+        out[first:] = self.samples[:size - first]
+        return out[:, 0] if self.channels == 1 else out
+
+    def next_hop(self):
+        """
+        Advance to the next complete window without copying it
+
+        Returns
+        -------
+        int or None
+            Index (since the first written sample) of the sample following the window,
+            or None if not enough samples were written.
+
+        Notes
+        -----
+        If the consumer fell so far behind that the window was overwritten, the pending
+        windows are skipped and the most recent complete window is returned.
+        """
+        if self.written < self._next_end:
+            return None
+
+        if self.written - (self._next_end - self.chunk_size) > self.capacity - 1:
+            skipped = (self.written - self._next_end) // self.hop_size
+            self._next_end += skipped * self.hop_size
+            self.overrun_count += skipped
+
+        end = self._next_end
+        self._next_end += self.hop_size
+        self.total_chunks += 1
+        return end
+
+    def next_chunk(self):
+        """
+        Cut the next complete window out of the ring
+
+        Returns
+        -------
+        np.ndarray or None
+            A new array holding the window, or None if not enough samples were written.
+        """
+        end = self.next_hop()
+        return None if end is None else self.window(end, self.chunk_size)
+
+    def mean_square(self, end, size):
+        """
+        Mean square of the `size` samples ending at sample `end`, averaged over channels
+
+        Notes
+        -----
+        Computed in O(1) from the running sum of squares, which is updated once per sample
+        when blocks are written, and re-based once per wrap of the ring (O(1) amortized).
+        The difference reads the running sum at the sample before the window, so the ring must
+        still hold the `size + 1` samples ending at `end` (only the window for the first one):
+        `written - (end - size - 1) <= capacity`. Windows cut by `next_hop` always satisfy it.
+
+        Raises
+        ------
+        ValueError
+            If the window, or the sample before it, was already overwritten or not written yet.
+        """
+        first = end - size - 1 if end > size else 0  # Oldest sample whose running sum is read
+        if end > self.written or self.written - first > self.capacity:
+            raise ValueError(f"Samples {first} to {end} are not all held by the ring "
+                             f"({self.written} written, capacity {self.capacity})")
+
+        head = self.energy[(end - 1) % self.capacity]
+        tail = self.energy[(end - size - 1) % self.capacity] if end > size else -self.rebased
+        return max(head - tail, 0.0) / size
+
+    def get_stats(self):
+        """
+        Get current statistics of the ring
+
+        Returns
+        -------
+        dict
+            Samples written, windows cut and windows skipped because they were overwritten.
+        """
+        return {
+            'samples': self.written,
+            'chunks': self.total_chunks,
+            'overruns': self.overrun_count
+        }
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the audio analysis at the capture rate and after decimation.
+
+Runs heavy_audio_processing on disjoint chunks of a recorded WAV file (or of a
+synthetic street-like signal) at SAMPLE_RATE, and again after the polyphase
+decimation to a lower rate, fed in callback blocks like audio_callback. Reports
+the CPU time per chunk of both paths, the CPU saved by decimating, and how often
+both paths agree on the sound classification and the dominant frequency. The
+decimated chunks cover the same span of audio as the full-rate ones: the rate
+must give a whole number of samples per chunk, and the filter delay is removed.
+
+Also times the spectral front end and the hazard detector against the
+per-chunk time budget, and lists the hazards detected in the audio. Run it on
+the Raspberry Pi to check the budget on the target. With --fit, the hazard
+templates and background references are first fitted on recordings of every
+class and saved to HAZARD_TEMPLATES, where the live pipeline loads them.
+
+The direction estimate is checked on stereo audio made by delaying a copy of
+the audio by the time difference of known bearings between both microphones.
+
+Usage (from the repository root):
+    uv run python -m micro.bench_audio
+    uv run python -m micro.bench_audio --wav path/to/recording.wav --rate 11025 --block 2048
+    uv run python -m micro.bench_audio --fit horn=horns.wav --fit siren=sirens.wav --fit engine=engines.wav \
+        --fit background=street.wav --wav street.wav
+
+A recording can be made on the Raspberry Pi with:
+    arecord -f S16_LE -r 44100 -c 1 -d 60 recording.wav
+"""
+
+import argparse
+import time
+import wave
+import numpy as np
+from micro.micro import SAMPLE_RATE, CHUNK_DURATION, CHUNK_SIZE, ANALYSIS_RATE, ANALYSIS_CHUNK_SIZE, block_size
+from micro.resampler import build_decimator
+from raspberry.raspberry import heavy_audio_processing_batch, spectral_front_end, hazard_detector, HAZARD_THRESHOLD, \
+    direction_estimator, MIC_DISTANCE, HAZARD_TEMPLATES
+from raspberry.hazard_detector import HAZARD_CLASSES
+from raspberry.direction import SPEED_OF_SOUND
+
+DECIMATION_RATE = 22050
+FREQUENCY_TOLERANCE = 0.05  # Relative difference of dominant frequencies still counted as agreeing
+HAZARD_BUDGET = 0.1  # Share of the chunk period the spectral front end and hazard detector may use
+REPEAT = 500
+PASSES = 5  # Passes over the audio, the fastest one is reported
+BEARINGS = (-90, -60, -30, -10, 0, 10, 30, 60, 90)  # Degrees, negative on the left
+
+
+def read_wav(path):
+    """
+    Read the first channel of a 16-bit or 32-bit PCM WAV file as float32 in [-1, 1]
+    """
+    with wave.open(path, "rb") as f:
+        if f.getframerate() != SAMPLE_RATE:
+            raise ValueError(f"{path} is sampled at {f.getframerate()} Hz, expected {SAMPLE_RATE} Hz")
+
+        width = f.getsampwidth()
+        if width not in (2, 4):
+            raise ValueError(f"{path} uses {8 * width}-bit samples, expected 16 or 32-bit PCM")
+
+        raw = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16 if width == 2 else np.int32)
+        samples = raw.reshape(-1, f.getnchannels())[:, 0]
+    return (samples / float(2 ** (8 * width - 1))).astype(np.float32)
+
+
+def synthetic_audio(seconds, rng):
+    """
+    Generate street-like audio: background noise, an engine hum, a horn, a siren sweep and a bang
+    """
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = rng.normal(0, 0.003, len(t))
+    audio += 0.02 * np.sin(2 * np.pi * 90 * t) * (t > seconds * 0.1)  # Engine hum
+    horn = (t > seconds * 0.3) & (t < seconds * 0.4)
+    audio[horn] += 0.3 * np.sign(np.sin(2 * np.pi * 420 * t[horn]))  # Horn (square wave)
+    siren = (t > seconds * 0.5) & (t < seconds * 0.8)
+    sweep = 700 + 500 * np.sin(2 * np.pi * 0.5 * t[siren])
+    phase = 2 * np.pi * np.cumsum(sweep) / SAMPLE_RATE
+    audio[siren] += 0.1 * (np.sin(phase) + 0.3 * np.sin(2 * phase) + 0.2 * np.sin(3 * phase))  # Siren with harmonics
+    bang = int(seconds * 0.9 * SAMPLE_RATE)
+    audio[bang:bang + 2000] += rng.normal(0, 0.5, 2000) * np.exp(-np.arange(2000) / 300)  # Bang
+    return np.clip(audio, -1, 1).astype(np.float32)
+
+
+def chunked(audio, size):
+    """
+    Split audio into disjoint chunks of `size` samples, dropping the incomplete last one
+    """
+    count = len(audio) // size
+    return audio[:count * size].reshape(count, size, *audio.shape[1:])
+
+
+def process(chunks, sample_rate):
+    """
+    Process chunks one at a time like micro_processing_thread, returning the results and the best time per chunk
+    """
+    best = np.inf
+    for _ in range(PASSES):
+        start = time.perf_counter()
+        results = [heavy_audio_processing_batch(chunk[None], sample_rate=sample_rate)[0] for chunk in chunks]
+        best = min(best, time.perf_counter() - start)
+    return results, best / len(chunks)
+
+
+def decimate(audio, rate, block):
+    """
+    Decimate audio fed in callback blocks, returning the output without the filter delay and the best time
+    """
+    best = np.inf
+    for _ in range(PASSES):
+        decimator = build_decimator(SAMPLE_RATE, rate)
+        start = time.perf_counter()
+        decimated = np.concatenate([decimator.process(audio[i:i + block]) for i in range(0, len(audio), block)])
+        best = min(best, time.perf_counter() - start)
+    return decimated[round(decimator.delay * rate):], best
+
+
+def bench(audio, rate, block=block_size):
+    if CHUNK_SIZE * rate % SAMPLE_RATE:
+        raise ValueError(f"{rate} Hz does not give a whole number of samples per chunk of {CHUNK_SIZE} samples")
+
+    seconds = len(audio) / SAMPLE_RATE
+    print(f"\n{seconds:.1f}s of audio, {SAMPLE_RATE} Hz -> {rate} Hz "
+          f"({type(build_decimator(SAMPLE_RATE, rate)).__name__}, callback blocks of {block} samples)")
+
+    full, full_time = process(chunked(audio, CHUNK_SIZE), SAMPLE_RATE)
+    decimated, decimation_time = decimate(audio, rate, block)
+    reduced, reduced_time = process(chunked(decimated, CHUNK_SIZE * rate // SAMPLE_RATE), rate)
+    count = min(len(full), len(reduced))
+    reduced_time += decimation_time / count
+
+    labels = sum(a.sound_classification == b.sound_classification for a, b in zip(full, reduced))
+    freqs = sum(abs(a.dominant_frequency - b.dominant_frequency) <= FREQUENCY_TOLERANCE * a.dominant_frequency
+                for a, b in zip(full, reduced))
+    db_error = max(abs(a.db_level - b.db_level) for a, b in zip(full, reduced))
+
+    print(f"   full rate: {full_time * 1000:.3f} ms/chunk")
+    print(f"   decimated: {reduced_time * 1000:.3f} ms/chunk "
+          f"(of which decimation {decimation_time / count * 1000:.3f} ms)")
+    print(f"   CPU saved: {(1 - reduced_time / full_time) * 100:.1f}%")
+    print(f"   agreement over {count} chunks: classification {labels / count * 100:.1f}%, "
+          f"dominant frequency {freqs / count * 100:.1f}%, max dB difference {db_error:.2f} dB")
+
+
+def bench_hazard(audio, sample_rate=SAMPLE_RATE):
+    size = int(sample_rate * CHUNK_DURATION)
+    chunks = chunked(audio, size)
+    front_end = spectral_front_end(size, sample_rate)
+    detector = hazard_detector(size, sample_rate)
+    print(f"\nHazard detector at {sample_rate} Hz ({len(detector.filterbank)} mel bands, classes {', '.join(HAZARD_CLASSES)})")
+
+    chunk = chunks[:1]
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        power = front_end.analyze(chunk)['power']
+    spectrum_time = (time.perf_counter() - start) / REPEAT
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        detector.score(power)
+    score_time = (time.perf_counter() - start) / REPEAT
+
+    budget = HAZARD_BUDGET * CHUNK_DURATION
+    total = spectrum_time + score_time
+    print(f"   spectrum: {spectrum_time * 1000:.3f} ms/chunk, hazard scores: {score_time * 1000:.3f} ms/chunk")
+    print(f"   budget: {total * 1000:.3f} ms of {budget * 1000:.1f} ms ({HAZARD_BUDGET * 100:.0f}% of a chunk): "
+          f"{'OK' if total < budget else 'EXCEEDED'}")
+
+    scores = detector.score(front_end.analyze(chunks)['power'])
+    for i, name in enumerate(HAZARD_CLASSES):
+        hits = np.flatnonzero(scores[:, i] >= HAZARD_THRESHOLD)
+        where = ", ".join(f"{hit * CHUNK_DURATION:.1f}s" for hit in hits[:5]) + (" ..." if len(hits) > 5 else "")
+        print(f"   {name}: {len(hits)} chunks{' at ' + where if len(hits) else ''}")
+
+
+def fit_hazard(examples, path=HAZARD_TEMPLATES):
+    """
+    Fit the hazard templates and background references on recordings, and save them for the live pipeline
+
+    Parameters
+    ----------
+    examples : list of str
+        'class=path.wav' entries, class being one of HAZARD_CLASSES or 'background'. Every chunk of
+        a class recording should contain the class sound, and no chunk of a background recording.
+    path : str
+        Destination file (.npz).
+    """
+    detector = hazard_detector(ANALYSIS_CHUNK_SIZE, ANALYSIS_RATE)
+    print(f"\nFitting hazard templates at {ANALYSIS_RATE} Hz")
+    for example in examples:
+        name, _, wav = example.partition('=')
+        if name not in HAZARD_CLASSES + ('background',):
+            raise ValueError(f"Unknown class {name!r} in {example!r}, expected one of {HAZARD_CLASSES + ('background',)}")
+
+        audio = read_wav(wav)
+        if ANALYSIS_RATE != SAMPLE_RATE:
+            audio = build_decimator(SAMPLE_RATE, ANALYSIS_RATE).process(audio)
+        chunks = chunked(audio, ANALYSIS_CHUNK_SIZE)
+        if name == 'background':
+            detector.fit_background(chunks)
+        else:
+            detector.fit_template(name, chunks)
+        print(f"   {name}: {len(chunks)} chunks of {wav}")
+
+    detector.save(path)
+    print(f"   saved to {path}")
+
+
+def delayed_stereo(audio, bearing, sample_rate=SAMPLE_RATE, noise=0.002, rng=None):
+    """
+    Stereo audio of a source at a bearing (degrees, negative on the left), with independent noise on each microphone
+    """
+    delay = -np.sin(np.radians(bearing)) * MIC_DISTANCE / SPEED_OF_SOUND  # Right channel lag
+    spectrum = np.fft.rfft(audio)
+    right = np.fft.irfft(spectrum * np.exp(-2j * np.pi * np.fft.rfftfreq(len(audio), 1.0 / sample_rate) * delay), len(audio))
+    stereo = np.stack([audio, right], axis=1)
+    if rng is not None:
+        stereo += rng.normal(0, noise, stereo.shape)
+    return stereo.astype(np.float32)
+
+
+def bench_direction(audio, sample_rate=SAMPLE_RATE):
+    size = int(sample_rate * CHUNK_DURATION)
+    front_end = spectral_front_end(size, sample_rate)
+    estimator = direction_estimator(size, sample_rate)
+    print(f"\nDirection at {sample_rate} Hz ({MIC_DISTANCE * 100:.0f} cm between microphones, "
+          f"{len(estimator.delays)} candidate delays over {len(estimator.bins)} bins)")
+
+    rng = np.random.default_rng(1)
+    for bearing in BEARINGS:
+        chunks = chunked(delayed_stereo(audio, bearing, sample_rate, rng=rng), size)
+        spectrum = front_end.analyze_stereo(chunks)
+        result = estimator.estimate(spectrum['cross_spectrum'], spectrum['power'])
+        confident = result['confidence'] > 0
+        estimated = np.degrees(np.arcsin(result['direction'][confident]))
+        weights = result['weights'][confident].mean(axis=0)
+        print(f"   {bearing:+4d} deg: median {np.median(estimated):+6.1f} deg, "
+              f"{np.mean(np.abs(estimated - bearing) < 10) * 100:5.1f}% within 10 deg, "
+              f"mean confidence {result['confidence'][confident].mean():.2f}, "
+              f"weights L {weights[0]:.2f} C {weights[1]:.2f} R {weights[2]:.2f}")
+
+    chunk = chunks[:1]
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        spectrum = front_end.analyze_stereo(chunk)
+    spectrum_time = (time.perf_counter() - start) / REPEAT
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        estimator.estimate(spectrum['cross_spectrum'], spectrum['power'])
+    direction_time = (time.perf_counter() - start) / REPEAT
+    print(f"   stereo spectrum: {spectrum_time * 1000:.3f} ms/chunk, direction: {direction_time * 1000:.3f} ms/chunk "
+          f"({direction_time / CHUNK_DURATION * 100:.2f}% of a chunk)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the audio analysis at full and decimated rate.")
+    parser.add_argument('--wav', help=f"Recorded mono WAV file at {SAMPLE_RATE} Hz instead of synthetic audio")
+    parser.add_argument('--rate', type=int, default=DECIMATION_RATE, help="Decimated sample rate in Hz")
+    parser.add_argument('--block', type=int, default=block_size, help="Samples per audio callback block")
+    parser.add_argument('--fit', action='append', default=[], metavar='CLASS=WAV',
+                        help=f"Fit hazard templates on a recording of a class or of the background, saved to {HAZARD_TEMPLATES}")
+    args = parser.parse_args()
+
+    if args.fit:
+        fit_hazard(args.fit)
+
+    audio = read_wav(args.wav) if args.wav else synthetic_audio(20.0, np.random.default_rng(0))
+    bench(audio, args.rate, args.block)
+    bench_hazard(audio)
+    bench_direction(audio)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,44 @@ import numpy as np
 import sounddevice as sd
 import time
 from queue_manager import queue_manager
+from micro.audio_ring import AudioRing
+from micro.resampler import build_decimator
+from micro.onset_detector import OnsetDetector
+from stage_stats import StageStats
 
 DEVICE_NAME = "USB PnP Sound Device"
 CHUNK_DURATION = 1.0 / 15 
 SAMPLE_RATE = 44100
 CHUNK_SIZE = int(SAMPLE_RATE * CHUNK_DURATION)
-
-audio_buffer = []
+BLOCK_SIZE = 2048  # Samples per PortAudio callback
+STREAM_HOP_DURATION = 0.010  # Hop of the streaming analysis
+STREAM_HOP_SIZE = int(SAMPLE_RATE * STREAM_HOP_DURATION)  # Callback block size of the streaming analysis
+
+# Optional decimation before analysis (see micro/resampler.py), e.g. 22050 or 11025 (half-band stages).
+# None analyzes audio at SAMPLE_RATE. Off by default: with ONSET_BLOCK_SIZE callback blocks, the decimation
+# costs about as much as the smaller spectra save (check with micro/bench_audio.py)
+DECIMATION_RATE = None
+ANALYSIS_RATE = DECIMATION_RATE or SAMPLE_RATE
+# Chunks hold the same span of audio at both rates: the rate must give a whole number of samples
+ANALYSIS_CHUNK_SIZE = CHUNK_SIZE * ANALYSIS_RATE // SAMPLE_RATE
+ANALYSIS_HOP_SIZE = STREAM_HOP_SIZE * ANALYSIS_RATE // SAMPLE_RATE
+HOP_SIZE = ANALYSIS_CHUNK_SIZE  # Samples between the starts of two chunks
+
+# Onset detection in the callback, events go straight to the Arduino (see micro/onset_detector.py)
+ONSET_DETECTION = True
+ONSET_HOP_SIZE = int(ANALYSIS_RATE * 0.005)  # 5ms
+# Callback block size with onset detection: hops are only analyzed once their block is delivered,
+# so the block bounds the detection delay (5.8ms instead of 46.4ms with BLOCK_SIZE)
+ONSET_BLOCK_SIZE = 256
+
+decimator = build_decimator(SAMPLE_RATE, DECIMATION_RATE) if DECIMATION_RATE else None
+audio_buffer = AudioRing(ANALYSIS_CHUNK_SIZE, HOP_SIZE)
+onset_detector = OnsetDetector(ONSET_HOP_SIZE, ANALYSIS_RATE) if ONSET_DETECTION else None
 audio_running = False
+block_size = ONSET_BLOCK_SIZE if ONSET_DETECTION else BLOCK_SIZE
+
+STAGE_STATS = StageStats()
+input_overflow_count = 0
 
 def audio_callback(indata, frames, time_info, status):
     """
@@ -25,30 +55,99 @@ def audio_callback(indata, frames, time_info, status):
         Time information
     status : sd.CallbackFlags
         Status of the audio stream
+
+    Notes
+    -----
+    The block is copied once into the preallocated audio ring, and each complete chunk is copied
+    once out of it. With DECIMATION_RATE, the block is resampled to ANALYSIS_RATE first.
+    With ONSET_DETECTION, onset events are sent to the priority queue, stamped with the capture time
+    of the end of their hop in the time.perf_counter() clock ('arrival'): the callback start minus the
+    age of the sample, from the PortAudio currentTime and ADC times when available, else from the
+    samples written after it (then the buffering of the host API is not counted).
+    Every chunk is sent with its capture time, the end of the chunk in the source clock (the PortAudio
+    inputBufferAdcTime when available, else the sample count), its arrival time (time.time()), so that
+    the audio clock can be aligned with the other sensors (see raspberry/clock_sync.py), and the index
+    of the sample following it, so that consumers can tell chunks dropped by the micro channel.
+    The time spent in the callback and in the decimation is recorded in STAGE_STATS.
     """
-    global audio_buffer
-    audio_buffer.extend(indata.flatten())
+    global input_overflow_count
+    callback_start = time.perf_counter()
+    arrival_time = time.time()
+    
+    if status and status.input_overflow:
+        input_overflow_count += 1
+    
+    if decimator:
+        indata = decimator.process(indata)
+        STAGE_STATS.record('decimation', time.perf_counter() - callback_start)
+    
+    audio_buffer.write(indata)
+    
+    # Capture time of the end of the block: PortAudio ADC time if the host API gives it, else the sample clock
+    adc_time = getattr(time_info, 'inputBufferAdcTime', 0.0) if time_info is not None else 0.0
+    if adc_time:
+        block_end = adc_time + frames / SAMPLE_RATE - (decimator.delay if decimator else 0.0)
+    else:
+        block_end = audio_buffer.written / ANALYSIS_RATE
+    
+    if onset_detector:
+        current_time = getattr(time_info, 'currentTime', 0.0) if adc_time else 0.0
+        for event in onset_detector.update(audio_buffer):
+            # Age of the last sample of the onset hop when the callback started
+            age = current_time - (block_end - event['delay']) if current_time else event['delay']
+            event['arrival'] = callback_start - max(age, 0.0)
+            queue_manager.put_priority_event(event)
+    
+    while (end := audio_buffer.next_hop()) is not None:
+        chunk = audio_buffer.window(end, audio_buffer.chunk_size)
+        capture_time = block_end - (audio_buffer.written - end) / ANALYSIS_RATE
+        queue_manager.put_micro_data(chunk, (capture_time, arrival_time, end))
+    
+    STAGE_STATS.record('callback', time.perf_counter() - callback_start)
 
-    while len(audio_buffer) >= CHUNK_SIZE:
-        chunk = np.array(audio_buffer[:CHUNK_SIZE])
-        audio_buffer = audio_buffer[CHUNK_SIZE:]
-        queue_manager.put_micro_data(chunk)
-        
+def get_callback_stats():
+    """
+    Get the timing of the audio callback against the block period.
+
+    Returns
+    -------
+    dict
+        Callback count, mean and max time in milliseconds, block period in milliseconds,
+        worst-case load (max time / block period) and number of input overflows.
+    """
+    period_ms = block_size / SAMPLE_RATE * 1000
+    callback = STAGE_STATS.get_stats().get('callback', {'count': 0, 'mean_ms': 0.0, 'max_ms': 0.0})
+    return {
+        'count': callback['count'],
+        'mean_ms': callback['mean_ms'],
+        'max_ms': callback['max_ms'],
+        'block_period_ms': period_ms,
+        'load': callback['max_ms'] / period_ms,
+        'input_overflows': input_overflow_count
+    }
         
-def simulate_audio_chunk():
+def simulate_audio_chunk(size=CHUNK_SIZE, channels=1):
     """
     Simulate an audio chunk for testing purposes.
 
+    Parameters
+    ----------
+    size : int
+        Number of samples of the chunk
+    channels : int
+        Number of channels, chunks of more than one channel have shape (size, channels)
+
     Returns
     -------
     np.ndarray
         Simulated audio data chunk
     """
-    return np.random.uniform(-1.0, 1.0, CHUNK_SIZE).astype(np.float32)
+    shape = size if channels == 1 else (size, channels)
+    return np.random.uniform(-1.0, 1.0, shape).astype(np.float32)
 
 
 
-def start_audio_capture(debug=False, device_id=None, simulate=False):
+def start_audio_capture(debug=False, device_id=None, simulate=False, stream=False, channels=1):
     """
     Start capturing audio from the specified device.
 
@@ -60,24 +159,47 @@ def start_audio_capture(debug=False, device_id=None, simulate=False):
         The ID of the audio input device to use. If None, will search for the default device.
     simulate : bool
         If True, simulates audio data instead of capturing from a device.
+    stream : bool
+        If True, blocks of STREAM_HOP_DURATION are sent as soon as they are captured, for the
+        streaming analysis (see raspberry.micro_processing_thread). Otherwise chunks of CHUNK_DURATION.
+        Both are sampled at ANALYSIS_RATE.
+    channels : int
+        Number of captured channels. With 2 (stereo microphone pair, left first), chunks have
+        shape (size, 2) and the direction of sounds is estimated (see raspberry/direction.py).
     """
-    global audio_running
+    global audio_running, audio_buffer, block_size, onset_detector
 
     if audio_running:
         if debug:
             print("Audio capture already running, skipping second start.")
         return
 
+    if decimator and channels > 1:
+        raise ValueError("DECIMATION_RATE only supports mono capture, set it to None to capture several channels")
+
+    if CHUNK_SIZE * ANALYSIS_RATE % SAMPLE_RATE:
+        raise ValueError(f"DECIMATION_RATE {DECIMATION_RATE} Hz does not give a whole number of samples per chunk "
+                         f"of {CHUNK_SIZE} samples at {SAMPLE_RATE} Hz, e.g. use 22050 or 14700")
+
     audio_running = True
+    if stream:
+        block_size = STREAM_HOP_SIZE
+    if stream or channels > 1:
+        audio_buffer = AudioRing(ANALYSIS_HOP_SIZE, channels=channels) if stream else \
+                       AudioRing(ANALYSIS_CHUNK_SIZE, HOP_SIZE, channels=channels)
+        if onset_detector:
+            onset_detector = OnsetDetector(ONSET_HOP_SIZE, ANALYSIS_RATE)
     
     if simulate:
         if debug:
             print("[SIMULATION] Starting audio simulation mode...")
         try:
+            samples = 0
             while True:
-                chunk = simulate_audio_chunk()
-                queue_manager.put_micro_data(chunk)
-                time.sleep(CHUNK_DURATION)
+                chunk = simulate_audio_chunk(ANALYSIS_HOP_SIZE if stream else ANALYSIS_CHUNK_SIZE, channels)
+                samples += len(chunk)
+                queue_manager.put_micro_data(chunk, (samples / ANALYSIS_RATE, time.time(), samples))
+                time.sleep(len(chunk) / ANALYSIS_RATE)
         except KeyboardInterrupt:
             print("Simulated audio stopped.")
         finally:
@@ -99,10 +221,16 @@ def start_audio_capture(debug=False, device_id=None, simulate=False):
     if debug:
         print(f"Starting audio capture on device {device_id}...")
 
-    with sd.InputStream(device=device_id, channels=1, samplerate=SAMPLE_RATE, blocksize=2048, callback=audio_callback):
+    with sd.InputStream(device=device_id, channels=channels, samplerate=SAMPLE_RATE, blocksize=block_size, callback=audio_callback):
         try:
+            last_report = time.time()
             while True:
                 time.sleep(0.1)
+                if debug and time.time() - last_report > 10:
+                    last_report = time.time()
+                    stats = get_callback_stats()
+                    print(f"Audio callback: mean {stats['mean_ms']:.3f}ms, max {stats['max_ms']:.3f}ms "
+                          f"({stats['load']*100:.1f}% of {stats['block_period_ms']:.1f}ms block), {stats['input_overflows']} overflows")
         except KeyboardInterrupt:
             print("Audio stopped.")
         except Exception as e:
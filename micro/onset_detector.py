@@ -0,0 +1,98 @@
+"""
+Low-latency onset detector for sudden sounds (bangs, horn attacks).
+
+Runs in the audio callback on short hops (e.g. 5 ms) of the audio ring. The
+energy of every hop comes from the ring's running sum of squares, and an onset
+fires when it rises far enough above a slowly tracked background level: an
+energy derivative in the log domain, with a refractory period so that a single
+event fires once.
+"""
+
+import numpy as np
+
+
+class OnsetDetector:
+    """
+    Energy-rise onset detector over the hops of an AudioRing
+
+    Parameters
+    ----------
+    hop_size : int
+        Number of samples of every analyzed hop.
+    sample_rate : float
+        Sample rate of the ring in Hz.
+    rise_db : float
+        Rise (dB) of the hop level above the background level that fires an onset.
+    min_db : float
+        Minimum hop level (dBFS) of an onset, so that quiet rises are ignored.
+    background_time : float
+        Time constant (seconds) of the background level tracking.
+    refractory_time : float
+        Minimum time (seconds) between two onsets.
+
+    Notes
+    -----
+    The detector reads the ring after every write, from the same thread, and keeps its own
+    position: it analyzes every hop exactly once whatever the block size of the writes.
+    """
+
+    def __init__(self, hop_size, sample_rate, rise_db=12.0, min_db=-35.0, background_time=0.2, refractory_time=0.25):
+        self.hop_size = hop_size
+        self.sample_rate = sample_rate
+        self.rise_db = rise_db
+        self.min_db = min_db
+        self.alpha = 1.0 - np.exp(-hop_size / (background_time * sample_rate))
+        self.refractory = int(refractory_time * sample_rate)
+
+        self.background_db = None
+        self._next_end = hop_size
+        self._last_onset = -self.refractory
+
+        # Monitoring
+        self.total_hops = 0
+        self.onset_count = 0
+
+    def update(self, ring):
+        """
+        Analyze the hops written to the ring since the last call
+
+        Parameters
+        ----------
+        ring : AudioRing
+            Ring holding the audio samples.
+
+        Returns
+        -------
+        list of dict
+            One event per onset: 'sample' (index of the sample ending the hop), 'db_level' of
+            the hop, 'rise_db' above the background and 'delay' (seconds between the end of the
+            hop and the last written sample).
+        """
+        events = []
+        # Hops overwritten before being analyzed are skipped
+        self._next_end = max(self._next_end, ring.written - ring.capacity + self.hop_size + 1)
+
+        while self._next_end <= ring.written:
+            end = self._next_end
+            self._next_end += self.hop_size
+            self.total_hops += 1
+
+            level = 10.0 * np.log10(max(ring.mean_square(end, self.hop_size), 1e-12))
+            if self.background_db is None:
+                self.background_db = level
+                continue
+
+            rise = level - self.background_db
+            if rise >= self.rise_db and level >= self.min_db and end - self._last_onset >= self.refractory:
+                self._last_onset = end
+                self.onset_count += 1
+                events.append({
+                    'sample': end,
+                    'db_level': level,
+                    'rise_db': rise,
+                    'delay': (ring.written - end) / self.sample_rate
+                })
+
+            self.background_db += self.alpha * (level - self.background_db)
+
+        return events
@@ -0,0 +1,205 @@
+"""
+Streaming polyphase resampler.
+
+Resampling from the capture rate to a lower analysis rate by the rational
+factor up/down (e.g. 44100 -> 16000 Hz is 160/441). The anti-alias filter is a
+Kaiser-windowed sinc designed once and split into `up` polyphase branches, so
+every output sample costs a single dot product of `taps_per_phase` input
+samples, and samples that would be thrown away are never computed. Input is
+processed in whole periods of `down` samples, whose `up` outputs always use the
+same branches, so the coefficients are never gathered per sample.
+
+When the capture rate is a power-of-two multiple of the analysis rate (e.g.
+44100 -> 22050 or 11025 Hz), a cascade of half-band stages is much cheaper:
+every other tap of a half-band filter is zero, so each stage is one short
+convolution of the even input samples plus the centre tap on the odd ones.
+build_decimator picks the half-band cascade when it can.
+"""
+
+from fractions import Fraction
+import numpy as np
+
+
+class PolyphaseResampler:
+    """
+    Rational-factor resampler keeping its state across blocks
+
+    Parameters
+    ----------
+    source_rate : int
+        Sample rate of the input blocks in Hz.
+    target_rate : int
+        Sample rate of the output in Hz.
+    taps_per_phase : int
+        Number of filter taps of every polyphase branch.
+    rolloff : float
+        Cutoff of the anti-alias filter, as a fraction of the output Nyquist frequency.
+    beta : float
+        Kaiser window shape parameter of the filter.
+
+    Notes
+    -----
+    Output samples are delayed by half the filter length (`delay` seconds, about taps_per_phase / 2
+    input samples), plus up to one period while its input samples are pending (10 ms for 44100 -> 16000 Hz).
+    The resampler has a single producer, e.g. the audio callback, and takes no lock.
+    """
+
+    def __init__(self, source_rate, target_rate, taps_per_phase=48, rolloff=0.9, beta=8.0):
+        ratio = Fraction(int(target_rate), int(source_rate))
+        self.up = ratio.numerator
+        self.down = ratio.denominator
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.taps = taps_per_phase
+
+        # Windowed sinc at the upsampled rate, cutoff below the lower of both Nyquist frequencies
+        length = taps_per_phase * self.up
+        self.delay = (length - 1) / 2 / (self.up * source_rate)  # Group delay of the filter in seconds
+        cutoff = rolloff / max(self.up, self.down)  # Fraction of the upsampled Nyquist frequency
+        t = np.arange(length) - (length - 1) / 2
+        h = cutoff * np.sinc(cutoff * t) * np.kaiser(length, beta)
+        h *= self.up / h.sum()
+
+        # Branch p holds h[p], h[p + up], ..., reversed to run over increasing input samples
+        self.phases = np.ascontiguousarray(h.reshape(taps_per_phase, self.up).T[:, ::-1], dtype=np.float32)
+
+        # One period of `down` input samples gives `up` output samples, always with the same branches
+        base, phase = np.divmod(np.arange(self.up) * self.down, self.up)
+        self._offsets = base[:, None] + np.arange(taps_per_phase)  # Window of every output in a period
+        self._coefficients = self.phases[phase]
+        self._indices = {}
+
+        self._buffer = np.zeros(taps_per_phase - 1 + 4 * self.down, dtype=np.float32)
+        self._filled = taps_per_phase - 1  # History of the previous period, then pending input samples
+
+    def process(self, block):
+        """
+        Resample a block of input samples
+
+        Parameters
+        ----------
+        block : np.ndarray
+            Mono input samples, (frames,) or (frames, 1).
+
+        Returns
+        -------
+        np.ndarray
+            float32 output samples: `up` samples per complete period of `down` input samples.
+            The input samples of an incomplete period are kept for the next block.
+        """
+        block = block.reshape(-1)
+        end = self._filled + len(block)
+        if end > len(self._buffer):
+            grown = np.zeros(end + 4 * self.down, dtype=np.float32)
+            grown[:self._filled] = self._buffer[:self._filled]
+            self._buffer = grown
+        self._buffer[self._filled:end] = block
+
+        periods = (end - (self.taps - 1)) // self.down
+        indices = self._indices.get(periods)
+        if indices is None:
+            indices = self._indices[periods] = (np.arange(periods) * self.down)[:, None, None] + self._offsets
+
+        windows = np.take(self._buffer, indices)
+        out = np.einsum('pmk,mk->pm', windows, self._coefficients).reshape(-1)
+
+        used = periods * self.down
+        self._buffer[:end - used] = self._buffer[used:end]
+        self._filled = end - used
+        return out
+
+
+class HalfBandDecimator:
+    """
+    Decimator by a power of two, made of half-band stages keeping their state across blocks
+
+    Parameters
+    ----------
+    source_rate : int
+        Sample rate of the input blocks in Hz.
+    target_rate : int
+        Sample rate of the output in Hz, source_rate divided by a power of two.
+    half_width : int
+        Number of non-zero taps on each side of the centre tap of every stage (4 * half_width - 1 taps).
+    beta : float
+        Kaiser window shape parameter of the filter.
+
+    Notes
+    -----
+    At 44100 Hz the filter is flat within 0.01 dB up to 5 kHz, 3.6 dB down at 10 kHz and 27 dB down at
+    15 kHz, so the little aliasing lands above 7 kHz: enough for level, pitch and spectral shape analysis.
+    Every stage delays its output by 2 * half_width - 1 input samples, `delay` seconds in total.
+    """
+
+    def __init__(self, source_rate, target_rate, half_width=4, beta=6.0):
+        factor = Fraction(int(source_rate), int(target_rate))
+        stages = factor.numerator.bit_length() - 1
+        if factor.denominator != 1 or factor.numerator != 1 << stages or stages == 0:
+            raise ValueError(f"{source_rate} Hz -> {target_rate} Hz is not a decimation by a power of two")
+
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.stages = stages
+
+        # Windowed sinc cut at half the input Nyquist frequency: every other tap but the centre is zero
+        length = 4 * half_width - 1
+        t = np.arange(length) - (length - 1) / 2
+        h = 0.5 * np.sinc(0.5 * t) * np.kaiser(length, beta)
+        h /= h.sum()
+        self.length = length
+        self.centre = 2 * half_width - 1
+        self.side = h[0::2].astype(np.float32)  # Taps applied to the even input samples of a window
+        self.middle = np.float32(h[self.centre])
+        self.delay = self.centre * ((1 << stages) - 1) / source_rate
+
+        self._history = [np.zeros(length - 1, dtype=np.float32) for _ in range(stages)]
+
+    def _decimate(self, stage, block):
+        samples = np.concatenate((self._history[stage], block))
+        count = max((len(samples) - self.length) // 2 + 1, 0)
+        out = np.convolve(samples[0:2 * count + self.length - 2:2], self.side, 'valid')
+        out += self.middle * samples[self.centre:self.centre + 2 * count:2]
+        self._history[stage] = samples[2 * count:]
+        return out
+
+    def process(self, block):
+        """
+        Decimate a block of input samples
+
+        Parameters
+        ----------
+        block : np.ndarray
+            Mono input samples, (frames,) or (frames, 1).
+
+        Returns
+        -------
+        np.ndarray
+            float32 output samples, one per 2 ** stages input samples. The input samples that do
+            not complete an output are kept for the next block.
+        """
+        block = block.reshape(-1).astype(np.float32, copy=False)
+        for stage in range(self.stages):
+            block = self._decimate(stage, block)
+        return block
+
+
+def build_decimator(source_rate, target_rate):
+    """
+    Decimator from source_rate to target_rate: half-band stages for a power-of-two factor, else polyphase
+
+    Parameters
+    ----------
+    source_rate : int
+        Sample rate of the input blocks in Hz.
+    target_rate : int
+        Sample rate of the output in Hz.
+
+    Returns
+    -------
+    HalfBandDecimator or PolyphaseResampler
+        Object with a process(block) method and a `delay` attribute in seconds.
+    """
+    factor = Fraction(int(source_rate), int(target_rate))
+    if factor.denominator == 1 and factor.numerator > 1 and factor.numerator & (factor.numerator - 1) == 0:
+        return HalfBandDecimator(source_rate, target_rate)
+    return PolyphaseResampler(source_rate, target_rate)
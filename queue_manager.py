@@ -1,70 +1,115 @@
-from queue import Queue, Full, Empty
 from typing import Any
-import time
+from channel import Channel, Selector, DROP_OLDEST, DROP_NEWEST
+
+# Capacity and backpressure policy of every channel (see channel.py), tune per stream for latency or completeness
+CHANNEL_CONFIG = {
+    'micro': {'capacity': 10, 'policy': DROP_OLDEST},           # Microphone audio chunks
+    'video': {'capacity': 10, 'policy': DROP_OLDEST},           # Camera video data
+    'arduino': {'capacity': 5, 'policy': DROP_OLDEST},          # Commands for the Arduino
+    'audio_processed': {'capacity': 5, 'policy': DROP_OLDEST},  # Processed audio results
+    'video_processed': {'capacity': 5, 'policy': DROP_OLDEST},  # Processed video results
+    # Urgent events (audio onsets) sent to the Arduino without rate limit nor synchronization. Put from the audio
+    # callback, which must never block: when full, the Arduino is already busy with the previous events.
+    'priority': {'capacity': 5, 'policy': DROP_NEWEST},
+}
 
 class QueueManager:
     """
     QueueManager handle separate queues for audio (microphone) data,
     video (camera) data, and commands to be sent to the Arduino.
+    Every queue is a Channel built from a configuration giving its capacity
+    and its policy when full.
     """
-    
-    def __init__(self):
-        # Separate queue for microphone audio data
-        self.micro_queue = Queue(maxsize=10)
-        
-        # Separate queue for camera video data
-        self.video_queue = Queue(maxsize=10)
-        
-        # Separate queue for processed data to be sent to the Arduino
-        self.arduino_queue = Queue(maxsize=5)
-        
-        self.audio_processed_queue = Queue(maxsize=5)
-        self.video_processed_queue = Queue(maxsize=5)
-        
-        # Monitoring
-        self.dropped_micro_count = 0
-        self.dropped_video_count = 0
-        self.dropped_arduino_count = 0
-        self.dropped_audio_processed_count = 0
-        self.dropped_video_processed_count = 0
-        self.total_micro_count = 0
-        self.total_video_count = 0
-        self.total_arduino_count = 0
-        self.total_audio_processed_count = 0
-        self.total_video_processed_count = 0
-        
-    def put_micro_data(self, data: Any):
+
+    def __init__(self, config=None):
+        '''
+        Parameters
+        ----------
+        config : dict, optional
+            Channel settings by channel name, overriding CHANNEL_CONFIG, e.g.
+            {'video_processed': {'capacity': 1, 'policy': 'coalesce'}}
+        '''
+        settings = {name: dict(channel) for name, channel in CHANNEL_CONFIG.items()}
+        for name, channel in (config or {}).items():
+            settings.setdefault(name, {}).update(channel)
+
+        self.channels = {name: Channel(name, **channel) for name, channel in settings.items()}
+        self.micro_queue = self.channels['micro']
+        self.video_queue = self.channels['video']
+        self.arduino_queue = self.channels['arduino']
+        self.audio_processed_queue = self.channels['audio_processed']
+        self.video_processed_queue = self.channels['video_processed']
+        self.priority_queue = self.channels['priority']
+
+    def put(self, name: str, item: Any) -> bool:
+        '''
+        Add an item to a channel, applying its policy if it is full
+
+        Parameters
+        ----------
+        name : str
+            Name of the channel
+        item : Any
+            The item to be added
+
+        Returns
+        -------
+        bool
+            False if an item was dropped by the policy
+        '''
+        return self.channels[name].put(item)
+
+    def get(self, name: str, timeout: float = 1.0) -> Any:
+        '''
+        Get the next item of a channel
+
+        Parameters
+        ----------
+        name : str
+            Name of the channel
+        timeout : float, optional
+            Time to wait for an item before raising Empty exception, by default 1.0 seconds. With 0, never waits.
+
+        Returns
+        -------
+        Any
+            The next item of the channel
+        '''
+        return self.channels[name].get(timeout=timeout)
+
+    def selector(self, *names: str) -> Selector:
+        '''
+        Create a selector waking up on the first item of any of the named channels
+
+        Parameters
+        ----------
+        names : str
+            Names of the channels
+
+        Returns
+        -------
+        Selector
+            The selector, to be created once and reused by a single consumer
         '''
-        Add audio data to the microphone queue
+        return Selector(self.channels[name] for name in names)
+
+    def put_micro_data(self, data: Any, capture=None):
+        '''
+        Add audio data to the microphone channel
 
         Parameters
         ----------
         data : Any
-            The audio data chunk to be added to the queue
+            The audio data chunk to be added to the channel
+        capture : tuple or None, optional
+            (capture time in the source clock, arrival time, index of the sample following the chunk)
+            of the chunk, None if unknown
         '''
-        self.total_micro_count += 1
-        
-        try:
-            self.micro_queue.put_nowait((data, time.time()))
-        except Full:
-            self.dropped_micro_count += 1
-            print(f"MICRO Queue full! Dropped: {self.dropped_micro_count}/{self.total_micro_count}")
-            
-            # Drop oldest data
-            for _ in range(min(3, self.micro_queue.qsize())):
-                try:
-                    self.micro_queue.get_nowait()
-                except Empty:
-                    break
-            
-            try:
-                self.micro_queue.put_nowait((data, time.time()))
-            except Full:
-                print("Micro queue still full!")
-    
+        self.micro_queue.put((data, capture))
+
     def get_micro_data(self, timeout=1.0):
         '''
-        Get the next audio data chunk from the microphone queue
+        Get the next audio data chunk from the microphone channel
 
         Parameters
         ----------
@@ -74,43 +119,44 @@ class QueueManager:
         Returns
         -------
         Any
-            The next audio data chunk from the queue
+            The next audio data chunk from the channel, without its capture times
+        '''
+        return self.micro_queue.get(timeout=timeout)[0]
+
+    def get_micro_data_batch(self, max_items=8, timeout=1.0):
         '''
-        result = self.micro_queue.get(timeout=timeout)
-        return result[0] if isinstance(result, tuple) else result
-    
+        Get the next audio data chunks from the microphone channel, several if they are waiting
+
+        Parameters
+        ----------
+        max_items : int, optional
+            Maximum number of chunks returned, by default 8
+        timeout : float, optional
+            Time to wait for the first chunk before raising Empty exception, by default 1.0 seconds
+
+        Returns
+        -------
+        list of tuple
+            The waiting (audio data chunk, capture) pairs, oldest first (at least one). capture is
+            (capture time in the source clock, arrival time, index of the sample following the chunk)
+            or None.
+        '''
+        return [self.micro_queue.get(timeout=timeout)] + self.micro_queue.drain(max_items - 1)
+
     def put_video_data(self, data: Any):
         '''
-        Add video data to the video queue
+        Add video data to the video channel
 
         Parameters
         ----------
         data : Any
-            The video data chunk to be added to the queue
+            The video data to be added to the channel
         '''
-        self.total_video_count += 1
-        
-        try:
-            self.video_queue.put_nowait((data, time.time()))
-        except Full:
-            self.dropped_video_count += 1
-            print(f"VIDEO Queue full! Dropped: {self.dropped_video_count}/{self.total_video_count}")
-            
-            # Drop oldest data
-            for _ in range(min(3, self.video_queue.qsize())):
-                try:
-                    self.video_queue.get_nowait()
-                except Empty:
-                    break
-            
-            try:
-                self.video_queue.put_nowait((data, time.time()))
-            except Full:
-                print("Video queue still full!")
-    
+        self.video_queue.put(data)
+
     def get_video_data(self, timeout=1.0):
         '''
-        Get the next video data chunk from the video queue
+        Get the next video data from the video channel
 
         Parameters
         ----------
@@ -120,11 +166,10 @@ class QueueManager:
         Returns
         -------
         Any
-            The next video data chunk from the queue
+            The next video data from the channel
         '''
-        result = self.video_queue.get(timeout=timeout)
-        return result[0] if isinstance(result, tuple) else result
-    
+        return self.video_queue.get(timeout=timeout)
+
     def put_arduino_data(self, command: Any):
         '''
         Add commands for the Arduino
@@ -132,27 +177,10 @@ class QueueManager:
         Parameters
         ----------
         command : Any
-            The command to be added to the Arduino queue
+            The command to be added to the Arduino channel
         '''
-        self.total_arduino_count += 1
-        
-        try:
-            self.arduino_queue.put_nowait((command, time.time()))
-        except Full:
-            self.dropped_arduino_count += 1
-            print(f"ARDUINO Queue full! Dropped: {self.dropped_arduino_count}/{self.total_arduino_count}")
-            
-            for _ in range(min(2, self.arduino_queue.qsize())):
-                try:
-                    self.arduino_queue.get_nowait()
-                except Empty:
-                    break
-            
-            try:
-                self.arduino_queue.put_nowait((command, time.time()))
-            except Full:
-                print("Arduino queue still full!")
-    
+        self.arduino_queue.put(command)
+
     def get_arduino_data(self, timeout=1.0):
         '''
         Get the next command for the Arduino
@@ -165,126 +193,114 @@ class QueueManager:
         Returns
         -------
         Any
-            The next command from the Arduino queue
+            The next command from the Arduino channel
         '''
-        result = self.arduino_queue.get(timeout=timeout)
-        return result[0] if isinstance(result, tuple) else result
-    
+        return self.arduino_queue.get(timeout=timeout)
+
     def put_audio_processed_data(self, data):
         """
-        Add processed audio data with timestamp
-        
+        Add processed audio data
+
         Parameters
         ----------
         data : Any
-            The processed audio data to be added to the queue
+            The processed audio data to be added to the channel
         """
-        self.total_audio_processed_count += 1
-        
-        try:
-            self.audio_processed_queue.put_nowait((data, time.time()))
-        except Full:
-            self.dropped_audio_processed_count += 1
-            # Drop oldest data
-            try:
-                self.audio_processed_queue.get_nowait()
-                self.audio_processed_queue.put_nowait((data, time.time()))
-            except Empty:
-                pass
+        self.audio_processed_queue.put(data)
 
     def get_audio_processed_data(self, timeout=0.01):
         """
         Retrieve processed audio data
-        
+
         Parameters
         ----------
         timeout : float
             Time to wait for data before raising Empty exception, by default 0.01 seconds
-        
+
         Returns
         -------
         Any
-            The processed audio data retrieved from the queue
+            The processed audio data retrieved from the channel
         """
-        result = self.audio_processed_queue.get(timeout=timeout)
-        return result[0] if isinstance(result, tuple) else result
+        return self.audio_processed_queue.get(timeout=timeout)
 
     def put_video_processed_data(self, data):
         """
-        Add processed video data with timestamp
-        
+        Add processed video data
+
         Parameters
         ----------
         data : Any
-            The processed video data to be added to the queue
+            The processed video data to be added to the channel
         """
-        self.total_video_processed_count += 1
-        
-        try:
-            self.video_processed_queue.put_nowait((data, time.time()))
-        except Full:
-            self.dropped_video_processed_count += 1
-            # Drop oldest data
-            try:
-                self.video_processed_queue.get_nowait()
-                self.video_processed_queue.put_nowait((data, time.time()))
-            except Empty:
-                pass
+        self.video_processed_queue.put(data)
 
     def get_video_processed_data(self, timeout=0.01):
         """
         Retrieve processed video data
-        
+
         Parameters
         ----------
         timeout : float
             Time to wait for data before raising Empty exception, by default 0.01 seconds
-        
+
         Returns
         -------
         Any
-            The processed video data retrieved from the queue
+            The processed video data retrieved from the channel
+        """
+        return self.video_processed_queue.get(timeout=timeout)
+
+    def put_priority_event(self, event):
+        """
+        Add an urgent event for the Arduino, e.g. an audio onset
+
+        Parameters
+        ----------
+        event : dict
+            The event to be added to the priority channel. With the default DROP_NEWEST policy,
+            the event is dropped if the channel is full, so the caller never blocks
+        """
+        self.priority_queue.put(event)
+
+    def get_priority_event(self, timeout=0.0):
+        """
+        Retrieve the next urgent event
+
+        Parameters
+        ----------
+        timeout : float
+            Time to wait for an event before raising Empty exception, by default 0.0 (never waits)
+
+        Returns
+        -------
+        dict
+            The next event from the priority channel
         """
-        result = self.video_processed_queue.get(timeout=timeout)
-        return result[0] if isinstance(result, tuple) else result
+        return self.priority_queue.get(timeout=timeout)
 
     def peek_latest_audio(self):
         """
-        Retrieves the latest audio data without removing it from the queue
-        
+        Retrieves the latest audio data without removing it from the channel
+
         Returns
         -------
         Any
-            The latest audio data in the queue or None if the queue is empty
+            The latest audio data in the channel or None if it is empty
         """
-        if self.audio_processed_queue.empty():
-            return None
-        # Technique: get puis remet immédiatement
-        try:
-            data = self.audio_processed_queue.get_nowait()
-            self.audio_processed_queue.put_nowait(data)
-            return data[0] if isinstance(data, tuple) else data
-        except (Empty, Full):
-            return None
+        return self.audio_processed_queue.latest()
 
     def peek_latest_video(self):
         """
-        Retrieves the latest video data without removing it from the queue
-        
+        Retrieves the latest video data without removing it from the channel
+
         Returns
         -------
         Any
-            The latest video data in the queue or None if the queue is empty
+            The latest video data in the channel or None if it is empty
         """
-        if self.video_processed_queue.empty():
-            return None
-        try:
-            data = self.video_processed_queue.get_nowait()
-            self.video_processed_queue.put_nowait(data)
-            return data[0] if isinstance(data, tuple) else data
-        except (Empty, Full):
-            return None
-    
+        return self.video_processed_queue.latest()
+
     def get_queue_stats(self):
         '''
         Get current statistics of the queues
@@ -292,29 +308,17 @@ class QueueManager:
         Returns
         -------
         dict
-            A dictionary containing queue sizes, dropped counts, total counts, and drop rates
+            For every channel: '<name>_queue_size', '<name>_dropped', '<name>_total' and '<name>_drop_rate' (%)
         '''
-        return {
-            'micro_queue_size': self.micro_queue.qsize(),
-            'video_queue_size': self.video_queue.qsize(),
-            'audio_processed_queue_size': self.audio_processed_queue.qsize(),
-            'video_processed_queue_size': self.video_processed_queue.qsize(),
-            'arduino_queue_size': self.arduino_queue.qsize(),
-            'micro_dropped': self.dropped_micro_count,
-            'video_dropped': self.dropped_video_count,
-            'audio_processed_dropped': self.dropped_audio_processed_count,
-            'video_processed_dropped': self.dropped_video_processed_count,
-            'arduino_dropped': self.dropped_arduino_count,
-            'micro_total': self.total_micro_count,
-            'video_total': self.total_video_count,
-            'audio_processed_total': self.total_audio_processed_count,
-            'video_processed_total': self.total_video_processed_count,
-            'arduino_total': self.total_arduino_count,
-            'micro_drop_rate': self.dropped_micro_count / max(1, self.total_micro_count) * 100,
-            'video_drop_rate': self.dropped_video_count / max(1, self.total_video_count) * 100,
-            'arduino_drop_rate': self.dropped_arduino_count / max(1, self.total_arduino_count) * 100
-        }
-    
+        stats = {}
+        for name, channel in self.channels.items():
+            channel_stats = channel.get_stats()
+            stats[f'{name}_queue_size'] = channel_stats['size']
+            stats[f'{name}_dropped'] = channel_stats['dropped']
+            stats[f'{name}_total'] = channel_stats['total']
+            stats[f'{name}_drop_rate'] = channel_stats['dropped'] / max(1, channel_stats['total']) * 100
+        return stats
+
     def print_stats(self):
         '''
         Print current queue statistics
@@ -323,11 +327,11 @@ class QueueManager:
         ----
         This function is mainly for debugging purposes.
         '''
-        stats = self.get_queue_stats()
         print(f"\n📊 Queue Stats:")
-        print(f"  Micro: {stats['micro_queue_size']}/10 items, {stats['micro_drop_rate']:.1f}% dropped")
-        print(f"  Video: {stats['video_queue_size']}/10 items, {stats['video_drop_rate']:.1f}% dropped")
-        print(f"  Arduino: {stats['arduino_queue_size']}/5 items, {stats['arduino_drop_rate']:.1f}% dropped")
+        for name, channel in self.channels.items():
+            stats = channel.get_stats()
+            print(f"  {name}: {stats['size']}/{stats['capacity']} items ({stats['policy']}), "
+                  f"{stats['dropped'] / max(1, stats['total']) * 100:.1f}% dropped of {stats['total']}")
 
 # Shared global instance
-queue_manager = QueueManager()
\ No newline at end of file
+queue_manager = QueueManager()
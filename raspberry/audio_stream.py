@@ -0,0 +1,94 @@
+"""
+Streaming audio analysis over a sliding window.
+
+Instead of waiting for a whole disjoint chunk, the analysis window slides
+by a short hop (e.g. 10 ms). The level of every hop comes from the running
+sum of squares of the audio ring, so it costs O(1) per hop, while the
+spectral analysis still runs once per window length of new samples.
+"""
+
+from micro.audio_ring import AudioRing
+
+
+class StreamingAudioAnalyzer:
+    """
+    Sliding-window level and spectrum scheduler over incoming audio blocks
+
+    Parameters
+    ----------
+    window_size : int
+        Number of samples of the analysis window.
+    hop_size : int
+        Number of samples between two level updates.
+    spectrum_interval : int or None
+        Number of new samples between two spectral analyses. If None, one window.
+    channels : int
+        Number of channels of the incoming blocks.
+
+    Notes
+    -----
+    Blocks larger than the ring's free space must be split by the caller; blocks of one
+    hop, as sent by micro.audio_callback in streaming mode, always fit.
+
+    Blocks dropped upstream (e.g. by the DROP_OLDEST micro channel) would splice non-adjacent
+    audio into the windows. When blocks come with the index of their end sample, a block that
+    does not follow the previous one restarts the window: no hop is analyzed until a full
+    window of contiguous samples has been received again.
+    """
+
+    def __init__(self, window_size, hop_size, spectrum_interval=None, channels=1):
+        self.window_size = window_size
+        self.hop_size = hop_size
+        self.spectrum_interval = spectrum_interval or window_size
+        self.channels = channels
+        self.ring = AudioRing(window_size, hop_size, channels=channels)
+        self._next_spectrum = window_size
+        self._next_sample = None  # Stream index expected at the end of the next block
+
+        # Monitoring
+        self.gap_count = 0
+        self.lost_samples = 0
+
+    def reset(self):
+        """
+        Forget the samples received, the next hop is analyzed once a full window is received again
+        """
+        self.ring = AudioRing(self.window_size, self.hop_size, channels=self.channels)
+        self._next_spectrum = self.window_size
+
+    def push(self, block, end=None):
+        """
+        Add a block of samples and analyze every completed hop
+
+        Parameters
+        ----------
+        block : np.ndarray
+            Audio samples, (frames,) or (frames, channels).
+        end : int or None
+            Index in the stream of the sample following the block, None if unknown. If blocks
+            were lost since the previous one, the window restarts with this block.
+
+        Returns
+        -------
+        list of tuple
+            (mean_square, window) for every completed hop, oldest first. `window` is a copy
+            of the analysis window when a spectral analysis is due, None otherwise.
+        """
+        if end is not None:
+            start = end - len(block)
+            if self._next_sample is not None and start != self._next_sample:
+                self.gap_count += 1
+                self.lost_samples += max(start - self._next_sample, 0)
+                self.reset()
+            self._next_sample = end
+
+        self.ring.write(block)
+
+        hops = []
+        while (end := self.ring.next_hop()) is not None:
+            window = None
+            if end >= self._next_spectrum:
+                window = self.ring.window(end, self.window_size)
+                self._next_spectrum = end + self.spectrum_interval
+            hops.append((self.ring.mean_square(end, self.window_size), window))
+        return hops
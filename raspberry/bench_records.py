@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the slotted records against the dict payloads they replaced.
+
+Builds the payloads of the pipeline for every depth frame and audio chunk:
+the camera VideoData, the processed VideoResult and AudioResult and their
+SensorData wrappers in the synchronization buffer, once with the former
+nested dicts and once with the records of raspberry/sensor_data.py. Reports
+the memory, the allocated blocks and the objects still tracked by the garbage
+collector after a collection per frame and chunk (tuples and dicts of atomic
+values are untracked then), the duration of a full collection, and the build
+time while streaming them through queue-sized buffers as the pipeline does.
+
+Usage (from the repository root):
+    uv run python -m raspberry.bench_records
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+import numpy as np
+from raspberry.sensor_data import SensorData, AudioResult, VideoData, VideoResult
+
+COUNT = 1000  # Payloads kept alive to measure their memory
+STREAMED = 100000  # Payloads streamed to time their build
+QUEUE_ITEMS = 20  # Payloads alive at once: video/micro queue, processed queue and sync buffer
+
+
+@dataclass
+class DictSensorData:
+    """
+    SensorData before the records, a dataclass with a __dict__
+    """
+    timestamp: float
+    data: dict
+    source: str
+
+
+def dict_payloads(i, band_energy, hazard_scores):
+    """
+    Payloads of a frame and a chunk with the former dict layout
+    """
+    distance = 1.0 + (i % 7) * 0.3
+    video_data = {
+        'frame_number': i,
+        'mode': 'paisible',
+        'obstacle_info': 'Gauche',
+        'avoid_direction': 'Droite',
+        'distances_raw': {'gauche': distance, 'centre': 2.5, 'droite': 3.0},
+        'distances_smooth': {'gauche': distance, 'centre': 2.5, 'droite': 3.0},
+        'obstacles': ['Gauche'],
+        'depth_profile': None,
+        'timestamp': time.time(),
+        'capture_time': i * 0.066,
+        'simulation_mode': False
+    }
+    video_result = {
+        'mode': video_data['mode'],
+        'obstacle_info': video_data['obstacle_info'],
+        'avoid_direction': video_data['avoid_direction'],
+        'danger_level': 1,
+        'risk_classification': 'medium',
+        'distances': video_data['distances_smooth'],
+        'obstacles_count': len(video_data['obstacles']),
+        'depth_profile': video_data.get('depth_profile'),
+        'frame_number': video_data['frame_number'],
+        'capture_time': video_data.get('capture_time'),
+        'arrival_time': video_data['timestamp'],
+        'timestamp': video_data['timestamp']
+    }
+    audio_result = {
+        'rms': 0.01 + i * 1e-6,
+        'db_level': -40.0 + (i % 11),
+        'sound_classification': 'Normal',
+        'dominant_frequency': 440.0 + i % 13,
+        'spectral_centroid': 1200.0 + i % 17,
+        'band_energy': band_energy.tolist(),
+        'hazard_scores': hazard_scores.tolist(),
+        'hazard': None,
+        'direction': None,
+        'direction_confidence': None,
+        'audio_weights': None,
+        'capture_time': i * 0.066,
+        'arrival_time': time.time(),
+        'timestamp': time.time()
+    }
+    return (video_data, DictSensorData(video_result['timestamp'], video_result, 'video'),
+            DictSensorData(audio_result['timestamp'], audio_result, 'audio'))
+
+
+def record_payloads(i, band_energy, hazard_scores):
+    """
+    Payloads of a frame and a chunk with the slotted records
+    """
+    distance = 1.0 + (i % 7) * 0.3
+    video_data = VideoData(
+        frame_number=i,
+        mode='paisible',
+        obstacle_info='Gauche',
+        avoid_direction='Droite',
+        distances_raw=(distance, 2.5, 3.0),
+        distances_smooth=(distance, 2.5, 3.0),
+        obstacles=('Gauche',),
+        depth_profile=None,
+        timestamp=time.time(),
+        capture_time=i * 0.066,
+        simulation_mode=False
+    )
+    video_result = VideoResult(
+        mode=video_data.mode,
+        obstacle_info=video_data.obstacle_info,
+        avoid_direction=video_data.avoid_direction,
+        danger_level=1,
+        risk_classification='medium',
+        distances=video_data.distances_smooth,
+        obstacles=video_data.obstacles,
+        depth_profile=video_data.depth_profile,
+        frame_number=video_data.frame_number,
+        capture_time=video_data.capture_time,
+        arrival_time=video_data.timestamp,
+        timestamp=video_data.timestamp
+    )
+    audio_result = AudioResult(
+        rms=0.01 + i * 1e-6,
+        db_level=-40.0 + (i % 11),
+        sound_classification='Normal',
+        dominant_frequency=440.0 + i % 13,
+        spectral_centroid=1200.0 + i % 17,
+        band_energy=band_energy,
+        hazard_scores=hazard_scores,
+        capture_time=i * 0.066,
+        arrival_time=time.time(),
+        timestamp=time.time()
+    )
+    return (video_data, SensorData(video_result.timestamp, video_result, 'video'),
+            SensorData(audio_result.timestamp, audio_result, 'audio'))
+
+
+def batch_rows(count):
+    """
+    Band energy and hazard score rows of a batch of chunks, as views of the batch arrays
+    """
+    return list(np.random.default_rng(0).random((count, 4))), list(np.random.default_rng(1).random((count, 3), dtype=np.float32))
+
+
+def measure_memory(build):
+    """
+    Memory (bytes), allocated blocks and objects still tracked by the garbage collector after a collection
+    per frame and chunk, and duration of a full collection, with COUNT payloads kept alive
+    """
+    bands, scores = batch_rows(COUNT)
+    gc.collect()
+    tracked = len(gc.get_objects())
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    payloads = [build(i, bands[i], scores[i]) for i in range(COUNT)]
+    blocks = sys.getallocatedblocks() - blocks
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    gc.collect()  # Untracks the tuples and dicts holding only atomic values
+    tracked = len(gc.get_objects()) - tracked - 1  # The list of payloads is not one of them
+
+    start = time.perf_counter()
+    gc.collect()
+    collect_time = time.perf_counter() - start
+    del payloads
+    return size / COUNT, blocks / COUNT, tracked / COUNT, collect_time
+
+
+def measure_stream(build):
+    """
+    Build time per frame and chunk while streaming payloads through queue-sized buffers
+    """
+    bands, scores = batch_rows(QUEUE_ITEMS)
+    alive = deque(maxlen=QUEUE_ITEMS)
+    start = time.perf_counter()
+    for i in range(STREAMED):
+        alive.append(build(i, bands[i % QUEUE_ITEMS], scores[i % QUEUE_ITEMS]))
+    return (time.perf_counter() - start) / STREAMED
+
+
+def main():
+    print(f"📊 Payloads of a depth frame and an audio chunk ({COUNT} kept alive, {STREAMED} streamed)")
+    results = {}
+    for name, build in (('dicts', dict_payloads), ('records', record_payloads)):
+        size, blocks, tracked, collect_time = measure_memory(build)
+        seconds = measure_stream(build)
+        results[name] = size, blocks, tracked, collect_time
+        print(f"   {name:>7}: {size:6.0f} bytes, {blocks:5.1f} allocated blocks, {tracked:4.1f} GC-tracked objects, "
+              f"{seconds * 1e6:5.2f} us per frame and chunk; full collection with {COUNT} alive: "
+              f"{collect_time * 1000:.2f} ms")
+
+    dicts, records = results['dicts'], results['records']
+    print(f"   records: {(1 - records[0] / dicts[0]) * 100:.0f}% less memory, {(1 - records[1] / dicts[1]) * 100:.0f}% "
+          f"fewer allocated blocks, {(1 - records[2] / dicts[2]) * 100:.0f}% fewer objects for the garbage collector")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the audio/video fusion modes of the Arduino thread.
+
+Replays a simulated session through SyncBuffer at the 25Hz send rate: audio
+chunks of 1/15s delivered in callback blocks and processed in batches, depth
+frames at 15 FPS with a variable processing delay and dropped frames. Every
+send tick builds a message as arduino_communication_thread does, with the
+'match' mode (pairs of results within 50ms, removed once used) and the
+'interpolate' mode (audio features interpolated at the time of the latest
+video result). Reports the share of messages using a single modality
+(fallbacks), the error of the audio level used against the level at the
+video capture time, and the cost of a send tick.
+
+Usage (from the repository root):
+    uv run python -m raspberry.bench_sync
+    uv run python -m raspberry.bench_sync --seconds 120 --video-drop 0.2
+"""
+
+import argparse
+import time
+import numpy as np
+from raspberry.sync_buffer import SyncBuffer
+from raspberry.lcr_message_generator import LCRMessageGenerator, AUDIO_FEATURES
+from raspberry.sensor_data import AudioResult, VideoResult
+
+CHUNK_DURATION = 1.0 / 15.0  # Audio chunk duration (s), see micro/micro.py
+BLOCK_DURATION = 2048 / 44100  # Audio callback block (s)
+AUDIO_DELAY = (0.005, 0.03)  # Range of the audio processing delay (s)
+VIDEO_DELAY = (0.02, 0.08)  # Range of the depth processing delay (s)
+SEND_INTERVAL = 1.0 / 25.0
+MODES = ('match', 'interpolate')
+
+
+def audio_level(t):
+    """
+    Simulated sound level (dB) at time t: slow traffic noise with a passing vehicle every 4s
+    """
+    return -45.0 + 8.0 * np.sin(2 * np.pi * t / 7.0) + 20.0 * np.exp(-((t % 4.0) - 2.0) ** 2 / 0.1)
+
+
+def simulate_events(seconds, video_fps, video_drop, rng):
+    """
+    Arrivals of the processed audio and video results, sorted by arrival time
+
+    Returns
+    -------
+    list of tuple
+        (arrival time, stream name, capture time, result)
+    """
+    events = []
+
+    # Audio chunks complete inside a callback block and are processed with the chunks waiting with them
+    capture = CHUNK_DURATION
+    while capture < seconds:
+        block_end = np.ceil(capture / BLOCK_DURATION) * BLOCK_DURATION
+        arrival = block_end + rng.uniform(*AUDIO_DELAY)
+        events.append((arrival, 'audio', capture, AudioResult(db_level=audio_level(capture))))
+        capture += CHUNK_DURATION
+
+    capture = rng.uniform(0.0, 1.0 / video_fps)  # Frames are not aligned on the audio chunks
+    while capture < seconds:
+        if rng.random() >= video_drop:
+            result = VideoResult(mode='', obstacle_info='Aucun', avoid_direction='Droite', danger_level=0,
+                                 risk_classification='safe', distances=(2.0 + float(np.sin(capture)), 3.0, 4.0),
+                                 obstacles=(), depth_profile=None, frame_number=0, capture_time=capture,
+                                 arrival_time=None, timestamp=capture)
+            events.append((capture + rng.uniform(*VIDEO_DELAY), 'video', capture, result))
+        capture += 1.0 / video_fps
+
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def run(events, mode, seconds):
+    """
+    Send ticks of the Arduino thread over the simulated session in one fusion mode
+    """
+    sync_buffer = SyncBuffer(max_age_ms=150)
+    sync_buffer.register_timeline('audio', AUDIO_FEATURES, LCRMessageGenerator.audio_features)
+    generator = LCRMessageGenerator()
+    counts = {'synced': 0, 'interpolated': 0, 'fallback': 0}
+    errors = []
+    tick_time = 0.0
+
+    position = 0
+    for now in np.arange(SEND_INTERVAL, seconds, SEND_INTERVAL):
+        while position < len(events) and events[position][0] <= now:
+            _, name, capture, result = events[position]
+            sync_buffer.add(name, result, capture)
+            position += 1
+
+        start = time.perf_counter()
+        fused = None
+        if mode == 'interpolate':
+            fused = sync_buffer.get_interpolated('audio', 'video', now)
+            if fused:
+                features, video = fused
+                generator.generate_synchronized_message(LCRMessageGenerator.audio_from_features(features), video.data)
+                counts['interpolated'] += 1
+                errors.append(features['db_level'] - audio_level(video.timestamp))
+        else:
+            fused = sync_buffer.get_synchronized(('audio', 'video'), now)
+            if fused:
+                audio, video = fused
+                generator.generate_synchronized_message(audio.data, video.data)
+                counts['synced'] += 1
+                errors.append(audio.data.db_level - audio_level(video.timestamp))
+
+        if not fused:
+            audio, video = sync_buffer.get_latest_audio(), sync_buffer.get_latest_video()
+            generator.generate_fallback_message(audio_only=audio.data if audio else None,
+                                                video_only=video.data if video else None)
+            counts['fallback'] += 1
+        tick_time += time.perf_counter() - start
+
+    ticks = sum(counts.values())
+    errors = np.abs(errors) if errors else np.zeros(1)
+    print(f"   {mode:>11}: {counts['fallback'] / ticks * 100:5.1f}% fallback messages "
+          f"({counts['synced'] + counts['interpolated']} fused of {ticks}), "
+          f"audio level error {errors.mean():.2f} dB mean / {errors.max():.2f} dB max, "
+          f"{tick_time / ticks * 1e6:.0f} us/tick")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the audio/video fusion modes.")
+    parser.add_argument('--seconds', type=float, default=60.0, help="Duration of the simulated session")
+    parser.add_argument('--video-fps', type=float, default=15.0, help="Depth frame rate")
+    parser.add_argument('--video-drop', type=float, default=0.1, help="Share of depth frames dropped")
+    args = parser.parse_args()
+
+    events = simulate_events(args.seconds, args.video_fps, args.video_drop, np.random.default_rng(0))
+    print(f"📊 Fusion of {args.seconds:.0f}s of audio chunks and {args.video_fps:.0f} FPS depth frames "
+          f"({args.video_drop * 100:.0f}% dropped), messages at {1 / SEND_INTERVAL:.0f}Hz")
+    for mode in MODES:
+        run(events, mode, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
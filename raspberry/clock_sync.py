@@ -0,0 +1,145 @@
+"""
+Online alignment of a source clock (camera, sound card) on the host clock.
+
+Every item of a source carries its capture time in the source clock and its
+arrival time in the host clock (time.time()). Their difference is the clock
+offset plus a transport delay that is never negative, so the offset follows
+the lower envelope of the differences: the minimum of every time segment of
+a sliding window, fitted by a line whose slope is the skew between both
+clocks. Capture times are then mapped to the host clock with the fitted line.
+"""
+
+from collections import deque
+import numpy as np
+
+
+class ClockAligner:
+    """
+    Offset and skew estimate of a source clock against the host clock
+
+    Parameters
+    ----------
+    window : float
+        Duration (seconds of source time) of the history used by the estimate.
+    segments : int
+        Number of time segments of the window whose minimum difference is fitted.
+    latency : float
+        Known fixed delay (seconds) between the capture and the fastest possible arrival,
+        e.g. the USB transfer of a frame. The estimate cannot observe it.
+    min_span : float
+        History (seconds) needed before the skew is estimated, the offset only before.
+    refit_interval : float
+        Source time (seconds) between two fits of the envelope. In between, the offset is only
+        lowered by the items arriving under the line.
+
+    Notes
+    -----
+    A fit costs O(window items) with numpy, other updates O(1).
+    """
+
+    def __init__(self, window=20.0, segments=8, latency=0.0, min_span=2.0, refit_interval=0.5):
+        self.window = window
+        self.segments = segments
+        self.latency = latency
+        self.min_span = min_span
+        self.refit_interval = refit_interval
+        self._next_fit = 0.0
+
+        self.reference = None  # First source time, subtracted to keep the fit well conditioned
+        self.history = deque()  # (source time - reference, arrival - source)
+        self.offset = 0.0
+        self.skew = 0.0
+
+        # Monitoring
+        self.update_count = 0
+        self.delays = deque(maxlen=500)  # Transport delay of the recent items, above the envelope
+
+    def update(self, source_time, arrival_time):
+        """
+        Add a capture/arrival pair and map the capture time to the host clock
+
+        Parameters
+        ----------
+        source_time : float
+            Capture time of an item in the source clock (seconds).
+        arrival_time : float
+            Arrival time of the same item in the host clock (seconds, time.time()).
+
+        Returns
+        -------
+        float
+            The capture time of the item in the host clock.
+        """
+        if self.reference is None:
+            self.reference = source_time
+
+        elapsed = source_time - self.reference
+        self.history.append((elapsed, arrival_time - source_time))
+        while self.history[-1][0] - self.history[0][0] > self.window:
+            self.history.popleft()
+        self.update_count += 1
+        if elapsed >= self._next_fit:
+            self._fit()
+            self._next_fit = elapsed + (self.refit_interval if elapsed >= self.min_span else 0.0)
+        else:
+            # An item under the line means a shorter delay than any seen: lower the line
+            self.offset = min(self.offset, arrival_time - source_time - self.skew * elapsed)
+
+        capture_time = self.to_host(source_time)
+        self.delays.append(arrival_time - capture_time)
+        return capture_time
+
+    def _fit(self):
+        elapsed, difference = np.array(self.history).T
+        span = elapsed[-1] - elapsed[0]
+        if span < self.min_span:
+            self.offset, self.skew = float(difference.min()), 0.0
+            return
+
+        # Lower envelope: the smallest difference of every segment
+        segment = np.minimum(((elapsed - elapsed[0]) / span * self.segments).astype(int), self.segments - 1)
+        order = np.lexsort((difference, segment))
+        first = order[np.flatnonzero(np.diff(segment[order], prepend=-1))]
+        if len(first) < 2:
+            self.offset, self.skew = float(difference.min()), 0.0
+            return
+
+        self.skew, self.offset = (float(value) for value in np.polyfit(elapsed[first], difference[first], 1))
+        # Keep the line under every point, so that no transport delay is negative
+        self.offset += min(0.0, float(np.min(difference - self.skew * elapsed - self.offset)))
+
+    def to_host(self, source_time):
+        """
+        Map a capture time of the source clock to the host clock
+
+        Parameters
+        ----------
+        source_time : float
+            Capture time in the source clock (seconds).
+
+        Returns
+        -------
+        float
+            Capture time in the host clock (seconds).
+        """
+        return source_time + self.offset + self.skew * (source_time - self.reference) - self.latency
+
+    def get_stats(self):
+        """
+        Get the current estimate
+
+        Returns
+        -------
+        dict
+            Offset (s), skew (ppm), number of pairs received and in the window, and the mean and
+            95th percentile (ms) of the recent transport delays from capture to arrival.
+        """
+        delays = np.array(self.delays) if self.delays else np.zeros(1)
+        return {
+            'offset': self.offset,
+            'skew_ppm': self.skew * 1e6,
+            'updates': self.update_count,
+            'window_pairs': len(self.history),
+            'delay_mean_ms': float(delays.mean() * 1000),
+            'delay_p95_ms': float(np.percentile(delays, 95) * 1000)
+        }
@@ -0,0 +1,115 @@
+"""
+Direction of arrival of sounds from a stereo microphone pair.
+
+GCC-PHAT time difference estimate: the cross spectrum of both channels, taken
+from the rfft of the spectral front end, is whitened to its phase and
+correlated against the phase ramps of every candidate delay between both
+microphones. The candidate delays and their phase ramps form a matrix computed
+once, so a batch of chunks costs a single matrix product. The delay gives the
+bearing of the sound, which is turned into left/centre/right audio weights.
+"""
+
+import numpy as np
+
+SPEED_OF_SOUND = 343.0  # m/s
+DEFAULT_AUDIO_WEIGHTS = (0.7, 1.0, 0.7)  # Left, centre, right weights of a sound without direction
+ZONE_DIRECTIONS = (-1.0, 0.0, 1.0)  # Direction (sine of the bearing) at the center of every zone
+
+
+class DirectionEstimator:
+    """
+    Batched GCC-PHAT delay and bearing estimate of stereo chunks
+
+    Parameters
+    ----------
+    front_end : SpectralFrontEnd
+        Spectral front end whose cross spectra are analyzed.
+    mic_distance : float
+        Distance between both microphones in meters.
+    fmin, fmax : float
+        Frequency range (Hz) of the bins used in the correlation.
+    resolution : int
+        Number of candidate delays per sample period.
+    min_db : float
+        Level (dBFS) under which chunks are considered silent and have no direction.
+    full_confidence : float
+        Correlation peak from which the direction fully sets the audio weights. Below it,
+        the weights are blended with DEFAULT_AUDIO_WEIGHTS.
+
+    Notes
+    -----
+    The direction is the sine of the bearing, from -1 (left, the left microphone hears the
+    sound first) to 1 (right). The confidence is the height of the normalized correlation
+    peak, 1 for a pure delay between both channels.
+    """
+
+    def __init__(self, front_end, mic_distance=0.15, fmin=100.0, fmax=8000.0, resolution=4, min_db=-55.0,
+                 full_confidence=0.5):
+        self.front_end = front_end
+        self.mic_distance = mic_distance
+        self.max_delay = mic_distance / SPEED_OF_SOUND
+        self.min_power = 10 ** (min_db / 10)
+        self.full_confidence = full_confidence
+
+        freqs = front_end.freqs
+        self.bins = np.flatnonzero((freqs >= fmin) & (freqs <= fmax))
+
+        # Candidate delays (s) over the physically possible range, right channel relative to left
+        steps = int(np.ceil(self.max_delay * front_end.sample_rate * resolution))
+        self.delays = np.arange(-steps, steps + 1) / (resolution * front_end.sample_rate)
+        self.step = 1.0 / (resolution * front_end.sample_rate)
+
+        # A delay d makes the cross spectrum turn as exp(2j pi f d), undone by the steering matrix
+        self.steering = np.exp(-2j * np.pi * freqs[self.bins, None] * self.delays).astype(np.complex64)
+        self.steering /= len(self.bins)
+
+        self.default_weights = np.asarray(DEFAULT_AUDIO_WEIGHTS)
+        self.zones = np.asarray(ZONE_DIRECTIONS)
+
+    def estimate(self, cross_spectrum, power=None):
+        """
+        Estimate the direction of a batch of stereo chunks
+
+        Parameters
+        ----------
+        cross_spectrum : np.ndarray
+            Cross spectra of shape (count, bins), as returned by SpectralFrontEnd.analyze_stereo.
+        power : np.ndarray or None
+            Power spectra of shape (count, bins). Silent chunks get no direction.
+
+        Returns
+        -------
+        dict
+            Per chunk: 'delay' (s, positive when the right channel lags), 'direction' (-1 left to
+            1 right), 'confidence' in [0, 1] and the 'weights' (count, 3) of the left, centre and
+            right zones.
+        """
+        cross = cross_spectrum[:, self.bins]
+        phat = (cross / (np.abs(cross) + 1e-20)).astype(np.complex64)
+        correlation = (phat @ self.steering).real
+
+        # Strongest delay, refined by a parabola through its neighbours
+        rows = np.arange(len(correlation))
+        peak = np.clip(np.argmax(correlation, axis=1), 1, len(self.delays) - 2)
+        left, center, right = correlation[rows[:, None], peak[:, None] + (-1, 0, 1)].T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = 0.5 * (left - right) / (left - 2 * center + right)
+        offset = np.clip(np.nan_to_num(offset), -0.5, 0.5)
+
+        delay = self.delays[peak] + offset * self.step
+        direction = np.clip(-delay / self.max_delay, -1.0, 1.0)
+        confidence = np.clip(correlation[rows, peak], 0.0, 1.0)
+        if power is not None:
+            confidence[power.sum(axis=1) < self.min_power] = 0.0
+
+        # Triangular weights around the zone directions, blended with the defaults by confidence
+        directional = np.maximum(0.0, 1.0 - np.abs(direction[:, None] - self.zones))
+        blend = np.minimum(confidence / self.full_confidence, 1.0)[:, None]
+        weights = blend * directional + (1.0 - blend) * self.default_weights
+
+        return {
+            'delay': delay,
+            'direction': direction,
+            'confidence': confidence,
+            'weights': weights
+        }
@@ -2,6 +2,7 @@ import time
 from threading import Lock
 import matplotlib.pyplot as plt
 from collections import deque
+from raspberry.lcr_protocol import LCRDecoder, PROTOCOLS, PROTOCOL_REPLY
 
 class FakeSerial:
     """
@@ -9,14 +10,20 @@ class FakeSerial:
     - Generates logs to a file.
     - Stores last LCR values.
     - Optional real-time plot of intensities.
+    - Decodes ASCII and binary messages (see raspberry/lcr_protocol.py) and answers
+      the protocol requests of the supported protocols like the firmware.
     """
 
-    def __init__(self, log_file="fake_serial.log", plot=True, max_points=100):
+    def __init__(self, log_file="fake_serial.log", plot=True, max_points=100, protocols=PROTOCOLS):
         self.lock = Lock()
         self.log_file = log_file
         self.plot = plot
         self.max_points = max_points
         self.running = True
+        self.protocols = protocols  # Protocols of the simulated firmware, ('ascii',) for an older one
+        self.decoder = LCRDecoder()
+        self.replies = deque()  # Lines sent back to the host
+        self.timeout = 0.05
         
         self.L_values = deque(maxlen=max_points)
         self.C_values = deque(maxlen=max_points)
@@ -39,33 +46,44 @@ class FakeSerial:
     def write(self, message_bytes):
         """
         Simulate writing to Arduino serial port.
-        Parse message LCRXXXCXXXRXXX and log it.
+        Decode LCRXXXCXXXRXXX messages or binary frames and log them.
         """
-        message = message_bytes.decode().strip()
         with self.lock:
-            # Log to file
-            with open(self.log_file, "a") as f:
-                f.write(f"{time.time():.3f} {message}\n")
-            
-            # Parse LCR values
-            try:
-                L = int(message[1:4])
-                C = int(message[5:8])
-                R = int(message[9:12])
-            except Exception:
-                L = C = R = 0
-            
-            self.L_values.append(L)
-            self.C_values.append(C)
-            self.R_values.append(R)
-            self.times.append(time.time())
-            
-            # Print fake serial
-            print(f"[FAKE SERIAL] {message}")
-            
-            # Update plot
-            if self.plot:
-                self.update_plot()
+            for kind, payload in self.decoder.feed(message_bytes):
+                if kind == 'request':
+                    if payload in self.protocols:
+                        self.replies.append(PROTOCOL_REPLY + payload.encode() + b'\n')
+                    print(f"[FAKE SERIAL] protocol request: {payload}")
+                    continue
+
+                L, C, R = (tuple(payload) + (0, 0, 0))[:3]
+                message = f"L{L:03d}C{C:03d}R{R:03d}" if len(payload) == 3 else ' '.join(map(str, payload))
+
+                # Log to file
+                with open(self.log_file, "a") as f:
+                    f.write(f"{time.time():.3f} {message}\n")
+
+                self.L_values.append(L)
+                self.C_values.append(C)
+                self.R_values.append(R)
+                self.times.append(time.time())
+
+                # Print fake serial
+                print(f"[FAKE SERIAL] {message}" if kind == 'ascii' else f"[FAKE SERIAL] {message} (binary)")
+
+                # Update plot
+                if self.plot:
+                    self.update_plot()
+
+    def readline(self):
+        """
+        Simulate reading a line sent by the Arduino, b'' after the timeout if there is none
+        """
+        with self.lock:
+            if self.replies:
+                return self.replies.popleft()
+        time.sleep(self.timeout)
+        return b''
     
     def update_plot(self):
         self.l_line.set_ydata(list(self.L_values))
@@ -0,0 +1,279 @@
+"""
+Band-energy hazard detector for street sounds (horns, sirens, engines).
+
+The power spectrum of every chunk is reduced to mel band energies by a
+precomputed filterbank matrix, one matrix-vector product per chunk. The
+mean-removed log band energies are then compared to several templates per
+class and to background references with a second, small matrix product. A
+class scores the cosine similarity of its closest template, and only if it
+beats the closest background reference (noise and pure tones) by a margin:
+broadband noise and steady tones otherwise look enough like engines, horns or
+sirens to raise hazards all the time.
+
+Default templates are built from synthetic prototypes of every class. Templates
+and background references learnt from real recordings replace them with
+`fit_template` and `fit_background`, and are kept in a file with `save`.
+"""
+
+import numpy as np
+from raspberry.spectrum import SpectralFrontEnd
+
+HAZARD_CLASSES = ('horn', 'siren', 'engine')
+HAZARD_THRESHOLD = 0.6  # Minimum template score for a chunk to be labelled with a hazard class
+HAZARD_MARGIN = 0.05  # Minimum lead of a class score over the closest background reference
+NOISE_COLORS = (0, 1, 2)  # Power spectrum exponents of the noise references: white, pink, brown
+TONE_RANGE = (40.0, 8000.0)  # Hz, span of the pure tone references
+TONE_COUNT = 48  # Log-spaced pure tone references
+
+
+def mel_filterbank(freqs, bands=24, fmin=50.0, fmax=8000.0):
+    """
+    Triangular mel filterbank over the bins of a spectrum
+
+    Parameters
+    ----------
+    freqs : np.ndarray
+        Center frequency (Hz) of every spectrum bin.
+    bands : int
+        Number of mel bands.
+    fmin : float
+        Lower edge of the first band in Hz.
+    fmax : float
+        Upper edge of the last band in Hz, clipped to the highest bin.
+
+    Returns
+    -------
+    np.ndarray
+        float32 matrix of shape (bands, bins), each row summing to one.
+    """
+    def mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    edges = 700.0 * (10 ** (np.linspace(mel(fmin), mel(min(fmax, freqs[-1])), bands + 2) / 2595.0) - 1.0)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+
+    rising = (freqs - lower) / (center - lower)
+    falling = (upper - freqs) / (upper - center)
+    weights = np.maximum(0.0, np.minimum(rising, falling))
+
+    # Bands narrower than a bin get the nearest bin, so that no band stays empty
+    empty = weights.sum(axis=1) == 0
+    weights[empty, np.abs(freqs - center[empty]).argmin(axis=1)] = 1.0
+    return (weights / weights.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def prototype(name, size, sample_rate, rng):
+    """
+    Synthetic audio chunk of a hazard class, used to build its default template
+
+    Parameters
+    ----------
+    name : str
+        One of HAZARD_CLASSES.
+    size : int
+        Number of samples.
+    sample_rate : float
+        Sample rate in Hz.
+    rng : np.random.Generator
+        Random generator for the pitch and noise.
+
+    Returns
+    -------
+    np.ndarray
+        float32 chunk.
+    """
+    t = np.arange(size) / sample_rate
+    if name == 'horn':
+        # Square-ish wave with odd harmonics, car horns sit around 300-500 Hz
+        pitch = rng.uniform(300, 500)
+        audio = np.tanh(4 * np.sin(2 * np.pi * pitch * t))
+    elif name == 'siren':
+        # Nearly pure tone sweeping between 600 and 1500 Hz
+        start, rate = rng.uniform(600, 1500), rng.uniform(-2000, 2000)
+        audio = np.sin(2 * np.pi * (start * t + rate * t**2 / 2)) + 0.1 * np.sin(4 * np.pi * start * t)
+    elif name == 'engine':
+        # Low harmonic series with a 1/n falloff over rumbling low-passed noise
+        pitch = rng.uniform(30, 100)
+        audio = sum(np.sin(2 * np.pi * pitch * n * t + rng.uniform(0, 2 * np.pi)) / n for n in range(1, 12))
+        audio += 2 * np.cumsum(rng.normal(0, 0.05, size)) / np.sqrt(size)
+    else:
+        raise ValueError(f"Unknown hazard class {name!r}, expected one of {HAZARD_CLASSES}")
+
+    audio = audio + rng.normal(0, 0.01, size)
+    return (0.3 * audio / np.max(np.abs(audio))).astype(np.float32)
+
+
+def background(size, sample_rate, rng):
+    """
+    Synthetic background chunks: colored noises and pure tones, which must not raise hazards
+
+    Parameters
+    ----------
+    size : int
+        Number of samples.
+    sample_rate : float
+        Sample rate in Hz.
+    rng : np.random.Generator
+        Random generator for the noise and phases.
+
+    Returns
+    -------
+    np.ndarray
+        float32 chunks of shape (len(NOISE_COLORS) + TONE_COUNT, size).
+    """
+    freqs = np.fft.rfftfreq(size, 1.0 / sample_rate)
+    shape = np.maximum(freqs, freqs[1])
+    noises = [np.fft.irfft(np.fft.rfft(rng.normal(0, 1, size)) / shape ** (color / 2), size) for color in NOISE_COLORS]
+
+    t = np.arange(size) / sample_rate
+    tones = [np.sin(2 * np.pi * f * t + rng.uniform(0, 2 * np.pi))
+             for f in np.geomspace(TONE_RANGE[0], min(TONE_RANGE[1], 0.45 * sample_rate), TONE_COUNT)]
+
+    chunks = np.stack(noises + tones)
+    return (0.3 * chunks / np.max(np.abs(chunks), axis=1, keepdims=True)).astype(np.float32)
+
+
+class HazardDetector:
+    """
+    Template scoring of mel band energies, batched over chunks
+
+    Parameters
+    ----------
+    front_end : SpectralFrontEnd
+        Spectral front end whose power spectra are scored. Its buffers are left untouched: the
+        templates are computed with a front end of the same size owned by the detector, so
+        building the detector or fitting a template does not overwrite spectra being scored.
+    bands : int
+        Number of mel bands.
+    min_db : float
+        Level (dBFS) under which chunks are considered silent and score zero.
+    prototypes : int
+        Number of templates of every class, synthetic prototype chunks by default.
+    margin : float
+        Minimum lead of a class score over the closest background reference, under which it scores zero.
+    min_contrast : float
+        Norm of the mean-removed log band energies (nepers) under which a spectrum counts as flat:
+        the profiles of flatter chunks (white noise) are not scaled up, so they score low.
+
+    Notes
+    -----
+    Scores are cosine similarities in [0, 1] (negative similarities are clipped) between the
+    mean-removed log band energies of a chunk and the closest template of every class, so they do
+    not depend on the overall level of the sound. Classes whose pitch varies between sounds keep
+    one template per prototype: an average template would match none of them well.
+    """
+
+    def __init__(self, front_end, bands=24, min_db=-50.0, prototypes=16, margin=HAZARD_MARGIN, min_contrast=8.0):
+        self.front_end = SpectralFrontEnd(front_end.size, front_end.sample_rate, front_end.band_edges)
+        self.classes = HAZARD_CLASSES
+        self.filterbank = mel_filterbank(front_end.freqs, bands, fmax=front_end.sample_rate / 2)
+        self.min_power = 10 ** (min_db / 10)
+        self.prototypes = prototypes
+        self.margin = margin
+        self.min_contrast = min_contrast
+
+        rng = np.random.default_rng(0)
+        self.templates = np.empty((len(self.classes), prototypes, bands), dtype=np.float32)
+        for name in self.classes:
+            chunks = np.stack([prototype(name, front_end.size, front_end.sample_rate, rng) for _ in range(prototypes)])
+            self.fit_template(name, chunks)
+        self.background = self._analyze(background(front_end.size, front_end.sample_rate, rng))
+
+    def _profiles(self, power):
+        # Mean-removed log mel band energies of every chunk, unit-norm unless flatter than min_contrast
+        profiles = np.log(power.astype(np.float32) @ self.filterbank.T + 1e-12)
+        profiles -= profiles.mean(axis=1, keepdims=True)
+        profiles /= np.maximum(np.linalg.norm(profiles, axis=1, keepdims=True), self.min_contrast)
+        return profiles
+
+    def _analyze(self, chunks):
+        return self._profiles(self.front_end.analyze(chunks)['power'])
+
+    def _pick(self, profiles):
+        # `prototypes` profiles evenly spread over the examples
+        return profiles[np.linspace(0, len(profiles) - 1, self.prototypes).round().astype(int)]
+
+    def fit_template(self, name, chunks):
+        """
+        Replace the templates of a class by the profiles of example chunks
+
+        Parameters
+        ----------
+        name : str
+            One of HAZARD_CLASSES.
+        chunks : np.ndarray
+            Example audio chunks of the class, shape (count, size), e.g. cut from a recording.
+            `prototypes` of them, evenly spread over the examples, become the templates.
+        """
+        self.templates[self.classes.index(name)] = self._pick(self._analyze(chunks))
+
+    def fit_background(self, chunks):
+        """
+        Add background references from chunks that must not raise hazards
+
+        Parameters
+        ----------
+        chunks : np.ndarray
+            Background audio chunks, shape (count, size), e.g. cut from a street recording without
+            hazards. `prototypes` of them, evenly spread over the chunks, are added.
+        """
+        self.background = np.concatenate([self.background, self._pick(self._analyze(chunks))])
+
+    def save(self, path):
+        """
+        Save the templates and background references, e.g. after fitting them on recordings
+
+        Parameters
+        ----------
+        path : str
+            Destination file (.npz).
+        """
+        np.savez(path, templates=self.templates, background=self.background, classes=np.array(self.classes),
+                 size=self.front_end.size, sample_rate=self.front_end.sample_rate)
+
+    def load(self, path):
+        """
+        Load the templates and background references saved by `save`
+
+        Parameters
+        ----------
+        path : str
+            File (.npz) written by `save`.
+
+        Returns
+        -------
+        bool
+            False if the file was fitted for another chunk size, sample rate or set of classes,
+            in which case the current templates are kept.
+        """
+        with np.load(path) as saved:
+            if (int(saved['size']) != self.front_end.size or float(saved['sample_rate']) != self.front_end.sample_rate
+                    or tuple(saved['classes']) != self.classes or saved['templates'].shape[2] != len(self.filterbank)):
+                return False
+            self.templates = saved['templates'].astype(np.float32)
+            self.background = saved['background'].astype(np.float32)
+        self.prototypes = self.templates.shape[1]
+        return True
+
+    def score(self, power):
+        """
+        Score power spectra against every class template
+
+        Parameters
+        ----------
+        power : np.ndarray
+            Power spectra of shape (count, bins), as returned by SpectralFrontEnd.analyze.
+
+        Returns
+        -------
+        np.ndarray
+            float32 scores of shape (count, classes), zero for silent chunks and for classes not
+            beating the closest background reference by `margin`.
+        """
+        profiles = self._profiles(power)
+        count, bands = profiles.shape
+        scores = (profiles @ self.templates.reshape(-1, bands).T).reshape(count, len(self.classes), -1).max(axis=2)
+        scores[scores < (profiles @ self.background.T).max(axis=1, keepdims=True) + self.margin] = 0.0
+        np.clip(scores, 0.0, 1.0, out=scores)
+        scores[power.sum(axis=1) < self.min_power] = 0.0
+        return scores
@@ -1,4 +1,6 @@
 from typing import Optional, Dict, Any
+from raspberry.sensor_data import Zones, ZONES
+import numpy as np
 
 class IntensityCalculator:
     """
@@ -30,16 +32,76 @@ class IntensityCalculator:
             return min(100, int(80 + (db_level + 15) * 20 / 10))  # -15+ → 80-100
     
     @staticmethod
-    def vision_to_intensity_by_zone(distances: Dict[str, float], obstacles: list) -> Dict[str, int]:
+    def distance_to_intensity(distance: float) -> int:
+        """
+        Convert a distance to intensity (0-100), without obstacle boost
+
+        Parameters
+        ----------
+        distance : float
+            The distance in meters, NaN for a zone without obstacle pixels
+
+        Returns
+        -------
+        int
+            The corresponding intensity (0-100)
+
+        Notes
+        -----
+        A NaN distance comes from a zone whose pixels are all floor or invalid, e.g. a clear
+        path ahead with floor removal. It is read as no obstacle: beyond the 3m range, intensity 0.
+        """
+        if np.isnan(distance):
+            return 0
+        if distance > 2.0:
+            return max(0, int((3.0 - distance) * 15))  # 0-15 for >2m
+        elif distance > 1.0:
+            return int(15 + (2.0 - distance) * 55)     # 15-70 for 1-2m
+        else:
+            return min(100, int(70 + (1.0 - distance) * 30))  # 70-100 for <1m
+
+    @staticmethod
+    def profile_to_intensities(profile, channels: int = 3) -> list:
+        """
+        Convert a per-column depth profile to intensities for any number of channels
+
+        Parameters
+        ----------
+        profile : array-like
+            Nearest depth (meters) of every column bin, left to right, NaN for empty bins
+        channels : int
+            Number of output channels (e.g. vibration motors), spread left to right
+
+        Returns
+        -------
+        list of int
+            Intensities (0-100) of the channels, from the nearest depth of their column bins
+
+        Notes
+        -----
+        Column bins are split as evenly as possible between channels. A channel whose bins
+        are all empty has no obstacle and gets a zero intensity (see distance_to_intensity).
+        Unlike vision_to_intensity_by_zone, there is no obstacle boost: the nearest depth of a
+        channel already reflects its obstacles.
+        """
+        profile = np.asarray(profile, dtype=np.float64)
+        intensities = []
+        for group in np.array_split(profile, channels):
+            nearest = np.fmin.reduce(group) if group.size else np.nan
+            intensities.append(IntensityCalculator.distance_to_intensity(nearest))
+        return intensities
+
+    @staticmethod
+    def vision_to_intensity_by_zone(distances: Zones, obstacles: tuple) -> Dict[str, int]:
         """
         Convert distances and obstacles to intensities for left, center, right zones
         
         Parameters
         ----------
-        distances : Dict[str, float]
-            Distances for 'gauche', 'centre', 'droite' zones
-        obstacles : list
-            List of detected obstacles (e.g., ['Gauche', 'Centre'])
+        distances : Zones
+            Distances of the 'gauche', 'centre', 'droite' zones, in this order
+        obstacles : tuple
+            Detected obstacles (e.g., ('Gauche', 'Centre'))
         
         Returns
         -------
@@ -48,16 +110,10 @@ class IntensityCalculator:
         """
         zones = {'gauche': 0, 'centre': 0, 'droite': 0}
         
-        for zone in zones.keys():
-            distance = distances.get(zone, 5.0)  # 5m by default
+        for zone, distance in zip(ZONES, distances):
             
             # Intensity based on distance
-            if distance > 2.0:
-                base_intensity = max(0, int((3.0 - distance) * 15))  # 0-15 for >2m
-            elif distance > 1.0:
-                base_intensity = int(15 + (2.0 - distance) * 55)     # 15-70 for 1-2m
-            else:
-                base_intensity = int(70 + (1.0 - distance) * 30)     # 70-100 for <1m
+            base_intensity = IntensityCalculator.distance_to_intensity(distance)
             
             # Boost intensity for obstacles
             zone_mapping = {'gauche': 'Gauche', 'centre': 'Centre', 'droite': 'Droite'}
@@ -1,27 +1,116 @@
 
 from raspberry.intensity_calculator import IntensityCalculator
+from raspberry.sensor_data import AudioResult, VideoResult, Zones, ZONES
 from typing import Optional, Dict, Any
+import time
+import numpy as np
+
+ONSET_HOLD = 0.2  # Seconds during which an onset intensity stays the floor of all channels
+AUDIO_WEIGHTS = (0.7, 1.0, 0.7)  # Audio weights of the zones (gauche, centre, droite) without direction
+AUDIO_FEATURES = ('db_level', 'gauche', 'centre', 'droite')  # Audio features interpolated in time: level and zone weights
+SILENCE_DB = -60.0  # Level (dB) of zero intensity, lower levels are raised to it before interpolation
 
 class LCRMessageGenerator:
     """
     Generates LCR messages for Arduino based on audio and video data
+
+    Parameters
+    ----------
+    channels : int
+        Number of output channels, left to right. With 3 channels, they are the left, center and
+        right zones. With more (binary frames only, see raspberry/lcr_protocol.py), the vision
+        intensities come from the depth profile of the video results and the audio weights of
+        the zones are interpolated across the channels.
     """
     
-    def __init__(self):
+    def __init__(self, channels: int = 3):
+        self.channels = channels
         self.last_message = "L000C000R000"
+        self.last_values = (0,) * channels  # Intensities of the last message, encoded for the serial link
         self.message_count = 0
+        self.onset_intensity = 0
+        self.onset_until = 0.0
+    
+    @staticmethod
+    def audio_features(audio_data: AudioResult) -> tuple:
+        """
+        Numeric audio features of processed audio data, in the order of AUDIO_FEATURES
+        """
+        weights = audio_data.audio_weights or AUDIO_WEIGHTS
+        return (max(audio_data.db_level, SILENCE_DB), *weights)
+
+    @staticmethod
+    def audio_from_features(features: Dict) -> AudioResult:
+        """
+        Processed audio data accepted by the message generators, from features by AUDIO_FEATURES name
+        """
+        return AudioResult(
+            db_level=features['db_level'],
+            audio_weights=tuple(features[zone] for zone in ZONES)
+        )
+
+    def _spread(self, zones: Zones) -> list:
+        # Zone values interpolated at the position of every channel, left to right
+        positions = np.linspace(0.0, 2.0, self.channels)
+        return np.interp(positions, (0.0, 1.0, 2.0), zones).tolist()
+
+    def _vision_channels(self, video_data: VideoResult, zone_intensities: Dict[str, int]) -> list:
+        # Vision intensities of the channels: from the depth profile, else spread from the zones
+        if video_data.depth_profile is not None:
+            return IntensityCalculator.profile_to_intensities(video_data.depth_profile, self.channels)
+        return self._spread(tuple(zone_intensities[zone] for zone in ZONES))
+
+    def _format(self, left, center, right, channels=None) -> str:
+        # channels: intensities of every channel when there are not 3, the LCR text keeps the zones
+        # While an onset is held, its intensity is the floor of every channel
+        if time.time() < self.onset_until:
+            left, center, right = (max(value, self.onset_intensity) for value in (left, center, right))
+            if channels is not None:
+                channels = [max(value, self.onset_intensity) for value in channels]
+        zones = (int(left), int(center), int(right))
+        self.last_values = zones if self.channels == 3 else tuple(int(value) for value in channels)
+        return "L{:03d}C{:03d}R{:03d}".format(*zones)
+    
+    def generate_onset_message(self, onset: Dict, hold: float = ONSET_HOLD) -> str:
+        """
+        Generates an LCR message for an audio onset, on every channel
+        
+        Parameters
+        ----------
+        onset : Dict
+            Onset event containing 'db_level' (see micro.onset_detector.OnsetDetector)
+        hold : float
+            Seconds during which the onset intensity stays the floor of the next messages,
+            so that the following regular message does not cancel the alert
+            
+        Returns
+        -------
+        str
+            Formatted LCR message
+        """
+        intensity = IntensityCalculator.audio_to_intensity(onset['db_level'])
+        if time.time() >= self.onset_until or intensity > self.onset_intensity:
+            self.onset_intensity = intensity
+        self.onset_until = time.time() + hold
+        
+        message = self._format(intensity, intensity, intensity, [intensity] * self.channels)
+        self.last_message = message
+        self.message_count += 1
         
-    def generate_synchronized_message(self, audio_data=None, video_data=None) -> str:
+        return message
+        
+    def generate_synchronized_message(self, audio_data: Optional[AudioResult] = None,
+                                      video_data: Optional[VideoResult] = None) -> str:
         """
         Generates an LCR message based on audio and video data
         
         Parameters
         ----------
-        audio_data : Optional[Dict]
-            Processed audio data containing 'db_level'
+        audio_data : Optional[AudioResult]
+            Processed audio data, its 'audio_weights' of the zones are set for stereo audio
             
-        video_data : Optional[Dict]
-            Processed video data containing 'distances' and 'obstacles'
+        video_data : Optional[VideoResult]
+            Processed video data with the 'distances' and 'obstacles'
             
         Returns
         -------
@@ -32,46 +121,58 @@ class LCRMessageGenerator:
         center_intensity = 0
         right_intensity = 0
         
-        #Audio processing (global influence)
+        #Audio processing (global influence, weighted by zone)
         audio_intensity = 0
+        weights = AUDIO_WEIGHTS
         if audio_data:
             audio_intensity = IntensityCalculator.audio_to_intensity(
-                audio_data['db_level']
+                audio_data.db_level
             )
+            weights = audio_data.audio_weights or AUDIO_WEIGHTS
         
         #Video processing (zonal influence)
         vision_intensities = {'gauche': 0, 'centre': 0, 'droite': 0}
+        vision_channels = [0] * self.channels
         if video_data:
             vision_intensities = IntensityCalculator.vision_to_intensity_by_zone(
-                video_data['distances'],
-                video_data.get('obstacles', [])
+                video_data.distances,
+                video_data.obstacles
             )
+            if self.channels != 3:
+                vision_channels = self._vision_channels(video_data, vision_intensities)
         
-        # Use weighted average: 80% vision, 20% audio (reduced for lateral zones)
-        left_intensity = (4 * vision_intensities['gauche'] + int(audio_intensity * 0.7)) / 5
+        # Use weighted average: 80% vision, 20% audio (reduced for lateral zones, or following the sound direction)
+        left_weight, center_weight, right_weight = weights
+        left_intensity = (4 * vision_intensities['gauche'] + int(audio_intensity * left_weight)) / 5
         
-        center_intensity = (4 * vision_intensities['centre'] + int(audio_intensity)) / 5
+        center_intensity = (4 * vision_intensities['centre'] + int(audio_intensity * center_weight)) / 5
         
-        right_intensity = (4 * vision_intensities['droite'] + int(audio_intensity * 0.7)) / 5
+        right_intensity = (4 * vision_intensities['droite'] + int(audio_intensity * right_weight)) / 5
+
+        channels = None
+        if self.channels != 3:
+            channels = [(4 * vision + int(audio_intensity * weight)) / 5
+                        for vision, weight in zip(vision_channels, self._spread(weights))]
         
-        message = f"L{left_intensity:03d}C{center_intensity:03d}R{right_intensity:03d}"
+        message = self._format(left_intensity, center_intensity, right_intensity, channels)
         
         self.last_message = message
         self.message_count += 1
         
         return message
     
-    def generate_fallback_message(self, audio_only=None, video_only=None) -> str:
+    def generate_fallback_message(self, audio_only: Optional[AudioResult] = None,
+                                  video_only: Optional[VideoResult] = None) -> str:
         """
         Generate fallback LCR message when only one modality is available
         
         Parameters
         ----------
-        audio_only : Optional[Dict]
-            Processed audio data containing 'db_level'
+        audio_only : Optional[AudioResult]
+            Processed audio data, its 'audio_weights' of the zones are set for stereo audio
             
-        video_only : Optional[Dict]
-            Processed video data containing 'distances' and 'obstacles'
+        video_only : Optional[VideoResult]
+            Processed video data with the 'distances' and 'obstacles'
             
         Returns
         -------
@@ -79,14 +180,22 @@ class LCRMessageGenerator:
             Formatted LCR message
         """
         if audio_only:
-            intensity = IntensityCalculator.audio_to_intensity(audio_only['db_level'])
-            return f"L{intensity:03d}C{intensity:03d}R{intensity:03d}"
+            intensity = IntensityCalculator.audio_to_intensity(audio_only.db_level)
+            weights = audio_only.audio_weights
+            if weights:
+                # Stereo audio: the sound is felt on the side it comes from
+                left_weight, center_weight, right_weight = weights
+                return self._format(intensity * left_weight, intensity * center_weight,
+                                    intensity * right_weight,
+                                    [intensity * weight for weight in self._spread(weights)])
+            return self._format(intensity, intensity, intensity, [intensity] * self.channels)
             
         if video_only:
             intensities = IntensityCalculator.vision_to_intensity_by_zone(
-                video_only['distances'],
-                video_only.get('obstacles', [])
+                video_only.distances,
+                video_only.obstacles
             )
-            return f"L{intensities['gauche']:03d}C{intensities['centre']:03d}R{intensities['droite']:03d}"
+            channels = self._vision_channels(video_only, intensities) if self.channels != 3 else None
+            return self._format(intensities['gauche'], intensities['centre'], intensities['droite'], channels)
             
-        return "L000C000R000"  
\ No newline at end of file
+        return self._format(0, 0, 0, [0] * self.channels)  
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+Framing of the LCR intensities sent to the Arduino over the serial link.
+
+ASCII mode sends 'L045C080R020\\n': 13 bytes for the three zones, parsed by the
+firmware with sscanf. Binary mode sends SYNC_BYTE, a sequence number, the
+channel count, one byte per channel (intensity 0-100) and the CRC-8 of the
+bytes after the sync byte: 7 bytes for three channels, and up to MAX_CHANNELS
+channels. The sync byte is above any intensity and any text character, so text
+and intensities never start a frame.
+
+The host asks for a mode with the text line '?PROTO <mode>'. Firmware that
+supports it switches and answers 'PROTO <mode>', older firmware ignores the
+line and the host stays in ASCII mode.
+"""
+
+import re
+import time
+
+ASCII = 'ascii'
+BINARY = 'binary'
+PROTOCOLS = (ASCII, BINARY)
+
+SYNC_BYTE = 0xA5
+MAX_CHANNELS = 16
+CRC8_POLYNOMIAL = 0x07  # CRC-8/SMBUS: x^8 + x^2 + x + 1, initial value 0
+HEADER_SIZE = 3  # Sync byte, sequence number, channel count
+
+ASCII_MESSAGE = re.compile(rb'L(\d+)C(\d+)R(\d+)')
+MAX_LINE = 64  # Bytes of text kept without end of line, older ones are dropped
+PROTOCOL_REQUEST = b'?PROTO '
+PROTOCOL_REPLY = b'PROTO '
+NEGOTIATION_TIMEOUT = 3.0  # Seconds, covers the reset of the Arduino when the port is opened
+NEGOTIATION_RETRY = 0.5  # Seconds between two requests
+
+
+def _crc8_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ CRC8_POLYNOMIAL) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return bytes(table)
+
+CRC8_TABLE = _crc8_table()
+
+
+def crc8(data):
+    """
+    CRC-8 of bytes (polynomial CRC8_POLYNOMIAL, initial value 0)
+    """
+    crc = 0
+    for byte in data:
+        crc = CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+class LCREncoder:
+    """
+    Encoder of intensity messages in the negotiated protocol
+
+    Parameters
+    ----------
+    protocol : str
+        ASCII or BINARY.
+    """
+
+    def __init__(self, protocol=ASCII):
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol {protocol!r}, expected one of {PROTOCOLS}")
+        self.protocol = protocol
+        self.sequence = 0
+
+    def encode(self, values):
+        """
+        Encode the intensities of a message
+
+        Parameters
+        ----------
+        values : sequence of int
+            Intensities (0-100) of the channels: left, center and right in ASCII mode,
+            up to MAX_CHANNELS in binary mode.
+
+        Returns
+        -------
+        bytes
+            The bytes to write to the serial port.
+        """
+        if self.protocol == ASCII:
+            if len(values) != 3:
+                raise ValueError(f"ASCII messages have 3 channels, got {len(values)}")
+            left, center, right = values
+            return f"L{left:03d}C{center:03d}R{right:03d}\n".encode()
+
+        if not 0 < len(values) <= MAX_CHANNELS:
+            raise ValueError(f"Binary frames have 1 to {MAX_CHANNELS} channels, got {len(values)}")
+        body = bytes((self.sequence, len(values), *(min(max(int(value), 0), 100) for value in values)))
+        self.sequence = (self.sequence + 1) & 0xFF
+        return bytes((SYNC_BYTE,)) + body + bytes((crc8(body),))
+
+
+class LCRDecoder:
+    """
+    Decoder of the byte stream received by the Arduino, in either protocol
+
+    Binary frames are found by their sync byte and checked with their CRC; other bytes are
+    read as text lines, either ASCII messages or protocol requests.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.last_sequence = None
+
+        # Monitoring
+        self.frame_count = 0
+        self.crc_errors = 0
+        self.lost_frames = 0  # Sequence numbers skipped between two valid frames
+        self.invalid_lines = 0
+
+    def feed(self, data):
+        """
+        Decode received bytes
+
+        Parameters
+        ----------
+        data : bytes
+            Bytes received, possibly cut anywhere in a frame or a line.
+
+        Returns
+        -------
+        list of tuple
+            ('binary', values) and ('ascii', values) for every complete message, with values a
+            tuple of intensities, and ('request', protocol) for every protocol request.
+        """
+        self.buffer += data
+        decoded = []
+        position = 0
+        buffer = self.buffer
+
+        while position < len(buffer):
+            if buffer[position] == SYNC_BYTE:
+                if len(buffer) - position < HEADER_SIZE:
+                    break
+                count = buffer[position + 2]
+                if not 0 < count <= MAX_CHANNELS:
+                    # Not a frame start: skip the sync byte and search again
+                    self.crc_errors += 1
+                    position += 1
+                    continue
+                end = position + HEADER_SIZE + count + 1
+                if end > len(buffer):
+                    break
+                if crc8(buffer[position + 1:end - 1]) != buffer[end - 1]:
+                    self.crc_errors += 1
+                    position += 1
+                    continue
+                sequence = buffer[position + 1]
+                if self.last_sequence is not None:
+                    self.lost_frames += (sequence - self.last_sequence - 1) & 0xFF
+                self.last_sequence = sequence
+                self.frame_count += 1
+                decoded.append((BINARY, tuple(buffer[position + HEADER_SIZE:end - 1])))
+                position = end
+                continue
+
+            newline = buffer.find(b'\n', position)
+            sync = buffer.find(SYNC_BYTE, position)
+            if newline < 0 or 0 <= sync < newline:
+                if sync < 0:
+                    # Incomplete line
+                    position = max(position, len(buffer) - MAX_LINE)
+                    break
+                position = sync  # Text before a frame, without end of line
+                continue
+            line = bytes(buffer[position:newline]).strip()
+            position = newline + 1
+            if line:
+                decoded.append(self._decode_line(line))
+
+        del buffer[:position]
+        return [message for message in decoded if message is not None]
+
+    def _decode_line(self, line):
+        if line.startswith(PROTOCOL_REQUEST):
+            return ('request', line[len(PROTOCOL_REQUEST):].decode(errors='replace'))
+        match = ASCII_MESSAGE.fullmatch(line)
+        if match is None:
+            self.invalid_lines += 1
+            return None
+        return (ASCII, tuple(int(value) for value in match.groups()))
+
+    def get_stats(self):
+        """
+        Get the decoding statistics
+
+        Returns
+        -------
+        dict
+            Number of valid binary frames, frames rejected by their CRC, frames lost
+            (sequence gaps) and invalid text lines
+        """
+        return {
+            'frames': self.frame_count,
+            'crc_errors': self.crc_errors,
+            'lost_frames': self.lost_frames,
+            'invalid_lines': self.invalid_lines
+        }
+
+
+def negotiate(serial_port, protocol=BINARY, timeout=NEGOTIATION_TIMEOUT):
+    """
+    Agree with the firmware on the protocol of the messages
+
+    Parameters
+    ----------
+    serial_port : serial.Serial or FakeSerial
+        Open serial port, with a read timeout.
+    protocol : str
+        Preferred protocol. ASCII is always supported: it is requested without waiting for an
+        answer, so that firmware left in binary mode by a previous run switches back.
+    timeout : float
+        Maximum time (seconds) to wait for the answer of the firmware.
+
+    Returns
+    -------
+    str
+        The protocol to use, ASCII if the firmware did not answer.
+    """
+    request = PROTOCOL_REQUEST + protocol.encode() + b'\n'
+    reply = PROTOCOL_REPLY + protocol.encode()
+    if protocol == ASCII:
+        serial_port.write(request)
+        serial_port.flush()
+        return ASCII
+
+    deadline = time.monotonic() + timeout
+    next_request = 0.0
+    while time.monotonic() < deadline:
+        if time.monotonic() >= next_request:
+            serial_port.write(request)
+            serial_port.flush()
+            next_request = time.monotonic() + NEGOTIATION_RETRY
+        line = serial_port.readline()
+        if line.strip() == reply:
+            return protocol
+    return ASCII
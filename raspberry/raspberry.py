@@ -6,38 +6,60 @@ The raspberry pi will act as a central hub for various sensors and sensorial out
 It will consume data from connected sensors and process it accordingly.
 """
 
+import os
 import threading
 import time
+from dataclasses import replace
 import numpy as np
 import serial
 from raspberry.fake_serial import FakeSerial
 from queue import Empty
 from queue_manager import queue_manager
-from raspberry.sensor_data import SensorData
+from raspberry.sensor_data import SensorData, AudioResult, VideoResult
 from raspberry.intensity_calculator import IntensityCalculator
-from raspberry.lcr_message_generator import LCRMessageGenerator
+from raspberry.lcr_message_generator import LCRMessageGenerator, AUDIO_FEATURES
+from raspberry.lcr_protocol import LCREncoder, negotiate, ASCII, BINARY
 from raspberry.sync_buffer import SyncBuffer
+from raspberry.audio_stream import StreamingAudioAnalyzer
+from raspberry.spectrum import SpectralFrontEnd
+from raspberry.hazard_detector import HazardDetector, HAZARD_CLASSES, HAZARD_THRESHOLD
+from raspberry.direction import DirectionEstimator
+from micro.micro import ANALYSIS_CHUNK_SIZE, ANALYSIS_RATE
+from stage_stats import StageStats
 
-def heavy_audio_processing(chunk, debug=False):
+AUDIO_BATCH = 8  # Maximum number of waiting audio chunks processed together
+# Hazard templates fitted on recordings (see micro/bench_audio.py --fit), used instead of the synthetic ones if present
+HAZARD_TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hazard_templates.npz")
+MIC_DISTANCE = 0.15  # Distance (m) between the microphones of a stereo capture
+# 'interpolate': every message pairs the latest video with the audio features interpolated at its time.
+# 'match': messages pair audio and video results whose times match within 50ms, else use a single modality.
+FUSION_MODE = 'interpolate'
+# 'binary': 7-byte frames with a CRC (see raspberry/lcr_protocol.py) if the firmware accepts them, else 'ascii'.
+# 'ascii': 13-byte 'LxxxCxxxRxxx' lines, understood by every firmware version.
+LCR_PROTOCOL = 'binary'
+# Output channels of binary frames, left to right. More than 3 (up to 16) maps the depth profile of the
+# camera to the channels; the firmware drives its NUM_LEDS first channels. ASCII messages always have 3.
+LCR_CHANNELS = 3
+
+SPECTRAL_FRONT_ENDS = {}
+HAZARD_DETECTORS = {}
+DIRECTION_ESTIMATORS = {}
+STAGE_STATS = StageStats()
+
+def sound_level(rms):
     '''
-    Heavy processing for audio data.
+    Convert an RMS level to dBFS and classify it.
 
     Parameters
     ----------
-    chunk : np.ndarray
-        The audio data chunk to be processed
-    debug : bool
-        If True, enables debug mode with verbose logging.
+    rms : float
+        RMS level of normalized float audio
 
     Returns
     -------
-    dict
-        The processing results including RMS, dB level, classification, dominant frequency, and timestamp
+    tuple
+        (dB level, sound classification)
     '''
-
-    rms = np.sqrt(np.mean(chunk**2))
-    
-    # Computing dB level
     ref = 1.0      #Reference for dBFS (normalized float audio)
     eps = 1e-12    #Avoid log10(0)
     level = max(rms / ref, eps)
@@ -56,19 +78,222 @@ def heavy_audio_processing(chunk, debug=False):
     else:
         sound_label = "Danger"
     
-    # Main frequency detection
-    fft_result = np.fft.fft(chunk)
-    dominant_freq = np.argmax(np.abs(fft_result[:len(fft_result)//2]))
-    if debug:
-        print(f"Audio Processing - RMS: {rms:.5f}, dB: {niveau_db:.2f}, Class: {sound_label}, Freq: {dominant_freq} Hz")
+    return niveau_db, sound_label
+
+def spectral_front_end(size, sample_rate=ANALYSIS_RATE):
+    '''
+    Get the spectral front end of a chunk size, created on first use.
+
+    Parameters
+    ----------
+    size : int
+        Number of samples of the chunks
+    sample_rate : int
+        Sample rate of the chunks in Hz
+
+    Returns
+    -------
+    SpectralFrontEnd
+        Front end with its window, bin tables and buffers precomputed for this size
+    '''
+    front_end = SPECTRAL_FRONT_ENDS.get((size, sample_rate))
+    if front_end is None:
+        front_end = SPECTRAL_FRONT_ENDS[size, sample_rate] = SpectralFrontEnd(size, sample_rate)
+    return front_end
+
+def hazard_detector(size, sample_rate=ANALYSIS_RATE):
+    '''
+    Get the hazard detector of a chunk size, created on first use.
+
+    Parameters
+    ----------
+    size : int
+        Number of samples of the chunks
+    sample_rate : int
+        Sample rate of the chunks in Hz
+
+    Returns
+    -------
+    HazardDetector
+        Detector with its filterbank and class templates precomputed for this size, loaded from
+        HAZARD_TEMPLATES if they were fitted for this size and rate
+    '''
+    detector = HAZARD_DETECTORS.get((size, sample_rate))
+    if detector is None:
+        detector = HAZARD_DETECTORS[size, sample_rate] = HazardDetector(spectral_front_end(size, sample_rate))
+        if os.path.exists(HAZARD_TEMPLATES):
+            detector.load(HAZARD_TEMPLATES)
+    return detector
+
+def direction_estimator(size, sample_rate=ANALYSIS_RATE):
+    '''
+    Get the direction estimator of a chunk size, created on first use.
+
+    Parameters
+    ----------
+    size : int
+        Number of samples of the chunks
+    sample_rate : int
+        Sample rate of the chunks in Hz
+
+    Returns
+    -------
+    DirectionEstimator
+        Estimator with its candidate delays precomputed for this size and MIC_DISTANCE
+    '''
+    estimator = DIRECTION_ESTIMATORS.get((size, sample_rate))
+    if estimator is None:
+        estimator = DIRECTION_ESTIMATORS[size, sample_rate] = DirectionEstimator(spectral_front_end(size, sample_rate),
+                                                                                MIC_DISTANCE)
+    return estimator
+
+def heavy_audio_processing_batch(chunks, debug=False, rms=None, sample_rate=ANALYSIS_RATE, captures=None):
+    '''
+    Heavy processing for a batch of audio chunks of the same size.
+
+    Parameters
+    ----------
+    chunks : np.ndarray
+        The audio data chunks to be processed, shape (count, size), or (count, size, 2) for stereo
+    debug : bool
+        If True, enables debug mode with verbose logging.
+    rms : np.ndarray or None
+        RMS level of the chunks if already known (e.g. from running sums), computed otherwise.
+    sample_rate : int
+        Sample rate of the chunks in Hz
+    captures : list or None
+        (capture time in the audio clock, arrival time, end sample) of every chunk, as sent by micro.audio_callback,
+        or None if unknown
+
+    Returns
+    -------
+    list of AudioResult
+        The processing results of every chunk (see heavy_audio_processing)
+
+    Notes
+    -----
+    All chunks go through a single windowed rfft and a single filterbank product, which is cheaper
+    than one call per chunk when the consumer fell behind and several chunks are waiting.
+    Stereo chunks share the same rfft between the features (of the channel mix) and the direction.
+    '''
+    chunks = np.asarray(chunks)
+    stereo = chunks.ndim == 3
+    if rms is None:
+        rms = np.sqrt(np.mean(np.square(chunks, dtype=np.float64), axis=(1, 2) if stereo else 1))
     
-    return {
-        'rms': rms,
-        'db_level': niveau_db,
-        'sound_classification': sound_label,
-        'dominant_frequency': dominant_freq,
-        'timestamp': time.time()
-    }
+    front_end = spectral_front_end(chunks.shape[1], sample_rate)
+    spectrum = front_end.analyze_stereo(chunks) if stereo else front_end.analyze(chunks)
+    direction = None
+    if stereo:
+        direction = direction_estimator(chunks.shape[1], sample_rate).estimate(spectrum['cross_spectrum'],
+                                                                               spectrum['power'])
+    hazard_scores = hazard_detector(chunks.shape[1], sample_rate).score(spectrum['power'])
+    # The front end reuses its buffers: the rows of every chunk are views of a copy for the batch
+    band_energy = spectrum['band_energy'].copy()
+    dominant_frequency = spectrum['dominant_frequency'].tolist()
+    spectral_centroid = spectrum['spectral_centroid'].tolist()
+    rms_values = np.asarray(rms, dtype=np.float64).tolist()
+    timestamp = time.time()
+    captures = captures or [None] * len(chunks)
+    
+    results = []
+    for i in range(len(chunks)):
+        niveau_db, sound_label = sound_level(rms_values[i])
+        dominant_freq = dominant_frequency[i]
+        best = int(np.argmax(hazard_scores[i]))
+        hazard = HAZARD_CLASSES[best] if hazard_scores[i, best] >= HAZARD_THRESHOLD else None
+        if debug:
+            print(f"Audio Processing - RMS: {rms[i]:.5f}, dB: {niveau_db:.2f}, Class: {sound_label}, Freq: {dominant_freq:.0f} Hz, Hazard: {hazard}")
+        
+        results.append(AudioResult(
+            rms=rms_values[i],
+            db_level=float(niveau_db),
+            sound_classification=sound_label,
+            dominant_frequency=dominant_freq,
+            spectral_centroid=spectral_centroid[i],
+            band_energy=band_energy[i],
+            hazard_scores=hazard_scores[i],
+            hazard=hazard,
+            direction=float(direction['direction'][i]) if stereo else None,
+            direction_confidence=float(direction['confidence'][i]) if stereo else None,
+            audio_weights=tuple(direction['weights'][i].tolist()) if stereo else None,
+            capture_time=captures[i][0] if captures[i] else None,
+            arrival_time=captures[i][1] if captures[i] else None,
+            timestamp=timestamp
+        ))
+    return results
+
+def heavy_audio_processing(chunk, debug=False, rms=None, capture=None):
+    '''
+    Heavy processing for audio data.
+
+    Parameters
+    ----------
+    chunk : np.ndarray
+        The audio data chunk to be processed
+    debug : bool
+        If True, enables debug mode with verbose logging.
+    rms : float or None
+        RMS level of the chunk if already known (e.g. from running sums), computed otherwise.
+    capture : tuple or None
+        (capture time in the audio clock, arrival time, end sample) of the chunk, or None if unknown
+
+    Returns
+    -------
+    AudioResult
+        The processing results including RMS, dB level, classification, dominant frequency (Hz),
+        spectral centroid (Hz), band energies (see raspberry/spectrum.py), hazard scores (one per
+        HAZARD_CLASSES entry) and the detected hazard class or None, the direction (-1 left to 1 right),
+        its confidence and the per-zone audio weights (see raspberry/direction.py, None for mono chunks),
+        the capture time (audio clock) and arrival time of the chunk (None if unknown), and timestamp
+    '''
+    return heavy_audio_processing_batch(chunk[None], debug, None if rms is None else [rms], captures=[capture])[0]
+
+def streaming_audio_processing(analyzer, block, previous=None, debug=False, capture=None):
+    '''
+    Streaming processing for audio data, one result per hop.
+
+    Parameters
+    ----------
+    analyzer : StreamingAudioAnalyzer
+        Sliding window over the audio stream
+    block : np.ndarray
+        The new audio samples
+    previous : AudioResult or None
+        Last result, whose spectral features are kept until the next spectral analysis
+    debug : bool
+        If True, enables debug mode with verbose logging.
+    capture : tuple or None
+        (capture time in the audio clock, arrival time, index of the sample following the block), or None
+        if unknown. A block that does not follow the previous one restarts the sliding window
+
+    Returns
+    -------
+    list of AudioResult
+        The processing results of every completed hop (see heavy_audio_processing)
+
+    Notes
+    -----
+    The RMS of every hop comes from the running sums of squares of the window, the spectral
+    features are only recomputed once per window length of new samples.
+    '''
+    results = []
+    hops = analyzer.push(block, capture[2] if capture else None)
+    for i, (mean_square, window) in enumerate(hops):
+        rms = np.sqrt(mean_square)
+        # Hops before the last one of the block ended hop_size samples apart
+        hop_capture = None
+        if capture:
+            hop_capture = (capture[0] - (len(hops) - 1 - i) * analyzer.hop_size / ANALYSIS_RATE, capture[1], None)
+        if window is not None or previous is None:
+            previous = heavy_audio_processing(window, debug, rms=rms, capture=hop_capture)
+        else:
+            niveau_db, sound_label = sound_level(rms)
+            previous = replace(previous, rms=float(rms), db_level=float(niveau_db), sound_classification=sound_label,
+                               capture_time=hop_capture[0] if hop_capture else None,
+                               arrival_time=hop_capture[1] if hop_capture else None, timestamp=time.time())
+        results.append(previous)
+    return results
 
 def heavy_video_processing(video_data, debug=False):
     """
@@ -76,25 +301,26 @@ def heavy_video_processing(video_data, debug=False):
 
     Parameters
     ----------
-    video_data : dict
+    video_data : VideoData
         The video data to be processed
     debug : bool
         If True, enables debug mode with verbose logging.
 
     Returns
     -------
-    dict
+    VideoResult
         The processing results including mode, obstacle info, avoid direction, danger level, risk classification,
-        distances, obstacles count, frame number, and timestamp
+        distances, obstacles, depth profile, frame number, capture time (camera clock, None if unknown),
+        arrival time and timestamp
 
     Notes
     -----
     The video data needs to arrive pre-processed with obstacle detection and distance estimation.
     """
     
-    mode = video_data['mode']
-    obstacles = video_data['obstacles']
-    distances = video_data['distances_smooth']
+    mode = video_data.mode
+    obstacles = video_data.obstacles
+    distances = video_data.distances_smooth
     
     # Severity level determination
     danger_level = 0
@@ -115,19 +341,22 @@ def heavy_video_processing(video_data, debug=False):
         risk_classification = "medium"
     
     # Minimize data sent to Arduino
-    return {
-        'mode': mode,
-        'obstacle_info': video_data['obstacle_info'],
-        'avoid_direction': video_data['avoid_direction'],
-        'danger_level': danger_level,
-        'risk_classification': risk_classification,
-        'distances': distances,
-        'obstacles_count': len(obstacles),
-        'frame_number': video_data['frame_number'],
-        'timestamp': video_data['timestamp']
-    }
-
-def micro_processing_thread(debug=False):
+    return VideoResult(
+        mode=mode,
+        obstacle_info=video_data.obstacle_info,
+        avoid_direction=video_data.avoid_direction,
+        danger_level=danger_level,
+        risk_classification=risk_classification,
+        distances=distances,
+        obstacles=obstacles,
+        depth_profile=video_data.depth_profile,
+        frame_number=video_data.frame_number,
+        capture_time=video_data.capture_time,
+        arrival_time=video_data.timestamp,
+        timestamp=video_data.timestamp
+    )
+
+def micro_processing_thread(debug=False, hop_size=None, channels=1):
     """
     Processing thread dedicated to microphone audio data
 
@@ -135,24 +364,44 @@ def micro_processing_thread(debug=False):
     ----------
     debug : bool
         If True, enables debug mode with verbose logging.
+    hop_size : int or None
+        If set, the microphone queue carries blocks of hop_size samples, analyzed over a
+        sliding window of ANALYSIS_CHUNK_SIZE samples with one result per hop.
+    channels : int
+        Number of channels of the audio data, 2 for a stereo capture.
 
     Notes
     -----
     This thread continuously fetches audio data from the queue, processes it, and sends commands to the Arduino based on the results.
+    When it falls behind, up to AUDIO_BATCH waiting chunks are processed together.
+    In streaming mode, hops dropped by the micro channel (DROP_OLDEST) are detected from their sample
+    indices: the sliding window restarts after the gap instead of splicing non-adjacent audio.
     """
     processing_count = 0
+    analyzer = StreamingAudioAnalyzer(ANALYSIS_CHUNK_SIZE, hop_size, channels=channels) if hop_size else None
+    result = None
     
     while True:
         try:
-            chunk = queue_manager.get_micro_data()
-            processing_count += 1
+            batch = queue_manager.get_micro_data_batch(AUDIO_BATCH)
+            processing_count += len(batch)
             
-            result = heavy_audio_processing(chunk, debug)
+            if analyzer:
+                results = []
+                for chunk, capture in batch:
+                    results += streaming_audio_processing(analyzer, chunk, result, debug, capture)
+                    result = results[-1] if results else result
+            else:
+                chunks, captures = zip(*batch)
+                results = heavy_audio_processing_batch(np.stack(chunks), debug, captures=list(captures))
             
-            queue_manager.put_audio_processed_data(result)
+            for result in results:
+                queue_manager.put_audio_processed_data(result)
             
-            if debug:
-                print(f"Audio #{processing_count}: {result['db_level']:.1f}dB - {result['sound_classification']}")
+            if debug and results:
+                print(f"Audio #{processing_count}: {result.db_level:.1f}dB - {result.sound_classification}")
+                if analyzer and analyzer.gap_count:
+                    print(f"Audio stream: {analyzer.gap_count} gaps ({analyzer.lost_samples} samples dropped by the micro channel)")
                 
         except Empty:
             continue
@@ -184,9 +433,9 @@ def video_processing_thread(debug=False):
             queue_manager.put_video_processed_data(result)
             
             if debug:
-                distances = result['distances']
-                print(f"📹 Video #{processing_count}: {result['mode']} | Obstacles: {result['obstacle_info']} | "
-                        f"G={distances['gauche']:.2f}m C={distances['centre']:.2f}m D={distances['droite']:.2f}m")
+                left, centre, right = result.distances
+                print(f"📹 Video #{processing_count}: {result.mode} | Obstacles: {result.obstacle_info} | "
+                        f"G={left:.2f}m C={centre:.2f}m D={right:.2f}m")
                 
         except Empty:
             continue
@@ -208,6 +457,18 @@ def arduino_communication_thread(debug=False, simulate=False):
     2. Synchronizes them in time
     3. Generates LCR messages
     4. Sends them to the Arduino
+    
+    The thread sleeps on a selector over the priority, audio and video channels until one of them
+    receives an item or the next message is due, so it uses no CPU while idle.
+    Audio onsets from the priority queue are sent as soon as they are seen, and their latency
+    since the capture of the onset (end of its hop) is recorded in STAGE_STATS.
+    Audio and video results are timestamped with their capture times mapped to the host clock.
+    With FUSION_MODE 'interpolate', the audio features are read at the time of the latest video
+    result; with 'match', audio and video results are paired and the time spread of every pair
+    is recorded in STAGE_STATS as 'sync_error'. Messages using a single modality are counted as
+    fallbacks.
+    Messages are encoded in the protocol negotiated with the firmware, LCR_PROTOCOL if it
+    supports it, else ASCII. Binary frames carry LCR_CHANNELS intensities.
     """
     serial_port = None
 
@@ -225,48 +486,107 @@ def arduino_communication_thread(debug=False, simulate=False):
         except Exception as e:
             print(f"[ERROR] Failed to open serial port: {e}")
 
+    protocol = ASCII
+    if serial_port:
+        try:
+            protocol = negotiate(serial_port, LCR_PROTOCOL)
+        except Exception as e:
+            print(f"[WARN] Protocol negotiation failed: {e}")
+        print(f"🔌 LCR protocol: {protocol}")
+    encoder = LCREncoder(protocol)
+
     sync_buffer = SyncBuffer(max_age_ms=150)
-    message_generator = LCRMessageGenerator()
+    sync_buffer.register_timeline('audio', AUDIO_FEATURES, LCRMessageGenerator.audio_features)
+    message_generator = LCRMessageGenerator(LCR_CHANNELS if protocol == BINARY else 3)
+    quality_counts = {'synced': 0, 'interpolated': 0, 'fallback': 0}
     last_send_time = 0
     send_interval = 1.0 / 25.0  # Max 25Hz
+    last_stats_time = time.time()
+    
+    def send_message(message):
+        if message and debug:
+            print(f"📤 ABOUT TO SEND: '{message}' (len={len(message)}, repr={repr(message)})")
+                
+        if serial_port:
+            try:
+                message_bytes = encoder.encode(message_generator.last_values)
+                
+                if debug:
+                    print(f"📤 ENCODED BYTES: {message_bytes}")
+
+                serial_port.write(message_bytes)
+                serial_port.flush()
+                
+                if debug:
+                    print(f"✅ SENT: '{message}'")
+
+            except Exception as e:
+                print(f"[WARN] Serial write failed: {e}")
+        
+        if debug:
+            print(f"➡️  Arduino: {message}")
+    
+    def send_onsets():
+        # Onsets skip the rate limit and the synchronization, they are sent as soon as they are seen
+        while True:
+            try:
+                onset = queue_manager.get_priority_event()
+            except Empty:
+                return
+            send_message(message_generator.generate_onset_message(onset))
+            STAGE_STATS.record('onset_latency', time.perf_counter() - onset['arrival'])
+            if debug:
+                print(f"⚡ ONSET {onset['db_level']:.1f} dB (+{onset['rise_db']:.1f} dB)")
+    
+    selector = queue_manager.selector('priority', 'audio_processed', 'video_processed')
     
     print("🤖 Arduino communication thread started with synchronization")
     
     while True:
         try:
-            current_time = time.time()
+            # Sleep until new data arrives on any channel or the next message is due
+            selector.wait(max(0.0, last_send_time + send_interval - time.time()))
+            send_onsets()
             
-            # Collect new audio data
-            try:
-                audio_result = queue_manager.get_audio_processed_data(timeout=0.01)
+            # Collect new audio and video data
+            for audio_result in queue_manager.audio_processed_queue.drain():
                 sync_buffer.add_audio(audio_result)
-            except Empty:
-                pass
-            
-            # Collect new video data
-            try:
-                video_result = queue_manager.get_video_processed_data(timeout=0.01)
+            for video_result in queue_manager.video_processed_queue.drain():
                 sync_buffer.add_video(video_result)
-            except Empty:
-                pass
             
             # Limit Arduino send frequency (max 25Hz)
+            current_time = time.time()
             if (current_time - last_send_time) < send_interval:
-                time.sleep(0.001) 
                 continue
                 
             # Attempt to get synchronized data
-            sync_pair = sync_buffer.get_synchronized_pair()
+            sync_pair = None
+            interpolated = None
+            if FUSION_MODE == 'interpolate':
+                interpolated = sync_buffer.get_interpolated('audio', 'video', current_time)
+            else:
+                sync_pair = sync_buffer.get_synchronized_pair()
+
+            if interpolated:
+                audio_features, video_data = interpolated
+                message = message_generator.generate_synchronized_message(
+                    LCRMessageGenerator.audio_from_features(audio_features), video_data.data
+                )
 
-            if sync_pair:
+                sync_quality = 'interpolated'
+                if debug:
+                    print(f"🔄 FUSED {message} ({audio_features['db_level']:.1f} dB)")
+
+            elif sync_pair:
                 audio_data, video_data = sync_pair
                 message = message_generator.generate_synchronized_message(
                     audio_data.data, video_data.data
                 )
                 
                 sync_quality = 'synced'
+                time_diff = abs(audio_data.timestamp - video_data.timestamp)
+                STAGE_STATS.record('sync_error', time_diff)
                 if debug:
-                    time_diff = abs(audio_data.timestamp - video_data.timestamp)
                     print(f"🔄 SYNC {message} (Δt={time_diff*1000:.1f}ms)")
                     
             else:
@@ -289,29 +609,20 @@ def arduino_communication_thread(debug=False, simulate=False):
                             "video" if latest_video and not latest_audio else "both_unsync"
                     print(f"[WARNING] FALLBACK {message} (source: {source})")
             
-            if message and debug:
-                print(f"📤 ABOUT TO SEND: '{message}' (len={len(message)}, repr={repr(message)})")
-                    
-            if serial_port:
-                try:
-                    message_bytes = (message + "\n").encode()
-                    
-                    if debug:
-                        print(f"📤 ENCODED BYTES: {message_bytes}")
-
-                    serial_port.write(message_bytes)
-                    serial_port.flush()
-                    
-                    if debug:
-                        print(f"✅ SENT: '{message}'")
-
-                except Exception as e:
-                    print(f"[WARN] Serial write failed: {e}")
-            
-            if debug:
-                print(f"➡️  Arduino: {message}")
-            
+            send_message(message)
             last_send_time = current_time
+            quality_counts[sync_quality] += 1
+
+            if debug and current_time - last_stats_time >= 5.0:
+                last_stats_time = current_time
+                stats = sync_buffer.get_sync_stats()
+                fallback_rate = quality_counts['fallback'] / max(1, sum(quality_counts.values())) * 100
+                print(f"🕒 Sync ({FUSION_MODE}): {fallback_rate:.1f}% fallback messages, {stats['matched']} pairs, "
+                      f"{stats['interpolated']} interpolated, {stats['unmatched']} unmatched, "
+                      f"spread {stats['spread_mean_ms']:.1f} ms mean / {stats['spread_max_ms']:.1f} ms max")
+                for name, clock in stats['clocks'].items():
+                    print(f"  {name} clock: skew {clock['skew_ppm']:+.0f} ppm, "
+                          f"delay {clock['delay_mean_ms']:.1f} ms mean / {clock['delay_p95_ms']:.1f} ms p95")
             
         except Exception as e:
             print(f"Arduino communication error: {e}")
@@ -319,7 +630,7 @@ def arduino_communication_thread(debug=False, simulate=False):
                 print(f"Last message: {message}")
             time.sleep(0.01)
 
-def start_processing(no_audio=False, no_video=False, debug=False, simulate=False):
+def start_processing(no_audio=False, no_video=False, debug=False, simulate=False, audio_hop=None, audio_channels=1):
     """
     Function to start all processing threads
 
@@ -333,6 +644,10 @@ def start_processing(no_audio=False, no_video=False, debug=False, simulate=False
         If True, enables debug mode with verbose logging.
     simulate : bool
         If True, uses FakeSerial instead of real serial communication.
+    audio_hop : int or None
+        If set, audio is analyzed in streaming mode with a hop of audio_hop samples.
+    audio_channels : int
+        Number of captured audio channels, 2 for a stereo capture.
     """
     print("Starting processing threads...")
     
@@ -341,7 +656,7 @@ def start_processing(no_audio=False, no_video=False, debug=False, simulate=False
     video_thread = None
     
     if not no_audio:
-        micro_thread = threading.Thread(target=micro_processing_thread, args=(debug,), daemon=True)
+        micro_thread = threading.Thread(target=micro_processing_thread, args=(debug, audio_hop, audio_channels), daemon=True)
     
     if not no_video:
         video_thread = threading.Thread(target=video_processing_thread, args=(debug,), daemon=True)
@@ -363,6 +678,8 @@ def start_processing(no_audio=False, no_video=False, debug=False, simulate=False
         while True:
             time.sleep(5)
             queue_manager.print_stats()
+            if STAGE_STATS.get_stats():
+                STAGE_STATS.print_stats("Arduino stages")
     except Exception as e:
         print(f"Processing error: {e}")
 
@@ -1,11 +1,75 @@
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Any, Tuple
+import numpy as np
 
-@dataclass
+# Records passed between the threads. They use __slots__: no per-instance __dict__, a fixed
+# field layout, and a fraction of the memory and allocations of the equivalent dicts.
+# Per-zone values and obstacle lists are plain tuples of floats and strings: the garbage collector
+# stops tracking such tuples after its first pass over them, whereas record instances stay tracked.
+
+ZONES = ('gauche', 'centre', 'droite')  # Order of the values of a Zones tuple
+Zones = Tuple[float, float, float]  # One value per zone: distances (m), intensities or audio weights
+
+@dataclass(slots=True)
+class VideoData:
+    """
+    Smoothed zone distances and obstacles of a depth frame, sent by the camera to the video queue
+    """
+    frame_number: int
+    mode: str
+    obstacle_info: str  # Zones with an obstacle, e.g. 'Gauche et Centre', or 'Aucun'
+    avoid_direction: str  # Zone with the farthest distance
+    distances_raw: Zones
+    distances_smooth: Zones
+    obstacles: tuple  # Zones with an obstacle, e.g. ('Gauche', 'Centre')
+    depth_profile: Optional[np.ndarray]
+    timestamp: float
+    capture_time: Optional[float]  # Camera clock, None if unknown
+    simulation_mode: bool
+
+@dataclass(slots=True)
+class VideoResult:
+    """
+    Processed video data
+    """
+    mode: str
+    obstacle_info: str
+    avoid_direction: str
+    danger_level: int  # 0 safe to 3 critical
+    risk_classification: str
+    distances: Zones
+    obstacles: tuple
+    depth_profile: Optional[np.ndarray]
+    frame_number: int
+    capture_time: Optional[float]
+    arrival_time: Optional[float]
+    timestamp: float
+
+@dataclass(slots=True)
+class AudioResult:
+    """
+    Processed audio data of a chunk (see raspberry.heavy_audio_processing)
+    """
+    db_level: float
+    rms: float = 0.0
+    sound_classification: str = ''
+    dominant_frequency: float = 0.0
+    spectral_centroid: float = 0.0
+    band_energy: Optional[np.ndarray] = None
+    hazard_scores: Optional[np.ndarray] = None  # One score per HAZARD_CLASSES entry
+    hazard: Optional[str] = None
+    direction: Optional[float] = None  # -1 left to 1 right, None for mono chunks
+    direction_confidence: Optional[float] = None
+    audio_weights: Optional[Zones] = None  # None for mono chunks
+    capture_time: Optional[float] = None  # Audio clock, None if unknown
+    arrival_time: Optional[float] = None
+    timestamp: float = 0.0
+
+@dataclass(slots=True)
 class SensorData:
     """
     Data structure for sensor data with timestamp
     """
     timestamp: float
-    data: Dict[Any, Any]
-    source: str  # 'audio' or 'video'
\ No newline at end of file
+    data: Any  # AudioResult, VideoResult, ...
+    source: str  # Name of the stream, e.g. 'audio' or 'video'
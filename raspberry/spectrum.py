@@ -0,0 +1,165 @@
+"""
+Real FFT spectral front end for audio chunks.
+
+The analysis window, the bin-to-Hz table, the band bin indices and every
+intermediate buffer are computed once per chunk size. Each call windows the
+chunks, runs one rfft over the whole batch and derives the dominant frequency,
+the spectral centroid and the band energies from the same power spectrum.
+Stereo chunks go through the same rfft, one row per channel: the features come
+from the spectrum of the channel mix, and the cross spectrum of both channels
+is kept for the direction estimate (see raspberry/direction.py).
+"""
+
+import numpy as np
+
+BAND_EDGES = (50, 300, 1000, 3000, 8000)  # Hz, bands between consecutive edges
+
+
+class SpectralFrontEnd:
+    """
+    Batched rfft analysis of fixed-size audio chunks
+
+    Parameters
+    ----------
+    size : int
+        Number of samples of every chunk.
+    sample_rate : float
+        Sample rate of the chunks in Hz.
+    band_edges : sequence of float
+        Band edges in Hz, bands lie between consecutive edges. Edges above the Nyquist
+        frequency are clipped to it.
+    batch : int
+        Number of chunks the buffers are first allocated for, grown on demand.
+
+    Notes
+    -----
+    Band energies are scaled so that they add up to the mean square of the chunk over the
+    covered frequencies: a full-scale sine in a band has an energy of about 0.5. The
+    returned arrays are views into buffers reused by the next call.
+    """
+
+    def __init__(self, size, sample_rate, band_edges=BAND_EDGES, batch=1):
+        self.size = size
+        self.sample_rate = sample_rate
+
+        self.window = np.hanning(size)
+        self.freqs = np.fft.rfftfreq(size, 1.0 / sample_rate)
+        self.bins = len(self.freqs)
+
+        edges = np.minimum(np.asarray(band_edges, dtype=np.float64), sample_rate / 2)
+        self.band_edges = edges
+        self.band_bins = np.minimum(np.searchsorted(self.freqs, edges), self.bins - 1)
+
+        # Power of a bin to its contribution to the mean square (one-sided spectrum)
+        self.scale = np.full(self.bins, 2.0 / (size * np.sum(self.window**2)))
+        self.scale[0] /= 2
+        if size % 2 == 0:
+            self.scale[-1] /= 2
+
+        self._allocate(batch)
+
+    def _allocate(self, batch):
+        self.batch = batch
+        self._windowed = np.empty((batch, self.size))
+        self._spectrum = np.empty((batch, self.bins), dtype=np.complex128)
+        self._mix = np.empty((batch, self.bins), dtype=np.complex128)
+        self._cross = np.empty((batch, self.bins), dtype=np.complex128)
+        self._power = np.empty((batch, self.bins))
+        self._total = np.empty(batch)
+        self._centroid = np.empty(batch)
+        self._bands = np.empty((batch, len(self.band_bins)))
+
+    def _peak_frequency(self, power):
+        # Strongest bin (DC excluded), refined by a parabola through the log power of its neighbours
+        rows = np.arange(len(power))
+        peak = np.clip(1 + np.argmax(power[:, 1:], axis=1), 1, self.bins - 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            left, center, right = np.log(power[rows[:, None], peak[:, None] + (-1, 0, 1)] + 1e-30).T
+            offset = 0.5 * (left - right) / (left - 2 * center + right)
+        offset = np.clip(np.nan_to_num(offset), -0.5, 0.5)
+        return (peak + offset) * (self.sample_rate / self.size)
+
+    def _features(self, spectrum):
+        count = len(spectrum)
+        power = self._power[:count]
+        np.abs(spectrum, out=power)
+        np.square(power, out=power)
+        np.multiply(power, self.scale, out=power)
+
+        total = np.sum(power, axis=1, out=self._total[:count])
+        centroid = np.matmul(power, self.freqs, out=self._centroid[:count])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(centroid, total, out=centroid)
+
+        # The last reduceat sum runs from the last edge up to Nyquist, which is not a band
+        bands = np.add.reduceat(power, self.band_bins, axis=1, out=self._bands[:count])[:, :-1]
+
+        return {
+            'dominant_frequency': self._peak_frequency(power),
+            'spectral_centroid': centroid,
+            'band_energy': bands,
+            'power': power
+        }
+
+    def analyze(self, chunks):
+        """
+        Analyze one chunk or a batch of chunks
+
+        Parameters
+        ----------
+        chunks : np.ndarray
+            Audio samples of shape (size,) or (count, size).
+
+        Returns
+        -------
+        dict
+            Per chunk: 'dominant_frequency' (Hz, DC excluded, interpolated between bins), 'spectral_centroid' (Hz, NaN for
+            silence), 'band_energy' (count, bands) and the scaled 'power' spectrum (count, bins).
+            Arrays have a leading count axis.
+        """
+        chunks = np.asarray(chunks).reshape(-1, self.size)
+        count = len(chunks)
+        if count > self.batch:
+            self._allocate(count)
+
+        windowed = self._windowed[:count]
+        spectrum = self._spectrum[:count]
+
+        np.multiply(chunks, self.window, out=windowed)
+        np.fft.rfft(windowed, axis=1, out=spectrum)
+        return self._features(spectrum)
+
+    def analyze_stereo(self, chunks):
+        """
+        Analyze one stereo chunk or a batch of stereo chunks
+
+        Parameters
+        ----------
+        chunks : np.ndarray
+            Audio samples of shape (size, 2) or (count, size, 2), left channel first.
+
+        Returns
+        -------
+        dict
+            The features of `analyze` for the mix of both channels, and the 'cross_spectrum'
+            (count, bins) of the left channel times the conjugate of the right channel.
+        """
+        chunks = np.asarray(chunks).reshape(-1, self.size, 2)
+        count = len(chunks)
+        if 2 * count > self.batch:
+            self._allocate(2 * count)
+
+        # One row per channel, so that both channels share a single rfft call
+        windowed = self._windowed[:2 * count]
+        spectrum = self._spectrum[:2 * count]
+        np.multiply(chunks.transpose(0, 2, 1), self.window, out=windowed.reshape(count, 2, self.size))
+        np.fft.rfft(windowed, axis=1, out=spectrum)
+
+        left, right = spectrum[0::2], spectrum[1::2]
+        cross = np.multiply(left, np.conj(right), out=self._cross[:count])
+        mix = np.add(left, right, out=self._mix[:count])
+        mix *= 0.5
+
+        features = self._features(mix)
+        features['cross_spectrum'] = cross
+        return features
@@ -1,125 +1,316 @@
+from bisect import insort
 from collections import deque
+from heapq import heapify, heapreplace
 from typing import Optional, Dict, Any
 from raspberry.sensor_data import SensorData
+from raspberry.clock_sync import ClockAligner
+from raspberry.timeline import Timeline
+import numpy as np
 import time
 
 class SyncBuffer:
     """
-    Temporal synchronization buffer for audio and video data
+    Temporal synchronization buffer for any number of sensor streams (audio, video, ...)
+
+    Every stream is kept sorted by timestamp, so that the best synchronized set, one item
+    per stream with the smallest time spread, is found by a single merge over the streams.
+    Data carrying its 'capture_time' in the source clock and its 'arrival_time' on the host
+    is timestamped with its capture time mapped to the host clock, through a per-stream
+    offset and skew estimate (see raspberry/clock_sync.py), instead of its insertion time.
+    Streams with a timeline also keep their recent numeric features, which can be read at
+    the time of another stream's item instead of waiting for a matching item.
     """
-    
-    def __init__(self, max_age_ms=150):
-        self.audio_buffer = deque(maxlen=5)
-        self.video_buffer = deque(maxlen=5)
+
+    def __init__(self, max_age_ms=150, streams=('audio', 'video'), max_items=5, max_spread_ms=50):
+        '''
+        Parameters
+        ----------
+        max_age_ms : float
+            Age (ms) after which data is discarded
+        streams : tuple of str
+            Names of the streams registered from the start
+        max_items : int
+            Maximum number of items kept per stream, the oldest are discarded first
+        max_spread_ms : float
+            Maximum time spread (ms) between the items of a synchronized set
+        '''
         self.max_age = max_age_ms / 1000.0
-        
+        self.max_items = max_items
+        self.max_spread = max_spread_ms / 1000.0
+        self.streams = {}
+        self.clocks = {}
+        self.timelines = {}
+        for name in streams:
+            self.register_stream(name)
+
+        # Monitoring
+        self.matched_count = 0
+        self.unmatched_count = 0
+        self.interpolated_count = 0
+        self.spreads = deque(maxlen=500)  # Time spread of the recent synchronized sets
+
+    def register_stream(self, name, max_items=None, latency=0.0):
+        """
+        Register a new stream, e.g. a second camera or a hazard detector
+
+        Parameters
+        ----------
+        name : str
+            Name of the stream, used as the source of its SensorData
+        max_items : int, optional
+            Maximum number of items kept for this stream, by default the buffer's max_items
+        latency : float, optional
+            Known fixed delay (s) between the capture and the fastest arrival of the stream's data
+        """
+        self.streams[name] = ([], max_items or self.max_items)
+        self.clocks[name] = ClockAligner(latency=latency)
+
+    def register_timeline(self, name, fields, extract, capacity=64):
+        """
+        Keep the recent numeric features of a stream in a timeline (see raspberry/timeline.py)
+
+        Parameters
+        ----------
+        name : str
+            Name of a registered stream
+        fields : tuple of str
+            Names of the features
+        extract : callable
+            Function returning the features of a result, in the order of fields
+        capacity : int, optional
+            Maximum number of samples kept
+        """
+        self.timelines[name] = (Timeline(fields, capacity), extract)
+
+    def add(self, name, result, timestamp=None):
+        """
+        Add data to a stream
+
+        Parameters
+        ----------
+        name : str
+            Name of a registered stream
+        result : AudioResult, VideoResult, ...
+            Processed data
+        timestamp : float, optional
+            Time of the data on the host clock. By default its aligned capture time if it has a
+            'capture_time' and an 'arrival_time', else its arrival time, else the current time
+        """
+        items, max_items = self.streams[name]
+        if timestamp is None:
+            capture_time = getattr(result, 'capture_time', None)
+            arrival_time = getattr(result, 'arrival_time', None)
+            if capture_time is not None and arrival_time is not None:
+                timestamp = self.clocks[name].update(capture_time, arrival_time)
+            else:
+                timestamp = time.time() if arrival_time is None else arrival_time
+        sensor_data = SensorData(
+            timestamp=timestamp,
+            data=result,
+            source=name
+        )
+        if name in self.timelines:
+            timeline, extract = self.timelines[name]
+            timeline.add(timestamp, extract(result))
+        # Data usually arrives in order, then insort only appends
+        insort(items, sensor_data, key=lambda item: item.timestamp)
+        if len(items) > max_items:
+            del items[:len(items) - max_items]
+
     def add_audio(self, audio_result):
         """
         Add audio data with timestamp
-        
+
         Parameters
         ----------
-        audio_result : Dict
+        audio_result : AudioResult
             Processed audio data
         """
-        sensor_data = SensorData(
-            timestamp=time.time(),
-            data=audio_result,
-            source='audio'
-        )
-        self.audio_buffer.append(sensor_data)
-        
+        self.add('audio', audio_result)
+
     def add_video(self, video_result):
         """
         Add video data with timestamp
-        
+
         Parameters
         ----------
-        video_result : Dict
+        video_result : VideoResult
             Processed video data
         """
-        sensor_data = SensorData(
-            timestamp=time.time(),
-            data=video_result,
-            source='video'
-        )
-        self.video_buffer.append(sensor_data)
-        
+        self.add('video', video_result)
+
     def cleanup_old_data(self, current_time):
         """
         Clean up data older than max_age
-        
+
         Parameters
         ----------
         current_time : float
             Current timestamp
         """
-        while self.audio_buffer and (current_time - self.audio_buffer[0].timestamp) > self.max_age:
-            self.audio_buffer.popleft()
-            
-        while self.video_buffer and (current_time - self.video_buffer[0].timestamp) > self.max_age:
-            self.video_buffer.popleft()
-        
+        for items, _ in self.streams.values():
+            expired = 0
+            while expired < len(items) and (current_time - items[expired].timestamp) > self.max_age:
+                expired += 1
+            del items[:expired]
+
+    def get_synchronized(self, names=None, current_time=None):
+        """
+        Find and REMOVE the best synchronized set, one item per stream
+
+        Parameters
+        ----------
+        names : tuple of str, optional
+            Streams to synchronize, by default all registered streams
+        current_time : float, optional
+            Current time, by default time.time()
+
+        Returns
+        -------
+        Optional[tuple]
+            The SensorData of every stream, in the order of names, or None if no set has a
+            time spread under max_spread
+
+        Notes
+        -----
+        Smallest range over sorted streams: starting from the oldest item of every stream, the
+        stream holding the earliest item of the current set is advanced until one stream is
+        exhausted, with a heap on the current items. The cost is O(n log k) for n items in k
+        streams. The used items and the older ones are removed.
+        """
+        self.cleanup_old_data(time.time() if current_time is None else current_time)
+
+        streams = [self.streams[name][0] for name in (names or self.streams)]
+        if not all(streams):
+            return None
+
+        # Heap of (timestamp, stream, position) of the current item of every stream
+        heap = [(items[0].timestamp, k, 0) for k, items in enumerate(streams)]
+        heapify(heap)
+        latest = max(entry[0] for entry in heap)
+        positions = [0] * len(streams)
+        best_spread, best_positions = latest - heap[0][0], list(positions)
+
+        while True:
+            timestamp, k, position = heap[0]
+            if position + 1 == len(streams[k]):
+                break
+            following = streams[k][position + 1].timestamp
+            heapreplace(heap, (following, k, position + 1))
+            positions[k] = position + 1
+            latest = max(latest, following)
+            if latest - heap[0][0] < best_spread:
+                best_spread, best_positions = latest - heap[0][0], list(positions)
+
+        if best_spread >= self.max_spread:
+            self.unmatched_count += 1
+            return None
+        self.matched_count += 1
+        self.spreads.append(best_spread)
+
+        matched = tuple(items[position] for items, position in zip(streams, best_positions))
+        # IMPORTANT: Remove all elements up to and including the ones used
+        for items, position in zip(streams, best_positions):
+            del items[:position + 1]
+        return matched
+
     def get_synchronized_pair(self):
         """
         Find and REMOVE the best synchronized audio-video pair
         """
-        current_time = time.time()
-        self.cleanup_old_data(current_time)
-        
-        if not self.audio_buffer or not self.video_buffer:
+        return self.get_synchronized(('audio', 'video'))
+
+    def get_interpolated(self, name, anchor, current_time=None):
+        """
+        Read the features of a stream at the time of the latest item of another stream
+
+        Unlike get_synchronized, nothing is removed: the anchor item is used again until a newer
+        one arrives, and the features are interpolated between the samples around its time, or
+        held from the nearest sample, within max_age.
+
+        Parameters
+        ----------
+        name : str
+            Stream with a timeline (see register_timeline), e.g. 'audio'
+        anchor : str
+            Stream giving the time, e.g. 'video'
+        current_time : float, optional
+            Current time, by default time.time()
+
+        Returns
+        -------
+        Optional[tuple]
+            The features by field name and the SensorData of the anchor item, or None if the
+            anchor stream has no item under max_age or the timeline no sample close to it
+        """
+        self.cleanup_old_data(time.time() if current_time is None else current_time)
+
+        anchor_data = self.get_latest(anchor)
+        if anchor_data is None:
             return None
-            
-        best_pair = None
-        min_time_diff = float('inf')
-        best_audio_idx = None
-        best_video_idx = None
-        
-        for i, audio_data in enumerate(self.audio_buffer):
-            for j, video_data in enumerate(self.video_buffer):
-                time_diff = abs(audio_data.timestamp - video_data.timestamp)
-                if time_diff < min_time_diff:
-                    min_time_diff = time_diff
-                    best_pair = (audio_data, video_data)
-                    best_audio_idx = i
-                    best_video_idx = j
-                    
-        # Acceptable synchronization threshold (50ms)
-        if best_pair and min_time_diff < 0.05:
-            # IMPORTANT: Remove used data
-            if best_audio_idx is not None:
-                # Remove all elements up to and including the one used
-                for _ in range(best_audio_idx + 1):
-                    if self.audio_buffer:
-                        self.audio_buffer.popleft()
-            
-            if best_video_idx is not None:
-                for _ in range(best_video_idx + 1):
-                    if self.video_buffer:
-                        self.video_buffer.popleft()
-            
-            return best_pair
-            
-        return None
-    
+        features = self.timelines[name][0].sample(anchor_data.timestamp, self.max_age)
+        if features is None:
+            self.unmatched_count += 1
+            return None
+        self.interpolated_count += 1
+        return features, anchor_data
+
+    def get_latest(self, name):
+        """
+        Retrieve the most recent data of a stream
+
+        Parameters
+        ----------
+        name : str
+            Name of a registered stream
+
+        Returns
+        -------
+        Optional[SensorData]
+            The most recent data, or None if the stream is empty
+        """
+        items = self.streams[name][0]
+        return items[-1] if items else None
+
     def get_latest_audio(self):
         """
         Retrieve the most recent audio data
-        
+
         Returns
         -------
         Optional[SensorData]
             The most recent audio data, or None if buffer is empty
         """
-        return self.audio_buffer[-1] if self.audio_buffer else None
-    
+        return self.get_latest('audio')
+
     def get_latest_video(self):
         """
         Retrieve the most recent video data
-        
+
         Returns
         -------
         Optional[SensorData]
             The most recent video data, or None if buffer is empty
         """
-        return self.video_buffer[-1] if self.video_buffer else None
\ No newline at end of file
+        return self.get_latest('video')
+
+    def get_sync_stats(self):
+        """
+        Get the synchronization statistics
+
+        Returns
+        -------
+        dict
+            Number of synchronized sets found, of interpolated reads and of calls without either,
+            mean and max time spread (ms) of the recent sets, and the clock estimate of every stream
+            (see ClockAligner.get_stats)
+        """
+        spreads = np.array(self.spreads) if self.spreads else np.zeros(1)
+        return {
+            'matched': self.matched_count,
+            'interpolated': self.interpolated_count,
+            'unmatched': self.unmatched_count,
+            'spread_mean_ms': float(spreads.mean() * 1000),
+            'spread_max_ms': float(spreads.max() * 1000),
+            'clocks': {name: clock.get_stats() for name, clock in self.clocks.items() if clock.update_count}
+        }
@@ -0,0 +1,103 @@
+"""
+Array-backed timeline of the recent numeric features of a sensor stream.
+
+Timestamps and feature rows are kept sorted in preallocated arrays, so that the
+features of a stream can be read at any time of another stream: linearly
+interpolated between the two samples around it, or held from the nearest one
+at the ends of the timeline.
+"""
+
+import numpy as np
+
+
+class Timeline:
+    """
+    Sorted, fixed-capacity history of the feature rows of a stream
+
+    Parameters
+    ----------
+    fields : tuple of str
+        Names of the features of every row.
+    capacity : int
+        Maximum number of rows kept. When full, the oldest half is discarded.
+
+    Notes
+    -----
+    Adding a row costs O(1) when rows arrive in timestamp order, reading O(log capacity).
+    """
+
+    def __init__(self, fields, capacity=64):
+        self.fields = tuple(fields)
+        self.times = np.zeros(capacity)
+        self.values = np.zeros((capacity, len(self.fields)))
+        self.size = 0
+
+    def add(self, timestamp, values):
+        """
+        Add the feature row of a sample
+
+        Parameters
+        ----------
+        timestamp : float
+            Time of the sample (seconds, host clock).
+        values : sequence of float
+            Features of the sample, in the order of fields.
+        """
+        if self.size == len(self.times):
+            # Full: keep the newest half, the copy is amortized over capacity / 2 additions
+            keep = self.size // 2
+            self.times[:keep] = self.times[self.size - keep:self.size]
+            self.values[:keep] = self.values[self.size - keep:self.size]
+            self.size = keep
+
+        position = self.size
+        if position and timestamp < self.times[position - 1]:
+            # Late sample: shift the newer rows to keep the timeline sorted
+            position = int(np.searchsorted(self.times[:self.size], timestamp, side='right'))
+            self.times[position + 1:self.size + 1] = self.times[position:self.size]
+            self.values[position + 1:self.size + 1] = self.values[position:self.size]
+
+        self.times[position] = timestamp
+        self.values[position] = values
+        self.size += 1
+
+    def sample(self, timestamp, max_gap):
+        """
+        Read the features at a given time
+
+        Parameters
+        ----------
+        timestamp : float
+            Time to read (seconds, host clock).
+        max_gap : float
+            Longest time (seconds) between two samples interpolated, and between the time
+            and the sample held when it is outside of such an interval.
+
+        Returns
+        -------
+        dict or None
+            The features by field name, or None if no sample is close enough
+        """
+        times = self.times[:self.size]
+        after = int(np.searchsorted(times, timestamp))
+
+        if 0 < after < self.size and times[after] - times[after - 1] <= max_gap:
+            weight = (timestamp - times[after - 1]) / (times[after] - times[after - 1])
+            row = self.values[after - 1] + weight * (self.values[after] - self.values[after - 1])
+        else:
+            # Hold the nearest sample
+            candidates = [index for index in (after - 1, after) if 0 <= index < self.size]
+            if not candidates:
+                return None
+            nearest = min(candidates, key=lambda index: abs(times[index] - timestamp))
+            if abs(times[nearest] - timestamp) > max_gap:
+                return None
+            row = self.values[nearest]
+
+        return dict(zip(self.fields, row.tolist()))
+
+    def clear(self):
+        """
+        Forget all samples
+        """
+        self.size = 0
@@ -0,0 +1,74 @@
+from threading import Lock
+import time
+
+class StageStats:
+    """
+    StageStats collects the throughput and latency of the pipeline stages,
+    so that different execution modes can be compared.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.stages = {}
+        self.start_time = time.time()
+
+    def record(self, stage: str, seconds: float):
+        '''
+        Record one run of a stage
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage
+        seconds : float
+            Time spent in the stage (or latency measured at the end of the stage)
+        '''
+        with self.lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                self.stages[stage] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+    def reset(self):
+        '''
+        Forget all recorded runs
+        '''
+        with self.lock:
+            self.stages = {}
+            self.start_time = time.time()
+
+    def get_stats(self):
+        '''
+        Get current statistics of the stages
+
+        Returns
+        -------
+        dict
+            For every stage: run count, throughput (runs/s), mean and max time in milliseconds
+        '''
+        with self.lock:
+            elapsed = max(time.time() - self.start_time, 1e-6)
+            return {
+                stage: {
+                    'count': count,
+                    'rate': count / elapsed,
+                    'mean_ms': total / count * 1000,
+                    'max_ms': longest * 1000
+                }
+                for stage, (count, total, longest) in self.stages.items()
+            }
+
+    def print_stats(self, title="Stage Stats"):
+        '''
+        Print current stage statistics
+
+        Note
+        ----
+        This function is mainly for debugging purposes.
+        '''
+        print(f"\n⏱️  {title}:")
+        for stage, stats in self.get_stats().items():
+            print(f"  {stage}: {stats['rate']:.1f}/s, mean {stats['mean_ms']:.2f}ms, max {stats['max_ms']:.2f}ms")
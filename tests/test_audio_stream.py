@@ -0,0 +1,53 @@
+"""
+Sliding-window audio analysis over a stream with dropped blocks.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import unittest
+import numpy as np
+from raspberry.audio_stream import StreamingAudioAnalyzer
+
+WINDOW = 400
+HOP = 100
+
+
+class DroppedBlocksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.samples = np.random.default_rng(0).normal(0, 1, 40 * HOP).astype(np.float32)
+        self.samples[:20 * HOP] *= 0.01  # Quiet then loud, so that a splice changes the levels
+
+    def push(self, analyzer, blocks):
+        levels = {}
+        for index in blocks:
+            end = (index + 1) * HOP
+            hops = analyzer.push(self.samples[end - HOP:end], end)
+            if hops:
+                levels[end] = hops[-1][0]
+        return levels
+
+    def test_contiguous_stream(self):
+        analyzer = StreamingAudioAnalyzer(WINDOW, HOP)
+        levels = self.push(analyzer, range(40))
+        self.assertEqual(analyzer.gap_count, 0)
+        self.assertEqual(len(levels), 40 - WINDOW // HOP + 1)
+
+    def test_gap_restarts_the_window(self):
+        analyzer = StreamingAudioAnalyzer(WINDOW, HOP)
+        dropped = (18, 19, 20)
+        levels = self.push(analyzer, [i for i in range(40) if i not in dropped])
+
+        self.assertEqual(analyzer.gap_count, 1)
+        self.assertEqual(analyzer.lost_samples, len(dropped) * HOP)
+        # No window spans the gap: the first one after it holds WINDOW contiguous samples
+        restart = (dropped[-1] + 1) * HOP
+        self.assertFalse([end for end in levels if restart < end < restart + WINDOW])
+        for end, mean_square in levels.items():
+            expected = np.mean(self.samples[end - WINDOW:end].astype(np.float64) ** 2)
+            self.assertAlmostEqual(mean_square / expected, 1.0, places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
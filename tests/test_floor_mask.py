@@ -0,0 +1,69 @@
+"""
+Floor removal on a frame that only sees the floor (clear path ahead).
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import unittest
+import numpy as np
+from camera.zone_stats import ZoneStatistics, CoarseToFine, zone_distances, ZONE_NAMES
+from camera.floor_mask import FloorFilter, floor_table_from_geometry
+from raspberry.intensity_calculator import IntensityCalculator
+from raspberry.lcr_message_generator import LCRMessageGenerator
+from raspberry.sensor_data import VideoResult
+
+W = 640
+H = 480
+DEPTH_SCALE = 0.001
+
+
+def floor_frame(table):
+    """
+    Raw frame whose every row is at its expected floor depth, 0 for rows above the horizon
+    """
+    row = np.where(np.isnan(table), 0, np.round(table / DEPTH_SCALE)).astype(np.uint16)
+    return np.repeat(row[:, None], W, axis=1)
+
+
+class PureFloorFrameTest(unittest.TestCase):
+
+    def setUp(self):
+        fy = H / 2 / np.tan(np.radians(58.0 / 2))
+        self.table = floor_table_from_geometry(H, fy, (H - 1) / 2, camera_height=0.80, pitch=20.0)
+        self.frame = floor_frame(self.table)
+
+    def analyzers(self):
+        sort = ZoneStatistics(1, 3, 0.10, 0.10, backend='sort')
+        histogram = ZoneStatistics(1, 3, 0.10, 0.10, backend='histogram')
+        return (sort, histogram, CoarseToFine(histogram, 4, (1.0, 2.0), 0.25))
+
+    def test_zones_have_no_distance(self):
+        for analyzer in self.analyzers():
+            floor_filter = FloorFilter(analyzer)
+            floor_filter.set_table(self.table)
+            stats = floor_filter.compute(self.frame, DEPTH_SCALE)
+
+            self.assertGreater(stats['floor_pixels'], 0)
+            self.assertTrue(np.isnan(stats['median']).all())
+
+    def test_no_obstacle_intensity(self):
+        floor_filter = FloorFilter(ZoneStatistics(1, 3, 0.10, 0.10))
+        floor_filter.set_table(self.table)
+        distances = zone_distances(floor_filter.compute(self.frame, DEPTH_SCALE)['median'])
+        zones = tuple(distances[name] for name in ZONE_NAMES)
+
+        self.assertEqual(IntensityCalculator.distance_to_intensity(np.nan), 0)
+        self.assertEqual(IntensityCalculator.vision_to_intensity_by_zone(zones, ()),
+                         {'gauche': 0, 'centre': 0, 'droite': 0})
+
+        video = VideoResult(mode='paisible', obstacle_info='Aucun', avoid_direction='Centre', danger_level=0,
+                            risk_classification='safe', distances=zones, obstacles=(), depth_profile=None,
+                            frame_number=1, capture_time=None, arrival_time=None, timestamp=0.0)
+        generator = LCRMessageGenerator()
+        self.assertEqual(generator.generate_fallback_message(video_only=video), "L000C000R000")
+        self.assertEqual(generator.generate_synchronized_message(None, video), "L000C000R000")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Hazard scores of background noise, pure tones and hazard sounds.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from raspberry.spectrum import SpectralFrontEnd
+from raspberry.hazard_detector import HazardDetector, HAZARD_CLASSES, HAZARD_THRESHOLD, prototype
+
+SAMPLE_RATE = 44100
+SIZE = 2940  # 1/15 s at SAMPLE_RATE
+COUNT = 50
+
+
+def colored_noise(exponent, rng):
+    """
+    Noise chunks whose power spectrum falls as 1 / f ** exponent: 0 white, 1 pink, 2 brown
+    """
+    freqs = np.fft.rfftfreq(SIZE, 1.0 / SAMPLE_RATE)
+    spectrum = np.fft.rfft(rng.normal(0, 1, (COUNT, SIZE)), axis=1) / np.maximum(freqs, freqs[1]) ** (exponent / 2)
+    noise = np.fft.irfft(spectrum, SIZE, axis=1)
+    return (0.1 * noise / np.max(np.abs(noise), axis=1, keepdims=True)).astype(np.float32)
+
+
+def tone(frequency, rng):
+    t = np.arange(SIZE) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * frequency * t + rng.uniform(0, 2 * np.pi, (COUNT, 1)))).astype(np.float32)
+
+
+class HazardScoreTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.front_end = SpectralFrontEnd(SIZE, SAMPLE_RATE)
+        cls.detector = HazardDetector(cls.front_end)
+
+    def scores(self, chunks):
+        return self.detector.score(self.front_end.analyze(chunks)['power'])
+
+    def test_noise_is_not_a_hazard(self):
+        rng = np.random.default_rng(1)
+        for name, exponent in (('white', 0), ('pink', 1), ('brown', 2)):
+            with self.subTest(noise=name):
+                self.assertLess(self.scores(colored_noise(exponent, rng)).max(), HAZARD_THRESHOLD)
+
+    def test_pure_tone_is_not_a_hazard(self):
+        rng = np.random.default_rng(2)
+        for frequency in (90, 440, 777, 1000, 3000):
+            with self.subTest(frequency=frequency):
+                self.assertLess(self.scores(tone(frequency, rng)).max(), HAZARD_THRESHOLD)
+
+    def test_hazards_are_detected(self):
+        rng = np.random.default_rng(3)
+        for i, name in enumerate(HAZARD_CLASSES):
+            with self.subTest(hazard=name):
+                scores = self.scores(np.stack([prototype(name, SIZE, SAMPLE_RATE, rng) for _ in range(COUNT)]))
+                detected = (scores.argmax(axis=1) == i) & (scores.max(axis=1) >= HAZARD_THRESHOLD)
+                self.assertGreaterEqual(detected.mean(), 0.8)
+
+    def test_save_and_load(self):
+        detector = HazardDetector(self.front_end)
+        detector.fit_background(tone(440, np.random.default_rng(4)))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'templates.npz')
+            detector.save(path)
+
+            loaded = HazardDetector(self.front_end)
+            self.assertTrue(loaded.load(path))
+            np.testing.assert_array_equal(loaded.templates, detector.templates)
+            np.testing.assert_array_equal(loaded.background, detector.background)
+            self.assertFalse(HazardDetector(SpectralFrontEnd(SIZE // 2, SAMPLE_RATE // 2)).load(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Replay of recorded depth sessions, including interrupted recordings.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from camera.recording import DepthRecorder, ReplaySource, FRAMES_FILE, TIMESTAMPS_FILE, ARRIVALS_FILE
+
+W = 8
+H = 4
+FRAMES = 5
+
+
+class InterruptedRecordingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        with DepthRecorder(self.path, W, H, 0.001, 15) as recorder:
+            for i in range(FRAMES):
+                recorder.write(np.full((H, W), i, dtype=np.uint16), 10.0 + i / 15, 1000.0 + i / 15)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def truncate(self, name, size):
+        path = os.path.join(self.path, name)
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - size)
+
+    def replayed(self):
+        replay = ReplaySource(self.path, realtime=False)
+        return replay, list(replay)
+
+    def test_complete_session(self):
+        replay, frames = self.replayed()
+        self.assertEqual(len(frames), FRAMES)
+        self.assertEqual(len(replay.arrival_times), FRAMES)
+
+    def test_truncated_timestamps(self):
+        self.truncate(TIMESTAMPS_FILE, 8 + 3)  # One timestamp and a partial one missing
+        replay, frames = self.replayed()
+
+        self.assertEqual(len(replay), FRAMES - 2)
+        self.assertEqual([int(frame[0, 0]) for frame, _ in frames], list(range(FRAMES - 2)))
+        self.assertEqual(frames[-1][1], 10.0 + (FRAMES - 3) / 15)
+
+    def test_truncated_arrivals(self):
+        self.truncate(ARRIVALS_FILE, 8)
+        replay, frames = self.replayed()
+        self.assertEqual(len(frames), FRAMES - 1)
+        self.assertEqual(len(replay.timestamps), FRAMES - 1)
+
+    def test_truncated_frames(self):
+        self.truncate(FRAMES_FILE, W * H)  # Half of the last frame
+        replay, frames = self.replayed()
+        self.assertEqual(len(frames), FRAMES - 1)
+        self.assertEqual(len(replay.arrival_times), FRAMES - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Decimation of audio fed in callback blocks.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+
+import unittest
+import numpy as np
+from micro.resampler import HalfBandDecimator, PolyphaseResampler, build_decimator
+
+SAMPLE_RATE = 44100
+CHUNK_SIZE = 2940  # 1/15 s at SAMPLE_RATE
+
+
+class HalfBandDecimatorTest(unittest.TestCase):
+
+    def test_blocks_match_one_pass(self):
+        audio = np.random.default_rng(0).normal(0, 1, 4 * CHUNK_SIZE).astype(np.float32)
+        for rate in (22050, 11025):
+            decimator = HalfBandDecimator(SAMPLE_RATE, rate)
+            blocks = np.concatenate([decimator.process(audio[i:i + 256]) for i in range(0, len(audio), 256)])
+            whole = HalfBandDecimator(SAMPLE_RATE, rate).process(audio)
+            self.assertEqual(len(blocks), len(audio) * rate // SAMPLE_RATE)
+            np.testing.assert_allclose(blocks, whole[:len(blocks)], atol=1e-6)
+
+    def test_delay(self):
+        for rate in (22050, 11025):
+            decimator = HalfBandDecimator(SAMPLE_RATE, rate)
+            impulse = np.zeros(CHUNK_SIZE, dtype=np.float32)
+            impulse[1000] = 1.0
+            peak = np.argmax(decimator.process(impulse))
+            self.assertAlmostEqual(peak / rate, 1000 / SAMPLE_RATE + decimator.delay, delta=1 / rate)
+
+    def test_passband_level(self):
+        t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+        tone = np.sin(2 * np.pi * 1000 * t).astype(np.float32)
+        out = HalfBandDecimator(SAMPLE_RATE, 22050).process(tone)[100:]
+        self.assertAlmostEqual(np.sqrt(np.mean(out ** 2)), np.sqrt(0.5), delta=0.01)
+
+    def test_build_decimator(self):
+        self.assertIsInstance(build_decimator(SAMPLE_RATE, 11025), HalfBandDecimator)
+        self.assertIsInstance(build_decimator(SAMPLE_RATE, 16000), PolyphaseResampler)
+        with self.assertRaises(ValueError):
+            HalfBandDecimator(SAMPLE_RATE, 16000)
+
+
+if __name__ == "__main__":
+    unittest.main()